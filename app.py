@@ -1,6 +1,13 @@
 import os
+import logging
 import nltk # Make sure nltk is imported early
 
+from backend.logging_setup import LOG_PAYLOAD_SAMPLE_RATE, setup_logging
+
+# Structured, queue-backed logging (see backend/logging_setup.py)
+setup_logging()
+logger = logging.getLogger("hireai")
+
 # --- BEGIN NLTK Path Configuration ---
 # Construct the absolute path to your custom NLTK data directory
 # RENDER_PROJECT_ROOT is typically /opt/render/project/src on Render
@@ -14,18 +21,20 @@ if os.path.exists(custom_nltk_data_path):
     # This makes NLTK look here first.
     if custom_nltk_data_path not in nltk.data.path:
         nltk.data.path.insert(0, custom_nltk_data_path)
-    print(f"Successfully added custom NLTK data path: {custom_nltk_data_path}")
-    print(f"NLTK search paths (runtime): {nltk.data.path}")
+    logger.info("Successfully added custom NLTK data path", extra={"fields": {"path": custom_nltk_data_path, "search_paths": nltk.data.path}})
 else:
-    print(f"Custom NLTK data path not found: {custom_nltk_data_path}. NLTK will use default paths.")
-    print(f"NLTK search paths (runtime, default): {nltk.data.path}")
+    logger.info("Custom NLTK data path not found, NLTK will use default paths", extra={"fields": {"path": custom_nltk_data_path, "search_paths": nltk.data.path}})
 # --- END NLTK Path Configuration ---
 
+import asyncio
 import base64
+import io
 import tempfile
-from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, HTTPException, Query, File, UploadFile, Form, Body
+from typing import List, Dict, Any, AsyncIterator, Optional
+from datetime import datetime, timezone
+from fastapi import FastAPI, HTTPException, Query, File, UploadFile, Form, Body, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import httpx
@@ -33,13 +42,27 @@ import json
 import PyPDF2
 import re
 import hashlib
+import uuid
 import socket
 import fitz  # PyMuPDF (for PDF parsing)
 import mammoth  # For DOCX parsing (better than python-docx for text extraction)
 from pyresparser import ResumeParser
 
 # Import robust parser
-from backend.routers.resume_parser import extract_fields
+from backend.routers.resume_parser import extract_fields, extract_text_from_pdf as extract_pdf_text_budgeted, score_fields
+from backend.docx_stream import extract_docx_text
+from backend.dedup import DedupIndex, minhash_signature
+from backend.embeddings import EmbeddingBatcher
+from backend.search_cache import CatalogGeneration, SearchCache, SharedSnapshotStore, normalize_query
+from backend.catalog import CandidateCatalog, InvalidationLog
+from backend.vector_snapshot import VECTOR_SNAPSHOT_DIR, VectorSnapshot, acquire_build_lock, write_snapshot
+from backend.warmup import SAMPLE_RESUME, Warmup, sample_docx, sample_pdf
+from backend.prompt_compression import SUMMARY_INPUT_TOKEN_BUDGET, compress_resume, estimate_tokens
+from backend.admission import AdmissionClass, AdmissionMiddleware
+from backend.write_behind import WriteBehindBuffer
+from backend.export import EXPORT_MEDIA_TYPES, csv_header, encode_page
+from backend.pagination import CANDIDATE_COLUMNS, LIST_DEFAULT_FIELDS, SEARCH_DEFAULT_FIELDS, decode_cursor, encode_cursor, in_filter, parse_fields
+from backend.metrics import CATALOG_CACHE_TOTAL, CONTENT_TYPE as METRICS_CONTENT_TYPE, PARSER_CASCADE_TOTAL, SEARCH_CACHE_TOTAL, render_metrics, track_stage
 
 # Load environment variables
 load_dotenv()
@@ -49,6 +72,41 @@ SUPABASE_URL = os.getenv("VITE_SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("VITE_SUPABASE_ANON_KEY")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") # Ensure this is set in your backend environment
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com") # Override to point at a local stand-in
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_SEED_ON_STARTUP = os.getenv("DEDUP_SEED_ON_STARTUP", "1") == "1"
+DEDUP_PRELOAD_MAX_ROWS = int(os.getenv("DEDUP_PRELOAD_MAX_ROWS", "0")) # serve.py: rows to seed before forking; workers seed the rest
+INLINE_EMBEDDING = os.getenv("INLINE_EMBEDDING", "1") == "1" # Embed new uploads before insert
+MAX_RAW_TEXT_LENGTH = 20000
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_TTL_S = float(os.getenv("SEARCH_CACHE_TTL_S", "300"))
+SEARCH_INVALIDATE_TOKEN = os.getenv("SEARCH_INVALIDATE_TOKEN") # Shared secret for /api/search/invalidate; without it only local callers may invalidate
+LOCAL_CLIENT_HOSTS = {"127.0.0.1", "::1", "localhost"}
+SEARCH_SNAPSHOT_SIZE = int(os.getenv("SEARCH_SNAPSHOT_SIZE", "200")) # Ranked ids kept per search session
+SEARCH_SNAPSHOT_TTL_S = float(os.getenv("SEARCH_SNAPSHOT_TTL_S", "1800"))
+SEARCH_SNAPSHOT_LIMIT = int(os.getenv("SEARCH_SNAPSHOT_LIMIT", "4096"))
+SEARCH_SNAPSHOT_DIR = os.getenv("SEARCH_SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "hireai-search-snapshots")) # Shared by all workers on a host
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1" # /readyz stays 503 until warmup finishes
+PARSER_CONFIDENCE_THRESHOLD = float(os.getenv("PARSER_CONFIDENCE_THRESHOLD", "0.7")) # Below this, bucket PDFs also go through pyresparser
+CATALOG_MAX_ENTRIES = int(os.getenv("CATALOG_MAX_ENTRIES", "2000"))
+CATALOG_TTL_S = float(os.getenv("CATALOG_TTL_S", "600"))
+CATALOG_SPILL_PATH = os.getenv("CATALOG_SPILL_PATH") # Optional SQLite file for records evicted from memory
+LOCAL_VECTOR_SEARCH = os.getenv("LOCAL_VECTOR_SEARCH", "0") == "1" # Rank from the on-disk vector snapshot instead of match_candidates
+# Admission control, per worker process: concurrent requests and queue depth per endpoint class
+ADMISSION_PARSE_CONCURRENCY = int(os.getenv("ADMISSION_PARSE_CONCURRENCY", str(os.cpu_count() or 2)))
+ADMISSION_PARSE_QUEUE = int(os.getenv("ADMISSION_PARSE_QUEUE", "32"))
+ADMISSION_LLM_CONCURRENCY = int(os.getenv("ADMISSION_LLM_CONCURRENCY", "16"))
+ADMISSION_LLM_QUEUE = int(os.getenv("ADMISSION_LLM_QUEUE", "64"))
+ADMISSION_READ_CONCURRENCY = int(os.getenv("ADMISSION_READ_CONCURRENCY", "64"))
+ADMISSION_READ_QUEUE = int(os.getenv("ADMISSION_READ_QUEUE", "256"))
+ADMISSION_EXPORT_CONCURRENCY = int(os.getenv("ADMISSION_EXPORT_CONCURRENCY", "4"))
+ADMISSION_EXPORT_QUEUE = int(os.getenv("ADMISSION_EXPORT_QUEUE", "16"))
+ADMISSION_MAX_WAIT_S = float(os.getenv("ADMISSION_MAX_WAIT_S", "30")) # Queued longer than this: 429
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "500")) # Rows fetched from PostgREST per export page
+EXPORT_SEARCH_LIMIT = int(os.getenv("EXPORT_SEARCH_LIMIT", "5000")) # Most ranked candidates a query export returns
+ID_FETCH_CHUNK = int(os.getenv("ID_FETCH_CHUNK", "100")) # Ids per id=in.(...) request; keeps URLs well under gateway limits
+VECTOR_SEARCH_IVF = os.getenv("VECTOR_SEARCH_IVF", "0") == "1" # Approximate (IVF + int8) search over the local snapshot
+VECTOR_DELTA_COMPACT_AT = int(os.getenv("VECTOR_DELTA_COMPACT_AT", "10000")) # Delta log entries before compaction
 
 # Check for required environment variables
 if not all([SUPABASE_URL, SUPABASE_ANON_KEY, SUPABASE_SERVICE_ROLE_KEY]):
@@ -60,12 +118,40 @@ if not all([SUPABASE_URL, SUPABASE_ANON_KEY, SUPABASE_SERVICE_ROLE_KEY]):
     if not SUPABASE_SERVICE_ROLE_KEY:
         missing_vars.append("SUPABASE_SERVICE_ROLE_KEY")
     
-    print(f"Missing required environment variables: {', '.join(missing_vars)}")
+    logger.error("Missing required environment variables", extra={"fields": {"missing": missing_vars}})
     raise ValueError("Missing required environment variables")
 
 # Initialize FastAPI
 app = FastAPI(title="HireAI API", description="API for HireAI resume search and candidate management")
 
+def endpoint_class(method: str, path: str) -> Optional[str]:
+    """Admission class for a request: parse (CPU-heavy ingest), llm, export, read, or None (not limited)."""
+    if method == "POST" and path in ("/api/resume/upload", "/api/resume/parse_from_bucket"):
+        return "parse"
+    if method == "POST" and path.startswith("/api/candidate/") and path.endswith("/generate_summary"):
+        return "llm"
+    if method in ("GET", "POST") and path == "/api/export":
+        # Streams hold their slot for the whole download; kept apart so they
+        # don't crowd out reads or inflate the read class's Retry-After
+        return "export"
+    if method == "GET" and (path in ("/api/search", "/api/candidates") or path.startswith("/api/candidate/")):
+        return "read"
+    return None
+
+# Admission control: ingest bursts queue (then get 429s) in their own class
+# instead of slowing every endpoint down together. Added before CORS so that
+# 429 responses still carry CORS headers.
+app.add_middleware(
+    AdmissionMiddleware,
+    classes={
+        "parse": AdmissionClass("parse", ADMISSION_PARSE_CONCURRENCY, ADMISSION_PARSE_QUEUE, ADMISSION_MAX_WAIT_S),
+        "llm": AdmissionClass("llm", ADMISSION_LLM_CONCURRENCY, ADMISSION_LLM_QUEUE, ADMISSION_MAX_WAIT_S),
+        "read": AdmissionClass("read", ADMISSION_READ_CONCURRENCY, ADMISSION_READ_QUEUE, ADMISSION_MAX_WAIT_S),
+        "export": AdmissionClass("export", ADMISSION_EXPORT_CONCURRENCY, ADMISSION_EXPORT_QUEUE, ADMISSION_MAX_WAIT_S),
+    },
+    classify=endpoint_class,
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -75,21 +161,314 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Near-duplicate index over candidate raw_text (MinHash/LSH)
+dedup_index = DedupIndex(threshold=DEDUP_THRESHOLD)
+# Reservations for uploads whose insert is still in flight: reservation id ->
+# future resolving to the inserted candidate id (None if the insert failed)
+pending_dedup_inserts: Dict[str, asyncio.Future] = {}
+# Last candidate id seeded before serve.py forked; workers continue after it
+dedup_seeded_through: Optional[str] = None
+
+def release_dedup_reservation(reservation: str, candidate_id: Optional[str]) -> None:
+    dedup_index.remove(reservation)
+    future = pending_dedup_inserts.pop(reservation, None)
+    if future is not None and not future.done():
+        future.set_result(candidate_id)
+
+async def seed_dedup_index(page_size: int = 500, after: Optional[str] = None,
+                           max_rows: Optional[int] = None) -> Optional[str]:
+    """Load signatures for existing candidates so duplicates of old uploads are caught too.
+
+    Starts after candidate id `after` and stops once `max_rows` rows are read.
+    Returns the last id seeded if it stopped early (or failed), else None.
+    """
+    headers = {
+        "apikey": SUPABASE_SERVICE_ROLE_KEY,
+        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+    }
+    last_id = after
+    seen = 0
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        while True:
+            if max_rows is not None and seen >= max_rows:
+                logger.info("Dedup index partly seeded", extra={"fields": {"candidates": len(dedup_index)}})
+                return last_id or ""
+            url = f"{SUPABASE_URL}/rest/v1/candidates?select=id,raw_text&order=id&limit={page_size}"
+            if last_id:
+                url += f"&id=gt.{last_id}"
+            try:
+                response = await client.get(url, headers=headers)
+                response.raise_for_status()
+                rows = response.json()
+            except Exception as e:
+                logger.error("Error seeding dedup index", extra={"fields": {"error": str(e)}})
+                return last_id or ""
+            if not rows:
+                break
+            seen += len(rows)
+            for row in rows:
+                if row.get("raw_text"):
+                    signature = await asyncio.to_thread(minhash_signature, row["raw_text"])
+                    dedup_index.add(str(row["id"]), signature)
+            last_id = rows[-1]["id"]
+    logger.info("Dedup index seeded", extra={"fields": {"candidates": len(dedup_index)}})
+    return None
+
+@app.on_event("startup")
+async def start_dedup_seeding():
+    if DEDUP_SEED_ON_STARTUP:
+        asyncio.create_task(seed_dedup_index(after=dedup_seeded_through or None))
+
+# Micro-batched embeddings for new uploads, so they are searchable without
+# rerunning embedding_script.py
+embedding_batcher = EmbeddingBatcher()
+
+@app.on_event("startup")
+async def start_embedding_batcher():
+    if INLINE_EMBEDDING:
+        embedding_batcher.start()
+
+@app.on_event("shutdown")
+async def stop_embedding_batcher():
+    await embedding_batcher.stop()
+
+async def embed_candidate_text(text: str) -> Optional[List[float]]:
+    """Embedding for a new candidate row, or None if the model is unavailable."""
+    try:
+        with track_stage("embedding"):
+            return await embedding_batcher.embed(text)
+    except Exception as e:
+        logger.error("Inline embedding failed, inserting without embedding", extra={"fields": {"error": str(e)}})
+        return None
+
+# Search result cache; the generation goes up on every candidate insert, patch
+# or embedding write, which invalidates all cached results at once
+catalog_generation = CatalogGeneration()
+search_cache = SearchCache(max_entries=SEARCH_CACHE_SIZE, ttl_seconds=SEARCH_CACHE_TTL_S)
+# Ranked (id, similarity) snapshots behind search cursors. They are not tied
+# to the generation: a session keeps paging through the ranking it started with.
+# They live on disk so the next page can land on any worker.
+search_snapshots = SharedSnapshotStore(SEARCH_SNAPSHOT_DIR, max_entries=SEARCH_SNAPSHOT_LIMIT, ttl_seconds=SEARCH_SNAPSHOT_TTL_S)
+
+# Local vector search: memory-mapped snapshot of candidate embeddings plus a
+# delta log of uploads since. Opening an existing snapshot is near-instant;
+# only the very first start pulls every embedding from PostgREST.
+vector_store: Optional[VectorSnapshot] = None
+vector_compaction: Optional[asyncio.Task] = None
+vector_index_build: Optional[asyncio.Task] = None
+# Vectors uploaded while the snapshot is being built or opened; applied once it is
+pending_vectors: Optional[List[Any]] = None
+
+def parse_embedding(value: Any) -> Optional[List[float]]:
+    # PostgREST returns pgvector columns as their text form, e.g. "[0.1,0.2]"
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value or None
+
+async def fetch_vector_rows(page_size: int = 1000) -> List[Any]:
+    headers = {
+        "apikey": SUPABASE_SERVICE_ROLE_KEY,
+        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+    }
+    rows: List[Any] = []
+    last_id = None
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        while True:
+            url = f"{SUPABASE_URL}/rest/v1/candidates?select=id,embedding&embedding=not.is.null&order=id&limit={page_size}"
+            if last_id:
+                url += f"&id=gt.{last_id}"
+            response = await client.get(url, headers=headers)
+            response.raise_for_status()
+            page = response.json()
+            if not page:
+                return rows
+            rows.extend((str(row["id"]), parse_embedding(row["embedding"])) for row in page if row.get("embedding"))
+            last_id = page[-1]["id"]
+
+async def build_vector_snapshot():
+    """Build the snapshot from the candidates table, or open the one another worker just built.
+
+    Workers sharing VECTOR_SNAPSHOT_DIR take the build lock in turn, so only
+    the first one writes the snapshot.
+    """
+    global vector_store, pending_vectors
+    lock_file = await asyncio.to_thread(acquire_build_lock, VECTOR_SNAPSHOT_DIR)
+    try:
+        if not VectorSnapshot.exists(VECTOR_SNAPSHOT_DIR):
+            rows = await fetch_vector_rows()
+            count = await asyncio.to_thread(write_snapshot, VECTOR_SNAPSHOT_DIR, rows, 384)
+            logger.info("Vector snapshot built", extra={"fields": {"candidates": count}})
+        store = await asyncio.to_thread(VectorSnapshot, VECTOR_SNAPSHOT_DIR)
+    except Exception as e:
+        logger.error("Error building vector snapshot", extra={"fields": {"error": str(e)}})
+        pending_vectors = None
+        return
+    finally:
+        lock_file.close()
+    # Uploads that landed during the build may be missing from the rows read
+    # above; upserting them again is harmless
+    while pending_vectors:
+        candidate_id, embedding = pending_vectors.pop(0)
+        try:
+            await asyncio.to_thread(store.upsert, candidate_id, embedding)
+        except Exception as e:
+            logger.error("Error appending to vector snapshot", extra={"fields": {"candidate_id": candidate_id, "error": str(e)}})
+    pending_vectors = None
+    vector_store = store
+    logger.info("Vector snapshot opened", extra={"fields": {
+        "generation": vector_store.generation,
+        "snapshot": vector_store.snapshot_count,
+        "delta": vector_store.delta_count,
+    }})
+    ensure_vector_index()
+
+async def build_vector_index():
+    """Train the IVF index for the current snapshot generation; exact search serves until it is ready."""
+    if not VECTOR_SEARCH_IVF or vector_store is None:
+        return
+    try:
+        index = await asyncio.to_thread(vector_store.build_index)
+    except Exception as e:
+        logger.error("Error building IVF index", extra={"fields": {"error": str(e)}})
+        return
+    if index is not None:
+        logger.info("IVF index built", extra={"fields": {
+            "generation": vector_store.generation,
+            "vectors": len(index),
+            "lists": len(index.centroids),
+            "bytes": index.nbytes,
+        }})
+
+def ensure_vector_index() -> None:
+    """Start an IVF build unless one is running or the index is current.
+
+    A compaction (here or in another process sharing the snapshot) starts a
+    new generation without an index, so searches call this too.
+    """
+    global vector_index_build
+    if not VECTOR_SEARCH_IVF or vector_store is None or vector_store.index is not None:
+        return
+    if vector_index_build is None or vector_index_build.done():
+        vector_index_build = asyncio.create_task(build_vector_index())
+
+async def compact_vector_store():
+    await asyncio.to_thread(vector_store.compact)
+    ensure_vector_index()
+
+@app.on_event("startup")
+async def open_vector_snapshot():
+    global vector_store, pending_vectors
+    if not LOCAL_VECTOR_SEARCH:
+        return
+    if VectorSnapshot.exists(VECTOR_SNAPSHOT_DIR):
+        vector_store = VectorSnapshot(VECTOR_SNAPSHOT_DIR)
+        logger.info("Vector snapshot opened", extra={"fields": {
+            "generation": vector_store.generation,
+            "snapshot": vector_store.snapshot_count,
+            "delta": vector_store.delta_count,
+        }})
+        ensure_vector_index()
+    else:
+        # Searches use match_candidates until the snapshot is ready
+        pending_vectors = []
+        asyncio.create_task(build_vector_snapshot())
+
+async def record_vector(candidate_id: str, embedding: List[float]) -> None:
+    """Append a new candidate's embedding to the local snapshot, compacting when the delta log grows."""
+    global vector_compaction
+    if vector_store is None:
+        if pending_vectors is not None:
+            pending_vectors.append((candidate_id, embedding))
+        return
+    try:
+        # Off the loop: upsert waits on the snapshot locks while a compaction runs
+        await asyncio.to_thread(vector_store.upsert, candidate_id, embedding)
+    except Exception as e:
+        logger.error("Error appending to vector snapshot", extra={"fields": {"candidate_id": candidate_id, "error": str(e)}})
+        return
+    if vector_store.delta_count >= VECTOR_DELTA_COMPACT_AT and (vector_compaction is None or vector_compaction.done()):
+        vector_compaction = asyncio.create_task(compact_vector_store())
+
+# Write-behind buffer: concurrent candidate inserts and ai_summary patches
+# share multi-row PostgREST requests
+candidate_writes = WriteBehindBuffer(SUPABASE_URL, {
+    "apikey": SUPABASE_SERVICE_ROLE_KEY,
+    "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+})
+
+@app.on_event("startup")
+async def start_candidate_writes():
+    candidate_writes.start()
+
+@app.on_event("shutdown")
+async def flush_candidate_writes():
+    await candidate_writes.stop()
+
+# Read-through catalog of candidate rows, filled on insert and on first read.
+# Invalidations go through shared memory so every serve.py worker drops the row.
+candidate_catalog = CandidateCatalog(max_entries=CATALOG_MAX_ENTRIES, ttl_seconds=CATALOG_TTL_S, spill_path=CATALOG_SPILL_PATH,
+                                     invalidations=InvalidationLog())
+
+async def read_candidate(candidate_id: str, columns: List[str]) -> Optional[Dict[str, Any]]:
+    """Projected candidate columns from the local catalog, else from PostgREST.
+
+    Returns None if the candidate does not exist; HTTP errors propagate.
+    """
+    cached = candidate_catalog.get(candidate_id, columns)
+    if cached is not None:
+        CATALOG_CACHE_TOTAL.inc(result="hit")
+        return cached
+    CATALOG_CACHE_TOTAL.inc(result="miss")
+
+    fetch_url = f"{SUPABASE_URL}/rest/v1/candidates"
+    params = {"id": f"eq.{candidate_id}", "select": ",".join(columns)}
+    headers = {
+        "apikey": SUPABASE_SERVICE_ROLE_KEY,
+        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+    }
+    async with httpx.AsyncClient() as client:
+        with track_stage("db_read"):
+            response = await client.get(fetch_url, params=params, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+    if not data:
+        return None
+    candidate_catalog.put(candidate_id, data[0])
+    return data[0]
+
 # Response models
 class Candidate(BaseModel):
+    # Only the projected columns are set; unset ones are left out of responses
     id: str
-    name: str
+    name: Optional[str] = None
+    email: Optional[str] = None
     current_title: Optional[str] = None
     location: Optional[str] = None
     work_auth: Optional[str] = None
     years_exp: Optional[float] = None
+    skills: Optional[List[str]] = None
     resume_url: Optional[str] = None
-    similarity: float
+    ai_summary: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    similarity: Optional[float] = None
 
 class SearchResponse(BaseModel):
     candidates: List[Candidate]
+    next_cursor: Optional[str] = None
     message: Optional[str] = None
 
+class CandidateListResponse(BaseModel):
+    candidates: List[Candidate]
+    next_cursor: Optional[str] = None
+
+class ExportRequest(BaseModel):
+    format: str = "csv"
+    fields: Optional[str] = None
+    ids: Optional[List[str]] = None
+    query: Optional[str] = None
+    match_threshold: float = 0.1
+
 class ResumeUploadResponse(BaseModel):
     candidate_id: str
     name: str
@@ -98,6 +477,7 @@ class ResumeUploadResponse(BaseModel):
     location: Optional[str] = None
     skills: List[str] = []
     years_exp: Optional[float] = None
+    duplicate_of: Optional[str] = None
     message: str = "Resume uploaded and processed successfully"
 
 class AISummaryResponse(BaseModel):
@@ -118,24 +498,37 @@ COMMON_SKILLS = [
 # Helper utility functions for resume parsing
 def extract_text_from_pdf(pdf_bytes):
     """Extract text from a PDF file byte stream."""
+    # Time-budgeted engine cascade with cancellation (see backend/routers/resume_parser.py)
+    return extract_pdf_text_budgeted(pdf_bytes)
+
+def extract_text_from_docx(file_bytes: bytes) -> str:
     try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = "\n".join(page.get_text() for page in doc)
-        if text.strip():
-            return text
+        # Stream paragraphs and table cells straight from word/document.xml
+        return extract_docx_text(file_bytes)
     except Exception:
         pass
-    return ""
-
-def extract_text_from_docx(file_bytes: bytes) -> str:
     try:
-        # Use mammoth to extract text from DOCX
+        # Fall back to mammoth to extract text from DOCX
         result = mammoth.extract_raw_text(file_bytes)
         text = result.value
         return text
     except Exception:
         return ""
 
+def parse_with_pyresparser(file_bytes: bytes, suffix: str = ".pdf") -> Dict[str, Any]:
+    """pyresparser needs a file path; blocking, so call it via asyncio.to_thread."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        tmp_file.write(file_bytes)
+        tmp_path = tmp_file.name
+    try:
+        return ResumeParser(tmp_path).get_extracted_data()
+    finally:
+        os.remove(tmp_path)
+
+# Extraction and parsing below run in worker threads (asyncio.to_thread): they
+# are CPU-bound, and on the event loop they would stall the read and llm
+# classes behind ingest no matter what the admission limits say.
+
 @app.post("/api/resume/parse_from_bucket")
 async def parse_resumes_from_bucket(filenames: list[str] = Body(...)):
     SUPABASE_URL = os.getenv("VITE_SUPABASE_URL")
@@ -147,54 +540,74 @@ async def parse_resumes_from_bucket(filenames: list[str] = Body(...)):
         ext = filename.split(".")[-1].lower()
         file_url = f"{SUPABASE_URL}/storage/v1/object/{bucket}/resumes/{filename}"
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(file_url, headers={
-                    "apikey": SUPABASE_SERVICE_ROLE_KEY,
-                    "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
-                })
-                if resp.status_code != 200:
-                    parsed_results.append({"filename": filename, "error": f"Download failed: {resp.text}"})
-                    continue
-                file_bytes = resp.content
+            with track_stage("download"):
+                async with httpx.AsyncClient() as client:
+                    resp = await client.get(file_url, headers={
+                        "apikey": SUPABASE_SERVICE_ROLE_KEY,
+                        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+                    })
+            if resp.status_code != 200:
+                parsed_results.append({"filename": filename, "error": f"Download failed: {resp.text}"})
+                continue
+            file_bytes = resp.content
         except Exception as e:
             parsed_results.append({"filename": filename, "error": str(e)})
             continue
         try:
             fields = None
             if ext == "pdf":
-                # Try pyresparser first
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                    tmp_file.write(file_bytes)
-                    tmp_path = tmp_file.name
+                # Fast path first: text extraction + regex parser, scored by completeness
+                with track_stage("extract"):
+                    text = await asyncio.to_thread(extract_text_from_pdf, file_bytes)
+                fast_fields, fast_error = None, None
+                if text.strip():
+                    try:
+                        with track_stage("parse"):
+                            fast_fields = await asyncio.to_thread(extract_fields, text)
+                    except Exception as e:
+                        fast_error = e
+                confidence = score_fields(fast_fields)
+                if fast_fields and confidence >= PARSER_CONFIDENCE_THRESHOLD:
+                    PARSER_CASCADE_TOTAL.inc(stage="fast", result="accepted")
+                    parsed_results.append({"filename": filename, "fields": fast_fields, "parser": "fast", "confidence": confidence})
+                    continue
+                PARSER_CASCADE_TOTAL.inc(stage="fast", result="error" if fast_error else "low_confidence")
+
+                # Low confidence: run the NLP parser (pyresparser)
                 try:
-                    parser = ResumeParser(tmp_path)
-                    parsed_data = parser.get_extracted_data()
+                    with track_stage("parse"):
+                        parsed_data = await asyncio.to_thread(parse_with_pyresparser, file_bytes)
                     # If pyresparser returns at least a name or email, use it
                     if parsed_data and (parsed_data.get("name") or parsed_data.get("email")):
                         fields = parsed_data
+                        PARSER_CASCADE_TOTAL.inc(stage="nlp", result="accepted")
                     else:
-                        fields = None
+                        PARSER_CASCADE_TOTAL.inc(stage="nlp", result="rejected")
                 except Exception as e:
-                    fields = None
-                finally:
-                    os.remove(tmp_path)
-                # Fallback to PyMuPDF/pdfplumber logic if pyresparser fails
-                if not fields:
-                    text = extract_text_from_pdf(file_bytes)
-                    if not text.strip():
-                        parsed_results.append({"filename": filename, "error": "No extractable text found"})
-                        continue
-                    fields = extract_fields(text)
+                    PARSER_CASCADE_TOTAL.inc(stage="nlp", result="error")
+                if fields:
+                    parsed_results.append({"filename": filename, "fields": fields, "parser": "pyresparser", "confidence": confidence})
+                    continue
+                # Neither parser is confident; keep the fast result if there is one
+                if fast_fields:
+                    parsed_results.append({"filename": filename, "fields": fast_fields, "parser": "fast", "confidence": confidence})
+                elif fast_error:
+                    parsed_results.append({"filename": filename, "error": str(fast_error)})
+                else:
+                    parsed_results.append({"filename": filename, "error": "No extractable text found"})
+                continue
             elif ext in ("doc", "docx"):
-                text = extract_text_from_docx(file_bytes)
+                with track_stage("extract"):
+                    text = await asyncio.to_thread(extract_text_from_docx, file_bytes)
                 if not text.strip():
                     parsed_results.append({"filename": filename, "error": "No extractable text found"})
                     continue
-                fields = extract_fields(text)
+                with track_stage("parse"):
+                    fields = await asyncio.to_thread(extract_fields, text)
             else:
                 parsed_results.append({"filename": filename, "error": "Unsupported file type"})
                 continue
-            parsed_results.append({"filename": filename, "fields": fields})
+            parsed_results.append({"filename": filename, "fields": fields, "parser": "fast", "confidence": score_fields(fields)})
         except Exception as e:
             parsed_results.append({"filename": filename, "error": str(e)})
     return parsed_results
@@ -204,82 +617,111 @@ async def upload_resume(
     file: UploadFile = File(...),
     extracted_text: str = Form(None)
 ):
+    reservation = None
+    inserted_candidate_id_from_db = None
     try:
-        print(f"Processing file: {file.filename}")
+        logger.info("Processing file", extra={"fields": {"upload_filename": file.filename}})
         # Read file content
         file_bytes = await file.read()
         
         # Generate a unique filename
         file_hash = hashlib.md5(file_bytes).hexdigest()
         filename = f"{file_hash}.{file.filename.split('.')[-1]}"
-        print(f"Generated filename: {filename}")
+        logger.debug("Generated filename", extra={"fields": {"stored_filename": filename}})
         
-        # Store in Supabase
-        bucket_path = f"resumes/{filename}"
-        headers = {
-            "apikey": SUPABASE_SERVICE_ROLE_KEY,
-            "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
-        }
-        
-        # Upload to Supabase Storage
-        upload_url = f"{SUPABASE_URL}/storage/v1/object/candidate-resumes/{bucket_path}"
-        
-        # Set the correct Content-Type based on file extension
-        content_type = "application/pdf" if file.filename.lower().endswith('.pdf') else \
-                      "application/vnd.openxmlformats-officedocument.wordprocessingml.document" if file.filename.lower().endswith('.docx') else \
-                      "application/msword" if file.filename.lower().endswith('.doc') else \
-                      "application/octet-stream"
-        
-        headers["Content-Type"] = content_type
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                upload_url,
-                content=file_bytes,
-                headers=headers
-            )
-            
-            if response.status_code != 200:
-                print(f"Supabase upload failed: {response.text}")
-                #raise HTTPException(status_code=500, detail=f"Failed to upload file to storage: {response.text}")
-
         # Use pre-extracted text from Gemini if available
         text = None
         if extracted_text:
-            print("Using pre-extracted text from Gemini")
+            logger.debug("Using pre-extracted text from Gemini")
             text = extracted_text
         else:
             # Extract text based on file type
             if file.filename.lower().endswith('.pdf'):
-                print("Extracting text from PDF")
+                logger.debug("Extracting text from PDF")
                 try:
-                    text = extract_text_from_pdf(file_bytes)
-                    print(f"Extracted text length: {len(text) if text else 0}")
+                    with track_stage("extract"):
+                        text = await asyncio.to_thread(extract_text_from_pdf, file_bytes)
+                    logger.debug("Extracted text", extra={"fields": {"text_length": len(text) if text else 0}})
                 except Exception as e:
-                    print(f"PDF extraction error: {str(e)}")
+                    logger.error("PDF extraction error", extra={"fields": {"error": str(e)}})
                     raise HTTPException(status_code=500, detail=f"Error extracting text from PDF: {str(e)}")
             elif file.filename.lower().endswith(('.doc', '.docx')):
-                print("Extracting text from DOCX")
+                logger.debug("Extracting text from DOCX")
                 try:
-                    text = extract_text_from_docx(file_bytes)
-                    print(f"Extracted text length: {len(text) if text else 0}")
+                    with track_stage("extract"):
+                        text = await asyncio.to_thread(extract_text_from_docx, file_bytes)
+                    logger.debug("Extracted text", extra={"fields": {"text_length": len(text) if text else 0}})
                 except Exception as e:
-                    print(f"DOCX extraction error: {str(e)}")
+                    logger.error("DOCX extraction error", extra={"fields": {"error": str(e)}})
                     raise HTTPException(status_code=500, detail=f"Error extracting text from DOCX: {str(e)}")
             else:
                 raise HTTPException(status_code=400, detail="Unsupported file type. Please upload PDF or DOCX files only.")
         
         if not text:
             raise HTTPException(status_code=422, detail="Could not extract text from resume")
+
+        # Near-duplicate check: the same resume in another format or with small
+        # edits maps to an existing candidate instead of a new row
+        with track_stage("dedup"):
+            signature = await asyncio.to_thread(minhash_signature, text)
+            # Reserve the signature before inserting so a concurrent upload of
+            # the same resume in this worker is caught too
+            reservation = f"pending:{uuid.uuid4().hex}"
+            duplicate = dedup_index.find_or_reserve(signature, reservation)
+            if duplicate is None:
+                pending_dedup_inserts[reservation] = asyncio.get_running_loop().create_future()
+            else:
+                reservation = None
+                if duplicate[0] in pending_dedup_inserts:
+                    # The original is still being inserted; wait for its id
+                    original_id = await asyncio.shield(pending_dedup_inserts[duplicate[0]])
+                    duplicate = (original_id, duplicate[1]) if original_id else None
+
+        # Start embedding now so it overlaps the storage upload and parse
+        raw_text = text[:MAX_RAW_TEXT_LENGTH]
+        embedding_task = None
+        if INLINE_EMBEDDING and not duplicate:
+            embedding_task = asyncio.create_task(embed_candidate_text(raw_text))
+        
+        # Store in Supabase (skipped for near-duplicates, the original file is already stored)
+        bucket_path = f"resumes/{filename}"
+        headers = {
+            "apikey": SUPABASE_SERVICE_ROLE_KEY,
+            "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+        }
+        
+        # Upload to Supabase Storage
+        upload_url = f"{SUPABASE_URL}/storage/v1/object/candidate-resumes/{bucket_path}"
+        
+        # Set the correct Content-Type based on file extension
+        content_type = "application/pdf" if file.filename.lower().endswith('.pdf') else \
+                      "application/vnd.openxmlformats-officedocument.wordprocessingml.document" if file.filename.lower().endswith('.docx') else \
+                      "application/msword" if file.filename.lower().endswith('.doc') else \
+                      "application/octet-stream"
         
+        headers["Content-Type"] = content_type
+        
+        if not duplicate:
+            with track_stage("storage_upload"):
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(
+                        upload_url,
+                        content=file_bytes,
+                        headers=headers
+                    )
+                
+            if response.status_code != 200:
+                logger.warning("Supabase upload failed", extra={"fields": {"status": response.status_code, "response": response.text}})
+                #raise HTTPException(status_code=500, detail=f"Failed to upload file to storage: {response.text}")
+
         # Parse resume text using the extract_fields function
-        print("Parsing extracted text")
         try:
             # from backend.routers.resume_parser import extract_fields # Already imported at the top
-            parsed_fields = extract_fields(text) if text else {}
-            print(f"Initial Parsed fields: {parsed_fields}") # Log initial parse
+            with track_stage("parse"):
+                parsed_fields = await asyncio.to_thread(extract_fields, text) if text else {}
+            logger.debug("Initial parsed fields", extra={"fields": {"parsed": parsed_fields}, "sample_rate": LOG_PAYLOAD_SAMPLE_RATE})
         except Exception as e:
-            print(f"Resume parsing error: {str(e)}")
+            logger.error("Resume parsing error", extra={"fields": {"error": str(e)}})
             # Fallback to empty dict if parsing fails, to allow default values to be set
             parsed_fields = {}
             # raise HTTPException(status_code=500, detail=f"Error parsing resume text: {str(e)}") # Optionally re-raise
@@ -296,7 +738,22 @@ async def upload_resume(
                 "hard_skills": parsed_fields.get("hard_skills", []),
                 "years_exp": parsed_fields.get("years_exp"),
             }
-            print(f"Refined/Fallback parsed_fields: {parsed_fields}")
+            logger.debug("Refined/fallback parsed fields", extra={"fields": {"parsed": parsed_fields}, "sample_rate": LOG_PAYLOAD_SAMPLE_RATE})
+
+        if duplicate:
+            duplicate_id, similarity = duplicate
+            logger.info("Near-duplicate upload, skipping insert", extra={"fields": {"duplicate_of": duplicate_id, "similarity": round(similarity, 2)}})
+            return ResumeUploadResponse(
+                candidate_id=duplicate_id,
+                name=parsed_fields.get("name", ""),
+                email=parsed_fields.get("email", ""),
+                current_title=parsed_fields.get("current_title", ""),
+                location=parsed_fields.get("location", ""),
+                skills=parsed_fields.get("hard_skills", []),
+                years_exp=float(parsed_fields.get("years_exp")) if parsed_fields.get("years_exp") else None,
+                duplicate_of=duplicate_id,
+                message="Resume matches an existing candidate; no new record was created",
+            )
 
         # Prepare candidate data for database insertion
         # Explicitly handle current_title to ensure it's never None or empty if the column is NOT NULL
@@ -320,14 +777,12 @@ async def upload_resume(
             try:
                 years_exp_to_insert = float(str(years_exp_val).strip())
             except ValueError:
-                print(f"Could not convert years_exp '{years_exp_val}' to float. Setting to None.")
+                logger.warning("Could not convert years_exp to float, setting to None", extra={"fields": {"years_exp": years_exp_val}})
                 # If years_exp is NOT NULL in DB, you might want to default to 0 here:
                 # years_exp_to_insert = 0 
         # else: # If years_exp is NOT NULL and must have a value
             # years_exp_to_insert = 0 
 
-        MAX_RAW_TEXT_LENGTH = 20000 # Define if not already defined globally
-
         candidate_data_to_insert = {
             "name": parsed_fields.get("name"),
             "email": parsed_fields.get("email"),
@@ -336,47 +791,39 @@ async def upload_resume(
             "skills": parsed_fields.get("hard_skills", []),
             "years_exp": years_exp_to_insert,
             "resume_url": f"{SUPABASE_URL}/storage/v1/object/public/candidate-resumes/{bucket_path}", # Assuming public bucket
-            "raw_text": text[:MAX_RAW_TEXT_LENGTH] if text else None
+            "raw_text": raw_text if text else None
         }
+        if embedding_task is not None:
+            embedding = await embedding_task
+            if embedding is not None:
+                candidate_data_to_insert["embedding"] = embedding
         
         # This line, if active, removes keys where the value is None.
         # candidate_data_to_insert = {k: v for k, v in candidate_data_to_insert.items() if v is not None}
         # For now, let Supabase handle nulls for nullable columns.
 
-        print(f"Data to insert into DB: {json.dumps(candidate_data_to_insert, indent=2)}") # Log data before DB insert
-
-        # Insert into Supabase 'candidates' table
-        db_insert_url = f"{SUPABASE_URL}/rest/v1/candidates"
-        db_headers = {
-            "apikey": SUPABASE_SERVICE_ROLE_KEY,
-            "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
-            "Content-Type": "application/json",
-            "Prefer": "return=representation"  # To get the inserted row back
-        }
-        
-        inserted_candidate_id_from_db = None
-        async with httpx.AsyncClient() as client:
-            try:
-                db_response = await client.post(
-                    db_insert_url,
-                    json=candidate_data_to_insert,
-                    headers=db_headers
-                )
-                db_response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-                
-                if db_response.status_code == 201:  # HTTP 201 Created
-                    inserted_data = db_response.json()
-                    if inserted_data and len(inserted_data) > 0:
-                        inserted_candidate_id_from_db = inserted_data[0].get("id")
-                    print(f"Successfully inserted candidate into DB. DB ID: {inserted_candidate_id_from_db}")
-                else:
-                    print(f"Failed to insert candidate into DB (Status: {db_response.status_code}): {db_response.text}")
-                    # Not raising an error here, will return filename as candidate_id as fallback
+        # Bulky payload (raw_text): sampled and truncated by the logging layer
+        logger.debug("Data to insert into DB", extra={"fields": {"candidate": candidate_data_to_insert}, "sample_rate": LOG_PAYLOAD_SAMPLE_RATE})
 
-            except httpx.HTTPStatusError as e:
-                print(f"HTTP error inserting candidate into DB: {e.response.status_code} - {e.response.text}")
-            except Exception as e:
-                print(f"Generic error inserting candidate into DB: {str(e)}")
+        # Insert into Supabase 'candidates' table (batched with concurrent uploads)
+        try:
+            with track_stage("db_write"):
+                inserted_row = await candidate_writes.insert(candidate_data_to_insert)
+            inserted_candidate_id_from_db = inserted_row.get("id")
+            if inserted_candidate_id_from_db:
+                dedup_index.add(str(inserted_candidate_id_from_db), signature)
+                if candidate_data_to_insert.get("embedding"):
+                    await record_vector(str(inserted_candidate_id_from_db), candidate_data_to_insert["embedding"])
+                candidate_catalog.put(str(inserted_candidate_id_from_db), {
+                    k: v for k, v in candidate_data_to_insert.items() if k != "embedding"
+                })
+            catalog_generation.bump()
+            logger.info("Inserted candidate into DB", extra={"fields": {"candidate_id": inserted_candidate_id_from_db}})
+        except httpx.HTTPStatusError as e:
+            # Not raising an error here, will return filename as candidate_id as fallback
+            logger.error("HTTP error inserting candidate into DB", extra={"fields": {"status": e.response.status_code, "response": e.response.text}})
+        except Exception as e:
+            logger.error("Generic error inserting candidate into DB", extra={"fields": {"error": str(e)}})
 
         # Return parsed information
         return ResumeUploadResponse(
@@ -390,20 +837,32 @@ async def upload_resume(
         )
         
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.exception("Unexpected error processing resume")
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+    finally:
+        if reservation is not None:
+            # The real id (added after the insert) replaces the reservation
+            release_dedup_reservation(reservation, str(inserted_candidate_id_from_db) if inserted_candidate_id_from_db else None)
 
 async def generate_text_summary_with_gemini(text_to_summarize: str) -> Optional[str]:
     if not GEMINI_API_KEY:
-        print("GEMINI_API_KEY not configured for backend summary generation.")
+        logger.warning("GEMINI_API_KEY not configured for backend summary generation")
         return None
     
     # This is a generic endpoint, replace with the actual one for your Gemini model
     # e.g., "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
-    gemini_api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={GEMINI_API_KEY}"
+    gemini_api_url = f"{GEMINI_API_BASE}/v1beta/models/gemini-pro:generateContent?key={GEMINI_API_KEY}"
     
+    # Keep the most informative lines within the input token budget instead of a blind prefix
+    with track_stage("prompt_compression"):
+        extract = await asyncio.to_thread(compress_resume, text_to_summarize, SUMMARY_INPUT_TOKEN_BUDGET)
+    logger.debug("Compressed resume for summary", extra={"fields": {
+        "input_tokens": estimate_tokens(text_to_summarize),
+        "prompt_tokens": estimate_tokens(extract),
+    }})
+
     # Construct the prompt carefully
-    prompt = f"Summarize the following resume text, focusing on key skills, experience, and overall fit. Provide a concise summary suitable for a recruiter: \n\n{text_to_summarize[:4000]}" # Limit input text length
+    prompt = f"Summarize the following resume extract, focusing on key skills, experience, and overall fit. Provide a concise summary suitable for a recruiter: \n\n{extract}"
     
     payload = {
         "contents": [{
@@ -419,8 +878,9 @@ async def generate_text_summary_with_gemini(text_to_summarize: str) -> Optional[
     
     async with httpx.AsyncClient(timeout=30.0) as client:
         try:
-            response = await client.post(gemini_api_url, json=payload)
-            response.raise_for_status() # Raise an exception for HTTP errors
+            with track_stage("llm_call"):
+                response = await client.post(gemini_api_url, json=payload)
+                response.raise_for_status() # Raise an exception for HTTP errors
             result = response.json()
             
             # Extract the summary text - structure depends on Gemini API response
@@ -429,39 +889,33 @@ async def generate_text_summary_with_gemini(text_to_summarize: str) -> Optional[
                 summary = result["candidates"][0]["content"]["parts"][0]["text"]
                 return summary.strip()
             else:
-                print(f"Unexpected Gemini API response structure: {result}")
+                logger.error("Unexpected Gemini API response structure", extra={"fields": {"response": result}})
                 return None
         except httpx.HTTPStatusError as e:
-            print(f"Gemini API HTTP error: {e.response.status_code} - {e.response.text}")
+            logger.error("Gemini API HTTP error", extra={"fields": {"status": e.response.status_code, "response": e.response.text}})
             return None
         except Exception as e:
-            print(f"Error calling Gemini API: {str(e)}")
+            logger.error("Error calling Gemini API", extra={"fields": {"error": str(e)}})
             return None
 
 @app.post("/api/candidate/{candidate_id}/generate_summary", response_model=AISummaryResponse)
 async def generate_ai_summary(candidate_id: str):
-    # 1. Fetch raw_text from Supabase
-    fetch_url = f"{SUPABASE_URL}/rest/v1/candidates?id=eq.{candidate_id}&select=raw_text"
-    headers = {
-        "apikey": SUPABASE_SERVICE_ROLE_KEY,
-        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
-    }
+    # 1. Fetch raw_text (local catalog first, then Supabase)
     raw_text = None
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(fetch_url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if data and len(data) > 0 and data[0].get("raw_text"):
-                raw_text = data[0]["raw_text"]
-            else:
-                raise HTTPException(status_code=404, detail="Candidate or raw text not found")
-        except httpx.HTTPStatusError as e:
-            print(f"Error fetching raw_text: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(status_code=e.response.status_code, detail="Failed to fetch candidate data")
-        except Exception as e:
-            print(f"Generic error fetching raw_text: {str(e)}")
-            raise HTTPException(status_code=500, detail="Server error fetching candidate data")
+    try:
+        data = await read_candidate(candidate_id, ["raw_text"])
+        if data and data.get("raw_text"):
+            raw_text = data["raw_text"]
+        else:
+            raise HTTPException(status_code=404, detail="Candidate or raw text not found")
+    except httpx.HTTPStatusError as e:
+        logger.error("Error fetching raw_text", extra={"fields": {"candidate_id": candidate_id, "status": e.response.status_code, "response": e.response.text}})
+        raise HTTPException(status_code=e.response.status_code, detail="Failed to fetch candidate data")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Generic error fetching raw_text", extra={"fields": {"candidate_id": candidate_id, "error": str(e)}})
+        raise HTTPException(status_code=500, detail="Server error fetching candidate data")
 
     if not raw_text:
         raise HTTPException(status_code=404, detail="Raw text not found for candidate")
@@ -471,29 +925,388 @@ async def generate_ai_summary(candidate_id: str):
     if not generated_summary:
         raise HTTPException(status_code=500, detail="Failed to generate AI summary")
 
-    # 3. Update ai_summary in Supabase
-    update_url = f"{SUPABASE_URL}/rest/v1/candidates?id=eq.{candidate_id}"
-    update_payload = {"ai_summary": generated_summary}
-    db_headers = {
+    # 3. Update ai_summary in Supabase (batched with concurrent writes)
+    try:
+        with track_stage("db_write"):
+            await candidate_writes.patch(candidate_id, {"ai_summary": generated_summary})
+        candidate_catalog.invalidate(candidate_id)
+        # Cached search pages carry ai_summary too
+        catalog_generation.bump()
+        logger.info("Updated ai_summary", extra={"fields": {"candidate_id": candidate_id}})
+    except httpx.HTTPStatusError as e:
+        logger.error("Error updating ai_summary", extra={"fields": {"candidate_id": candidate_id, "status": e.response.status_code, "response": e.response.text}})
+        # Not raising HTTPException here, as summary was generated, but DB update failed.
+        # Frontend will still get the summary, but it won't be persisted if this fails.
+        # Consider how to handle this - maybe return summary but with a warning.
+    except Exception as e:
+        logger.error("Generic error updating ai_summary", extra={"fields": {"candidate_id": candidate_id, "error": str(e)}})
+
+    return AISummaryResponse(ai_summary=generated_summary)
+
+async def fetch_candidates_by_id(client: httpx.AsyncClient, ids: List[str], columns: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch the projected columns for a set of candidate ids, keyed by id.
+
+    Ids are sent ID_FETCH_CHUNK at a time (concurrently), since each one adds
+    about 40 bytes to the request URL.
+    """
+    if not ids:
+        return {}
+    headers = {
+        "apikey": SUPABASE_SERVICE_ROLE_KEY,
+        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+    }
+
+    async def fetch_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+        params = {"select": ",".join(columns), "id": in_filter(chunk)}
+        response = await client.get(f"{SUPABASE_URL}/rest/v1/candidates", params=params, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    with track_stage("db_read"):
+        chunks = await asyncio.gather(*(fetch_chunk(ids[i:i + ID_FETCH_CHUNK]) for i in range(0, len(ids), ID_FETCH_CHUNK)))
+    return {str(row["id"]): row for rows in chunks for row in rows}
+
+async def rank_candidates(query_embedding: List[float], match_threshold: float,
+                          match_count: int = SEARCH_SNAPSHOT_SIZE) -> List[List[Any]]:
+    """Ranked [id, similarity] pairs, without row data.
+
+    Served from the local vector snapshot when LOCAL_VECTOR_SEARCH is on and
+    the snapshot is open (approximately, via IVF, with VECTOR_SEARCH_IVF),
+    otherwise from match_candidates.
+    """
+    if vector_store is not None:
+        with track_stage("vector_search"):
+            ranked = await asyncio.to_thread(vector_store.search, query_embedding, match_count, match_threshold)
+        ensure_vector_index()
+        return ranked
+    rpc_url = f"{SUPABASE_URL}/rest/v1/rpc/match_candidates?select=id,similarity"
+    headers = {
         "apikey": SUPABASE_SERVICE_ROLE_KEY,
         "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal" # Or "representation" if you want the updated row back
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "query_embedding": query_embedding,
+        "match_threshold": match_threshold,
+        "match_count": match_count
     }
     async with httpx.AsyncClient() as client:
+        with track_stage("db_read"):
+            response = await client.post(rpc_url, json=payload, headers=headers)
+        response.raise_for_status()
+        return [[str(row["id"]), row["similarity"]] for row in response.json()]
+
+@app.get("/api/search", response_model=SearchResponse, response_model_exclude_unset=True)
+async def search_candidates(
+    query: Optional[str] = Query(None),
+    match_count: int = Query(10, ge=1, le=100),
+    match_threshold: float = Query(0.1, ge=-1.0, le=1.0),
+    fields: Optional[str] = Query(None, description="Comma-separated candidate columns to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    """Semantic search over candidate embeddings via the match_candidates function.
+
+    The first page ranks up to SEARCH_SNAPSHOT_SIZE candidates and keeps the
+    ranked ids as a snapshot; next_cursor pages through that snapshot, so
+    later pages never re-run the search and never repeat or skip rows.
+    """
+    if cursor:
         try:
-            response = await client.patch(update_url, json=update_payload, headers=db_headers)
+            state = decode_cursor(cursor)
+            snapshot_id, offset = state["s"], int(state["o"])
+            match_count, columns = int(state["n"]), parse_fields(",".join(state["f"]), SEARCH_DEFAULT_FIELDS)
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if not 1 <= match_count <= 100 or offset < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        ranked = await asyncio.to_thread(search_snapshots.get, str(snapshot_id))
+        if ranked is None:
+            raise HTTPException(status_code=410, detail="Search session expired; run the search again")
+        return await search_page(snapshot_id, ranked, offset, match_count, columns)
+
+    normalized = normalize_query(query or "")
+    if not normalized:
+        raise HTTPException(status_code=400, detail="Search query is required and must be a non-empty string.")
+    try:
+        columns = parse_fields(fields, SEARCH_DEFAULT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cache_key = (normalized, round(match_threshold, 4), match_count, tuple(columns))
+    # Read the generation before querying so a write that lands mid-query
+    # leaves this result already stale in the cache
+    generation = catalog_generation.value
+    cached = search_cache.get(cache_key, generation)
+    # A cached first page is only usable while its snapshot is, or its
+    # next_cursor would answer 410; touching it also keeps it from expiring
+    if cached is not None and (cached[1].next_cursor is None or await asyncio.to_thread(search_snapshots.touch, cached[0])):
+        SEARCH_CACHE_TOTAL.inc(result="hit")
+        return cached[1]
+    SEARCH_CACHE_TOTAL.inc(result="miss")
+
+    try:
+        with track_stage("embedding"):
+            query_embedding = await embedding_batcher.embed(normalized, store=False)
+    except Exception as e:
+        logger.error("Error embedding search query", extra={"fields": {"error": str(e)}})
+        raise HTTPException(status_code=500, detail="Failed to generate embedding for the query.")
+
+    try:
+        ranked = await rank_candidates(query_embedding, match_threshold)
+    except httpx.HTTPStatusError as e:
+        logger.error("match_candidates RPC failed", extra={"fields": {"status": e.response.status_code, "response": e.response.text}})
+        raise HTTPException(status_code=500, detail=f"Database error: {e.response.text}")
+    except Exception as e:
+        logger.error("Error calling match_candidates", extra={"fields": {"error": str(e)}})
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    snapshot_id = uuid.uuid4().hex
+    await asyncio.to_thread(search_snapshots.put, snapshot_id, ranked)
+    result = await search_page(snapshot_id, ranked, 0, match_count, columns)
+    search_cache.put(cache_key, generation, (snapshot_id, result))
+    return result
+
+async def search_page(snapshot_id: str, ranked: List[List[Any]], offset: int, page_size: int,
+                      columns: List[str]) -> SearchResponse:
+    page = ranked[offset:offset + page_size]
+    async with httpx.AsyncClient() as client:
+        try:
+            rows = await fetch_candidates_by_id(client, [candidate_id for candidate_id, _ in page], columns)
+        except httpx.HTTPStatusError as e:
+            logger.error("Error hydrating search page", extra={"fields": {"status": e.response.status_code, "response": e.response.text}})
+            raise HTTPException(status_code=500, detail=f"Database error: {e.response.text}")
+        except Exception as e:
+            logger.error("Error hydrating search page", extra={"fields": {"error": str(e)}})
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    # Keep snapshot order; candidates deleted since the snapshot drop out
+    candidates = [
+        Candidate(**rows[candidate_id], similarity=similarity)
+        for candidate_id, similarity in page if candidate_id in rows
+    ]
+    next_cursor = None
+    if offset + page_size < len(ranked):
+        next_cursor = encode_cursor({"s": snapshot_id, "o": offset + page_size, "n": page_size, "f": columns})
+    if not candidates and offset == 0:
+        return SearchResponse(candidates=[], message="No candidates found matching your query.")
+    return SearchResponse(candidates=candidates, next_cursor=next_cursor)
+
+@app.get("/api/candidates", response_model=CandidateListResponse, response_model_exclude_unset=True)
+async def list_candidates(
+    limit: int = Query(20, ge=1, le=200),
+    fields: Optional[str] = Query(None, description="Comma-separated candidate columns to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    """Keyset-paginated candidate listing (ordered by id) with column projection."""
+    try:
+        columns = parse_fields(fields, LIST_DEFAULT_FIELDS)
+        after = decode_cursor(cursor)["after"] if cursor else None
+    except (ValueError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid fields or cursor")
+
+    params = {"select": ",".join(columns), "order": "id", "limit": str(limit + 1)}
+    if after:
+        params["id"] = f"gt.{after}"
+    headers = {
+        "apikey": SUPABASE_SERVICE_ROLE_KEY,
+        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+    }
+    async with httpx.AsyncClient() as client:
+        try:
+            with track_stage("db_read"):
+                response = await client.get(f"{SUPABASE_URL}/rest/v1/candidates", params=params, headers=headers)
             response.raise_for_status()
-            print(f"Successfully updated ai_summary for candidate {candidate_id}")
+            rows = response.json()
         except httpx.HTTPStatusError as e:
-            print(f"Error updating ai_summary: {e.response.status_code} - {e.response.text}")
-            # Not raising HTTPException here, as summary was generated, but DB update failed.
-            # Frontend will still get the summary, but it won't be persisted if this fails.
-            # Consider how to handle this - maybe return summary but with a warning.
+            logger.error("Error listing candidates", extra={"fields": {"status": e.response.status_code, "response": e.response.text}})
+            raise HTTPException(status_code=500, detail="Failed to list candidates")
         except Exception as e:
-            print(f"Generic error updating ai_summary: {str(e)}")
+            logger.error("Generic error listing candidates", extra={"fields": {"error": str(e)}})
+            raise HTTPException(status_code=500, detail="Failed to list candidates")
 
-    return AISummaryResponse(ai_summary=generated_summary)
+    # One extra row tells us whether there is a next page
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor({"after": str(rows[-1]["id"])})
+    return CandidateListResponse(candidates=[Candidate(**row) for row in rows], next_cursor=next_cursor)
+
+async def iter_export_pages(columns: List[str], ids: Optional[List[str]] = None,
+                            ranked: Optional[List[List[Any]]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Pages of candidate rows for an export, EXPORT_PAGE_SIZE rows at a time.
+
+    Explicit ids and ranked search results keep their order; otherwise the
+    whole table is walked by id.
+    """
+    headers = {
+        "apikey": SUPABASE_SERVICE_ROLE_KEY,
+        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+    }
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        if ranked is not None:
+            for start in range(0, len(ranked), EXPORT_PAGE_SIZE):
+                page = ranked[start:start + EXPORT_PAGE_SIZE]
+                rows = await fetch_candidates_by_id(client, [candidate_id for candidate_id, _ in page], columns)
+                yield [{**rows[candidate_id], "similarity": similarity} for candidate_id, similarity in page if candidate_id in rows]
+        elif ids is not None:
+            for start in range(0, len(ids), EXPORT_PAGE_SIZE):
+                page = ids[start:start + EXPORT_PAGE_SIZE]
+                rows = await fetch_candidates_by_id(client, page, columns)
+                yield [rows[candidate_id] for candidate_id in page if candidate_id in rows]
+        else:
+            last_id = None
+            while True:
+                params = {"select": ",".join(columns), "order": "id", "limit": str(EXPORT_PAGE_SIZE)}
+                if last_id:
+                    params["id"] = f"gt.{last_id}"
+                with track_stage("db_read"):
+                    response = await client.get(f"{SUPABASE_URL}/rest/v1/candidates", params=params, headers=headers)
+                response.raise_for_status()
+                rows = response.json()
+                if not rows:
+                    break
+                yield rows
+                last_id = rows[-1]["id"]
+
+async def export_candidates(fmt: str, fields: Optional[str], ids: Optional[List[str]], query: Optional[str],
+                            match_threshold: float) -> StreamingResponse:
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format; use one of: {', '.join(EXPORT_MEDIA_TYPES)}")
+    try:
+        columns = parse_fields(fields, LIST_DEFAULT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Rank up front so embedding and database errors still get a proper status code
+    ranked = None
+    normalized = normalize_query(query or "")
+    if normalized:
+        try:
+            with track_stage("embedding"):
+                query_embedding = await embedding_batcher.embed(normalized, store=False)
+            ranked = await rank_candidates(query_embedding, match_threshold, EXPORT_SEARCH_LIMIT)
+        except Exception as e:
+            logger.error("Error ranking candidates for export", extra={"fields": {"error": str(e)}})
+            raise HTTPException(status_code=500, detail="Failed to run the export search")
+    output_columns = columns + ["similarity"] if ranked is not None else columns
+
+    async def body():
+        exported = 0
+        if fmt == "csv":
+            yield csv_header(output_columns)
+        try:
+            async for rows in iter_export_pages(columns, ids, ranked):
+                exported += len(rows)
+                yield encode_page(rows, output_columns, fmt)
+        except Exception as e:
+            # Headers are already sent: abort the stream so the client sees a
+            # truncated download rather than a silently short file
+            logger.error("Export aborted", extra={"fields": {"rows": exported, "error": str(e)}})
+            raise
+        logger.info("Export complete", extra={"fields": {"format": fmt, "rows": exported}})
+
+    filename = f"candidates_export_{datetime.now(timezone.utc).date().isoformat()}.{fmt}"
+    return StreamingResponse(body(), media_type=EXPORT_MEDIA_TYPES[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/api/export")
+async def export_candidates_get(
+    format: str = Query("csv", description="csv or ndjson"),
+    fields: Optional[str] = Query(None, description="Comma-separated candidate columns to export"),
+    ids: Optional[str] = Query(None, description="Comma-separated candidate ids (a shortlist)"),
+    query: Optional[str] = Query(None, description="Export the results of this search"),
+    match_threshold: float = Query(0.1, ge=-1.0, le=1.0),
+):
+    """Stream candidates as CSV or NDJSON: a shortlist, a search's results, or the whole table."""
+    id_list = [i.strip() for i in ids.split(",") if i.strip()] if ids else None
+    return await export_candidates(format, fields, id_list, query, match_threshold)
+
+@app.post("/api/export")
+async def export_candidates_post(request: ExportRequest):
+    """Same as GET /api/export, for shortlists too long for a query string."""
+    return await export_candidates(request.format, request.fields, request.ids, request.query, request.match_threshold)
+
+@app.post("/api/search/invalidate")
+async def invalidate_search_cache(request: Request, x_invalidate_token: Optional[str] = Header(None)):
+    """Drop cached searches and candidate records; called by the scripts after writing to the table."""
+    if SEARCH_INVALIDATE_TOKEN:
+        if x_invalidate_token != SEARCH_INVALIDATE_TOKEN:
+            raise HTTPException(status_code=403, detail="Invalid invalidation token")
+    elif request.client is None or request.client.host not in LOCAL_CLIENT_HOSTS:
+        raise HTTPException(status_code=403, detail="Set SEARCH_INVALIDATE_TOKEN to invalidate from other hosts")
+    candidate_catalog.clear()
+    return {"generation": catalog_generation.bump()}
+
+@app.get("/api/candidate/{candidate_id}", response_model=Candidate, response_model_exclude_unset=True)
+async def get_candidate(
+    candidate_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated candidate columns to return"),
+):
+    """Candidate detail, served from the local catalog when it is warm."""
+    try:
+        columns = parse_fields(fields, CANDIDATE_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        row = await read_candidate(candidate_id, columns)
+    except httpx.HTTPStatusError as e:
+        logger.error("Error fetching candidate", extra={"fields": {"candidate_id": candidate_id, "status": e.response.status_code, "response": e.response.text}})
+        raise HTTPException(status_code=e.response.status_code, detail="Failed to fetch candidate data")
+    except Exception as e:
+        logger.error("Generic error fetching candidate", extra={"fields": {"candidate_id": candidate_id, "error": str(e)}})
+        raise HTTPException(status_code=500, detail="Server error fetching candidate data")
+    if row is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return Candidate(**row)
+
+def warm_nltk():
+    nltk.corpus.stopwords.words("english")
+    nltk.word_tokenize(SAMPLE_RESUME)
+
+def warm_docx():
+    docx_bytes = sample_docx()
+    extract_text_from_docx(docx_bytes)
+    mammoth.extract_raw_text(io.BytesIO(docx_bytes))
+
+def warm_pyresparser():
+    parse_with_pyresparser(sample_pdf())
+
+def warm_embedding():
+    if INLINE_EMBEDDING:
+        embedding_batcher.encode([SAMPLE_RESUME])
+
+# Pay the lazy first-call costs (corpora, models, extractor pools) before
+# taking traffic; /readyz reports ready only once this has run
+warmup = Warmup([
+    ("nltk", warm_nltk),
+    ("pdf", lambda: extract_text_from_pdf(sample_pdf())),
+    ("docx", warm_docx),
+    ("parser", lambda: extract_fields(SAMPLE_RESUME)),
+    ("pyresparser", warm_pyresparser),
+    ("embedding", warm_embedding),
+])
+# Steps serve.py runs in the supervisor before forking, so workers inherit the
+# imported spaCy/thinc modules, pyresparser's models and the NLTK corpora.
+# "pdf" starts the forkserver and "embedding" starts torch threads, neither of
+# which survives fork, so those stay per worker.
+PRELOAD_WARMUP_STEPS = ("nltk", "docx", "parser", "pyresparser")
+
+@app.on_event("startup")
+async def start_warmup():
+    if WARMUP_ON_STARTUP:
+        asyncio.create_task(warmup.run())
+    else:
+        warmup.mark_ready()
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe: 503 until startup warmup has finished, then 200."""
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-stage latency histograms and counters in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 if __name__ == "__main__":
     import uvicorn
@@ -511,5 +1324,5 @@ if __name__ == "__main__":
     
     default_port = int(os.getenv("PORT", "3001"))
     port = find_available_port(default_port)
-    print(f"Starting server on port {port}")
+    logger.info("Starting server", extra={"fields": {"port": port}})
     uvicorn.run("app:app", host="0.0.0.0", port=port, reload=True)
\ No newline at end of file
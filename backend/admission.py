@@ -0,0 +1,139 @@
+import asyncio
+import collections
+import json
+import logging
+import math
+import time
+from typing import Callable, Deque, Dict, Optional
+
+from backend.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_WAIT, ADMISSION_TOTAL
+
+logger = logging.getLogger("hireai.admission")
+
+class Rejected(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class AdmissionClass:
+    """Concurrency limit with a bounded FIFO queue for one class of endpoints.
+
+    Up to `concurrency` requests run at once and up to `queue_size` more wait
+    for a slot. Anything beyond that, or anything that has waited longer than
+    `max_wait_s`, is rejected straight away with a Retry-After estimated from
+    the queue depth and recent service times. Single event loop only: each
+    worker process has its own limits.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait_s: float = 30.0):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.max_wait_s = max_wait_s
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._service_time = 1.0  # EWMA of seconds a request holds a slot
+
+    def retry_after(self) -> int:
+        # Roughly how long until the queue ahead of a new request drains
+        drain = (len(self._waiters) + 1) * self._service_time / self.concurrency
+        return max(1, min(60, math.ceil(drain)))
+
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self.active, endpoint_class=self.name, state="active")
+        ADMISSION_IN_FLIGHT.set(len(self._waiters), endpoint_class=self.name, state="queued")
+
+    def _reject(self) -> Rejected:
+        ADMISSION_TOTAL.inc(endpoint_class=self.name, result="rejected")
+        return Rejected(self.retry_after())
+
+    async def acquire(self) -> None:
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            ADMISSION_QUEUE_WAIT.observe(0.0, endpoint_class=self.name)
+            ADMISSION_TOTAL.inc(endpoint_class=self.name, result="admitted")
+            self._update_gauges()
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise self._reject()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait_s)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up; pass it on
+                self.release(held_for=None)
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            self._update_gauges()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject()
+            raise
+        ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - start, endpoint_class=self.name)
+        ADMISSION_TOTAL.inc(endpoint_class=self.name, result="admitted")
+
+    def release(self, held_for: Optional[float]) -> None:
+        if held_for is not None:
+            self._service_time = 0.8 * self._service_time + 0.2 * held_for
+        # Hand the slot straight to the next live waiter (active stays the same)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.active -= 1
+        self._update_gauges()
+
+class AdmissionMiddleware:
+    """ASGI middleware that admits HTTP requests through their endpoint class.
+
+    `classify(method, path)` names the class for a request, or returns None
+    for requests that bypass admission (health checks, metrics, preflight).
+    Rejected requests get a 429 with Retry-After before any app code runs.
+    """
+
+    def __init__(self, app, classes: Dict[str, AdmissionClass], classify: Callable[[str, str], Optional[str]]):
+        self.app = app
+        self.classes = classes
+        self.classify = classify
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        admission = self.classes.get(self.classify(scope["method"], scope["path"]) or "")
+        if admission is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            await admission.acquire()
+        except Rejected as e:
+            logger.warning("Request rejected by admission control", extra={"fields": {
+                "endpoint_class": admission.name, "path": scope["path"], "retry_after": e.retry_after,
+            }})
+            body = json.dumps({"detail": f"Server busy ({admission.name}); retry later"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(e.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(time.perf_counter() - start)
@@ -0,0 +1,245 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Columns a catalog record can hold. The embedding is never cached.
+RECORD_COLUMNS = (
+    "id", "name", "email", "current_title", "location", "work_auth", "years_exp",
+    "skills", "resume_url", "raw_text", "ai_summary", "created_at", "updated_at",
+)
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+MISSING = _Missing()
+
+class CandidateRecord:
+    """One candidate row. Columns that were never loaded hold MISSING."""
+
+    __slots__ = RECORD_COLUMNS + ("loaded_at",)
+
+    def __init__(self, row: Dict[str, Any]):
+        for column in RECORD_COLUMNS:
+            setattr(self, column, row.get(column, MISSING))
+        if isinstance(self.skills, list):
+            self.skills = tuple(self.skills)
+        self.loaded_at = time.monotonic()
+
+    def merge(self, row: Dict[str, Any]) -> None:
+        for column in RECORD_COLUMNS:
+            if column in row:
+                value = row[column]
+                setattr(self, column, tuple(value) if column == "skills" and isinstance(value, list) else value)
+
+    def has(self, columns: Iterable[str]) -> bool:
+        return all(getattr(self, c) is not MISSING for c in columns)
+
+    def to_dict(self, columns: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        out = {}
+        for column in columns or RECORD_COLUMNS:
+            value = getattr(self, column)
+            if value is not MISSING:
+                out[column] = list(value) if column == "skills" and value is not None else value
+        return out
+
+class InvalidationLog:
+    """Ring of recently invalidated candidate ids in shared memory.
+
+    Created before serve.py forks, so every worker publishes to and reads
+    from the same ring. Readers remember how far they have read; one that
+    falls more than `slots` entries behind is told to drop everything.
+    """
+
+    ID_BYTES = 64
+
+    def __init__(self, slots: int = 1024):
+        self.slots = slots
+        self._ids = multiprocessing.Array("c", slots * self.ID_BYTES, lock=False)
+        self._count = multiprocessing.Value("q", 0)
+
+    @property
+    def count(self) -> int:
+        return self._count.value
+
+    def publish(self, candidate_id: str) -> int:
+        encoded = candidate_id.encode()[:self.ID_BYTES].ljust(self.ID_BYTES, b"\0")
+        with self._count.get_lock():
+            offset = (self._count.value % self.slots) * self.ID_BYTES
+            self._ids[offset:offset + self.ID_BYTES] = encoded
+            self._count.value += 1
+            return self._count.value
+
+    def publish_all(self) -> int:
+        """Tell every reader to drop everything, as if it had fallen behind."""
+        with self._count.get_lock():
+            self._count.value += self.slots + 1
+            return self._count.value
+
+    def since(self, seen: int) -> Tuple[int, Optional[List[str]]]:
+        """(current count, ids invalidated after `seen`), or None for the ids if some were overwritten."""
+        with self._count.get_lock():
+            count = self._count.value
+            if count - seen > self.slots:
+                return count, None
+            ids = []
+            for n in range(seen, count):
+                offset = (n % self.slots) * self.ID_BYTES
+                ids.append(self._ids[offset:offset + self.ID_BYTES].rstrip(b"\0").decode())
+        return count, ids
+
+class CandidateCatalog:
+    """Read-through cache of candidate records.
+
+    Records live in an in-memory LRU of at most `max_entries`. With a
+    `spill_path`, records evicted from memory go to a SQLite file instead of
+    being dropped, and are promoted back on the next read. Entries older than
+    `ttl_seconds` are treated as misses so changes made outside this process
+    are picked up eventually.
+
+    With an `invalidations` log shared between worker processes, invalidate()
+    in one worker evicts the record from every worker's catalog. Each process
+    opens its own SQLite connection to the spill file on first use.
+    """
+
+    def __init__(self, max_entries: int = 2000, ttl_seconds: float = 600.0, spill_path: Optional[str] = None,
+                 invalidations: Optional[InvalidationLog] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._records: "OrderedDict[str, CandidateRecord]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._spill_path = spill_path
+        self._spill_conn: Optional[sqlite3.Connection] = None
+        self._spill_pid: Optional[int] = None
+        self._invalidations = invalidations
+        self._invalidations_seen = invalidations.count if invalidations is not None else 0
+        if spill_path:
+            with sqlite3.connect(spill_path) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS candidate_records "
+                    "(id TEXT PRIMARY KEY, data TEXT NOT NULL, stored_at REAL NOT NULL)"
+                )
+                # Spilled rows from a previous run may be arbitrarily stale
+                conn.execute("DELETE FROM candidate_records")
+            conn.close()
+
+    @property
+    def _spill(self) -> Optional[sqlite3.Connection]:
+        # A connection must not cross fork: open one per process, on first use
+        if self._spill_path and self._spill_pid != os.getpid():
+            self._spill_conn = sqlite3.connect(self._spill_path, check_same_thread=False)
+            self._spill_pid = os.getpid()
+        return self._spill_conn if self._spill_path else None
+
+    def _sync_invalidations(self) -> None:
+        if self._invalidations is None or self._invalidations.count == self._invalidations_seen:
+            return
+        self._invalidations_seen, ids = self._invalidations.since(self._invalidations_seen)
+        if ids is None:
+            self._drop_all()  # fell too far behind to know what changed
+            return
+        for candidate_id in ids:
+            self._records.pop(candidate_id, None)
+        # Another worker may have spilled its copy before the invalidation
+        if self._spill is not None and ids:
+            self._spill.executemany("DELETE FROM candidate_records WHERE id = ?", [(i,) for i in ids])
+            self._spill.commit()
+
+    def _drop_all(self) -> None:
+        self._records.clear()
+        if self._spill is not None:
+            self._spill.execute("DELETE FROM candidate_records")
+            self._spill.commit()
+
+    def _fresh(self, record: CandidateRecord) -> bool:
+        return time.monotonic() - record.loaded_at < self.ttl
+
+    def _spill_record(self, record: CandidateRecord) -> None:
+        self._spill.execute(
+            "INSERT OR REPLACE INTO candidate_records (id, data, stored_at) VALUES (?, ?, ?)",
+            (str(record.id), json.dumps(record.to_dict()), record.loaded_at),
+        )
+        self._spill.commit()
+
+    def _unspill(self, candidate_id: str) -> Optional[CandidateRecord]:
+        row = self._spill.execute(
+            "SELECT data, stored_at FROM candidate_records WHERE id = ?", (candidate_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._spill.execute("DELETE FROM candidate_records WHERE id = ?", (candidate_id,))
+        self._spill.commit()
+        record = CandidateRecord(json.loads(row[0]))
+        record.loaded_at = row[1]
+        return record
+
+    def _store(self, candidate_id: str, record: CandidateRecord) -> None:
+        self._records[candidate_id] = record
+        self._records.move_to_end(candidate_id)
+        while len(self._records) > self.max_entries:
+            _, evicted = self._records.popitem(last=False)
+            if self._spill is not None and self._fresh(evicted):
+                self._spill_record(evicted)
+
+    def get(self, candidate_id: str, columns: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Projected columns for a candidate, or None if any are not cached."""
+        columns = tuple(columns)
+        with self._lock:
+            self._sync_invalidations()
+            record = self._records.get(candidate_id)
+            if record is None and self._spill is not None:
+                record = self._unspill(candidate_id)
+                if record is not None:
+                    self._store(candidate_id, record)
+            if record is None:
+                return None
+            if not self._fresh(record):
+                self._records.pop(candidate_id, None)
+                return None
+            self._records.move_to_end(candidate_id)
+            if not record.has(columns):
+                return None
+            return record.to_dict(columns)
+
+    def put(self, candidate_id: str, row: Dict[str, Any]) -> None:
+        """Add or extend a record with freshly read (or just written) columns."""
+        with self._lock:
+            self._sync_invalidations()
+            record = self._records.get(candidate_id)
+            if record is not None and self._fresh(record):
+                record.merge(row)
+                self._records.move_to_end(candidate_id)
+            else:
+                record = CandidateRecord({**row, "id": candidate_id})
+                self._store(candidate_id, record)
+
+    def invalidate(self, candidate_id: str) -> None:
+        with self._lock:
+            self._sync_invalidations()
+            self._records.pop(candidate_id, None)
+            if self._invalidations is not None:
+                count = self._invalidations.publish(candidate_id)
+                if count == self._invalidations_seen + 1:
+                    self._invalidations_seen = count  # only our own entry is new
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM candidate_records WHERE id = ?", (candidate_id,))
+                self._spill.commit()
+
+    def clear(self) -> None:
+        """Drop every record, in this and (through the log) every other worker."""
+        with self._lock:
+            self._sync_invalidations()
+            if self._invalidations is not None:
+                self._invalidations_seen = self._invalidations.publish_all()
+            self._drop_all()
+
+    def __len__(self) -> int:
+        return len(self._records)
@@ -0,0 +1,121 @@
+import random
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+# MinHash / LSH near-duplicate detection over extracted resume text.
+# The same resume uploaded as PDF and DOCX (or lightly edited) produces almost
+# the same word shingles, so the estimated Jaccard similarity of their MinHash
+# signatures is high even though the file bytes (and MD5) differ.
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows -> candidate pairs start around Jaccard 0.7
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r'\w+')
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_rng = random.Random(1337)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERM)
+]
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    """Hash the word k-grams of text into a set of 32-bit ints."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < k:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {
+        zlib.crc32(" ".join(tokens[i:i + k]).encode("utf-8"))
+        for i in range(len(tokens) - k + 1)
+    }
+
+def minhash_signature(text: str) -> Optional[Tuple[int, ...]]:
+    """Compute the MinHash signature of text, or None if it has no tokens."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    return tuple(
+        min([((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes])
+        for a, b in _PERMUTATIONS
+    )
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+class DedupIndex:
+    """In-memory LSH index of candidate signatures, keyed by candidate id."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(BANDS)]
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    @staticmethod
+    def _bands(signature: Tuple[int, ...]):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS:(band + 1) * ROWS]
+
+    def add(self, candidate_id: str, signature: Optional[Tuple[int, ...]]) -> None:
+        if signature is None:
+            return
+        with self._lock:
+            self.remove(candidate_id)
+            self._signatures[candidate_id] = signature
+            for band, key in self._bands(signature):
+                self._buckets[band].setdefault(key, set()).add(candidate_id)
+
+    def remove(self, candidate_id: str) -> None:
+        with self._lock:
+            signature = self._signatures.pop(candidate_id, None)
+            if signature is None:
+                return
+            for band, key in self._bands(signature):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    bucket.discard(candidate_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+
+    def find_duplicate(self, signature: Optional[Tuple[int, ...]]) -> Optional[Tuple[str, float]]:
+        """Return (candidate_id, similarity) of the closest near-duplicate, if any.
+
+        Only candidates sharing at least one LSH band are compared, so lookup
+        cost does not grow with the size of the index.
+        """
+        if signature is None:
+            return None
+        with self._lock:
+            candidates: Set[str] = set()
+            for band, key in self._bands(signature):
+                candidates.update(self._buckets[band].get(key, ()))
+            best = None
+            for candidate_id in candidates:
+                similarity = estimate_similarity(signature, self._signatures[candidate_id])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (candidate_id, similarity)
+            return best
+
+    def find_or_reserve(self, signature: Optional[Tuple[int, ...]], reservation_id: str) -> Optional[Tuple[str, float]]:
+        """find_duplicate, and if there is none, add the signature under reservation_id.
+
+        Both happen under one lock, so of two concurrent uploads of the same
+        resume the second sees the first's reservation. The caller replaces
+        the reservation with the real id (or removes it) once its insert ends.
+        """
+        with self._lock:
+            duplicate = self.find_duplicate(signature)
+            if duplicate is None:
+                self.add(reservation_id, signature)
+            return duplicate
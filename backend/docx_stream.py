@@ -0,0 +1,66 @@
+import io
+import zipfile
+from typing import Iterator, List
+from xml.etree.ElementTree import iterparse
+
+# Streaming DOCX text extraction.
+#
+# Reads word/document.xml straight out of the zip and walks it with iterparse,
+# emitting one line per non-empty paragraph in document order (table cells
+# included, since cell text lives in ordinary w:p elements). Nothing but the
+# current paragraph is kept in memory: finished body children are cleared as
+# soon as they close.
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+DOCUMENT_PART = "word/document.xml"
+
+def iter_paragraphs(file_bytes: bytes) -> Iterator[str]:
+    """Yield the text of each non-empty paragraph in document order.
+
+    Raises zipfile.BadZipFile / KeyError / ParseError for files that are not
+    a readable DOCX, so callers can fall back to a full parser.
+    """
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+        with archive.open(DOCUMENT_PART) as part:
+            body = None
+            depth = 0
+            fallback_depth = 0  # inside mc:Fallback, which repeats mc:Choice content
+            ppr_depth = 0  # inside w:pPr, whose w:tabs/w:tab are tab stops, not tab characters
+            paragraphs: List[List[str]] = []
+            for event, elem in iterparse(part, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    depth += 1
+                    if tag == W + "body":
+                        body = elem
+                    elif tag == MC_FALLBACK:
+                        fallback_depth += 1
+                    elif tag == W + "pPr":
+                        ppr_depth += 1
+                    elif tag == W + "p" and not fallback_depth:
+                        paragraphs.append([])
+                    continue
+
+                depth -= 1
+                if tag == MC_FALLBACK:
+                    fallback_depth -= 1
+                elif tag == W + "pPr":
+                    ppr_depth -= 1
+                elif not fallback_depth and paragraphs:
+                    if tag == W + "t":
+                        paragraphs[-1].append(elem.text or "")
+                    elif tag == W + "tab" and not ppr_depth:
+                        paragraphs[-1].append("\t")
+                    elif tag in (W + "br", W + "cr"):
+                        paragraphs[-1].append("\n")
+                    elif tag == W + "p":
+                        text = "".join(paragraphs.pop())
+                        if text.strip():
+                            yield text
+                # depth 2 is a direct child of w:body (document > body > child)
+                if body is not None and depth == 2:
+                    body.clear()
+
+def extract_docx_text(file_bytes: bytes) -> str:
+    return "\n".join(iter_paragraphs(file_bytes))
@@ -0,0 +1,127 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+import numpy as np
+
+# Persistent embedding cache keyed by (model name, text hash).
+#
+# Two append-only files live in the cache directory:
+#   vectors.f32  raw float32 vectors, back to back
+#   index.bin    fixed-size records: sha256(model, text) | offset | dim
+# Vectors are read through a memory map of vectors.f32. Writers append the
+# vector before its index record under an exclusive flock, so a reader that
+# sees a record can always read its vector. Several processes (the API and
+# the embedding scripts) can share one directory; each picks up records the
+# others appended when it misses.
+
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+
+_RECORD = struct.Struct("<32sQI")  # key, byte offset into vectors.f32, dimension
+
+def cache_key(model_name: str, text: str) -> bytes:
+    digest = hashlib.sha256()
+    digest.update(model_name.encode())
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.digest()
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, directory: str = EMBEDDING_CACHE_DIR):
+        self.model_name = model_name
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._index_path = os.path.join(directory, "index.bin")
+        self._index: Dict[bytes, Tuple[int, int]] = {}
+        self._index_read = 0  # bytes of index.bin already loaded
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        # Open for append so concurrent writers never overwrite each other
+        self._vectors_file = open(self._vectors_path, "ab+")
+        self._index_file = open(self._index_path, "ab+")
+        with self._lock:
+            self._load_new_records()
+
+    def _load_new_records(self) -> None:
+        size = os.fstat(self._index_file.fileno()).st_size
+        # Ignore a torn trailing record from a crashed writer
+        size -= (size - self._index_read) % _RECORD.size
+        if size <= self._index_read:
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_read)
+            data = f.read(size - self._index_read)
+        for key, offset, dim in _RECORD.iter_unpack(data):
+            self._index[key] = (offset, dim)
+        self._index_read = size
+
+    def _vector_at(self, offset: int, dim: int) -> List[float]:
+        end = offset + dim * 4
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._vectors_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return np.frombuffer(self._map, dtype=np.float32, count=dim, offset=offset).tolist()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        keys = [cache_key(self.model_name, t) for t in texts]
+        with self._lock:
+            if any(k not in self._index for k in keys):
+                self._load_new_records()
+            results = []
+            for key in keys:
+                entry = self._index.get(key)
+                results.append(self._vector_at(*entry) if entry else None)
+            return results
+
+    def put(self, text: str, vector: Sequence[float]) -> None:
+        self.put_many([text], [vector])
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._index_file.fileno(), fcntl.LOCK_EX)
+            try:
+                self._load_new_records()
+                records = []
+                self._vectors_file.seek(0, os.SEEK_END)
+                offset = self._vectors_file.tell()
+                for text, vector in zip(texts, vectors):
+                    key = cache_key(self.model_name, text)
+                    if key in self._index:
+                        continue
+                    data = np.asarray(vector, dtype=np.float32).tobytes()
+                    self._vectors_file.write(data)
+                    records.append((key, offset, len(data) // 4))
+                    offset += len(data)
+                if not records:
+                    return
+                self._vectors_file.flush()
+                self._index_file.write(b"".join(_RECORD.pack(*r) for r in records))
+                self._index_file.flush()
+                self._load_new_records()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._index_file.fileno(), fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._vectors_file.close()
+            self._index_file.close()
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import List, Optional, Tuple
+
+from backend.embedding_cache import EMBEDDING_CACHE_DIR, EmbeddingCache
+
+logger = logging.getLogger("hireai.embeddings")
+
+# Shared with embedding_script.py / re_embedding_script.py so inline vectors
+# are comparable with the ones already in the candidates table (384 dims)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+
+class EmbeddingBatcher:
+    """Micro-batching front end for SentenceTransformer.encode.
+
+    Concurrent callers of embed() are queued; a single background task takes
+    the first waiting text, gathers more for up to max_wait_ms or until
+    max_batch texts are queued, and encodes the whole batch in one call on a
+    worker thread. The model is loaded on first use. Vectors already in the
+    on-disk embedding cache (cache_dir, empty to disable) are not re-encoded.
+    Only texts embedded with store=True (candidate resumes) are added to the
+    cache; search queries are looked up but never written, since the cache
+    files are append-only and queries are unbounded.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, max_batch: int = EMBEDDING_BATCH_SIZE,
+                 max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS, cache_dir: str = EMBEDDING_CACHE_DIR):
+        self.model_name = model_name
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.cache_dir = cache_dir
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache: Optional[EmbeddingCache] = None
+        self._cache_failed = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                logger.info("Loading embedding model", extra={"fields": {"model": self.model_name}})
+                self._model = SentenceTransformer(self.model_name)
+            return self._model
+
+    def _get_cache(self) -> Optional[EmbeddingCache]:
+        if self._cache is None and self.cache_dir and not self._cache_failed:
+            try:
+                self._cache = EmbeddingCache(self.model_name, self.cache_dir)
+            except OSError as e:
+                self._cache_failed = True
+                logger.warning("Embedding cache unavailable", extra={"fields": {"dir": self.cache_dir, "error": str(e)}})
+        return self._cache
+
+    def encode(self, texts: List[str], store: Optional[List[bool]] = None) -> List[List[float]]:
+        """Encode a batch synchronously (runs on a worker thread).
+
+        store[i] says whether texts[i] may be added to the cache (default: all).
+        """
+        cache = self._get_cache()
+        vectors = cache.get_many(texts) if cache is not None else [None] * len(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = self.load_model().encode([texts[i] for i in missing], batch_size=len(missing)).tolist()
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+            keep = [(texts[i], vector) for i, vector in zip(missing, encoded) if store is None or store[i]]
+            if cache is not None and keep:
+                cache.put_many([text for text, _ in keep], [vector for _, vector in keep])
+        return vectors
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def embed(self, text: str, store: bool = True) -> List[float]:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, store, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, bool, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Anything that arrived meanwhile rides along, up to the batch limit
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            live = [(text, store, future) for text, store, future in batch if not future.done()]
+            if not live:
+                continue
+            try:
+                vectors = await asyncio.to_thread(self.encode, [text for text, _, _ in live],
+                                                  [store for _, store, _ in live])
+            except Exception as e:
+                for _, _, future in live:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, future), vector in zip(live, vectors):
+                if not future.done():
+                    future.set_result(vector)
@@ -0,0 +1,33 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, List
+
+# Streaming encoders for /api/export. Each call encodes one page of rows, so
+# the response is produced page by page and never held in memory as a whole.
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(v) for v in value)
+    return value
+
+def csv_header(columns: List[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue()
+
+def encode_page(rows: Iterable[Dict[str, Any]], columns: List[str], fmt: str) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps({c: row.get(c) for c in columns}, default=str) + "\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(row.get(c)) for c in columns])
+    return buffer.getvalue()
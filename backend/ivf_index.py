@@ -0,0 +1,116 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Approximate nearest-neighbour index for unit-normalized embeddings.
+#
+# Vectors are partitioned into nlist clusters by spherical k-means (IVF) and
+# stored as int8 codes with one float32 scale per vector, about a quarter of
+# the float32 footprint. A query scores the centroids, scans the codes of the
+# nprobe closest clusters, and re-ranks the best `rerank` of those exactly
+# against the full-precision matrix. That matrix is typically the memory-mapped
+# snapshot (backend/vector_snapshot.py), so only re-ranked rows are paged in.
+
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "16"))
+IVF_RERANK = int(os.getenv("IVF_RERANK", "4")) # Shortlist size as a multiple of k
+IVF_TRAIN_SAMPLE = int(os.getenv("IVF_TRAIN_SAMPLE", "100000"))
+_CHUNK = 65536  # rows assigned / quantized at a time
+
+def default_nlist(count: int) -> int:
+    # ~sqrt(n) lists keeps both the centroid scan and each list scan near sqrt(n)
+    return max(1, min(count, int(np.sqrt(count))))
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization: vectors ~= codes * scales[:, None]."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    labels = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), _CHUNK):
+        block = np.asarray(matrix[start:start + _CHUNK], dtype=np.float32)
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+def train_centroids(matrix: np.ndarray, nlist: int, iterations: int = 10,
+                    sample: int = IVF_TRAIN_SAMPLE, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a random sample of the rows."""
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(matrix), size=min(len(matrix), max(sample, nlist)), replace=False))
+    data = np.asarray(matrix[rows], dtype=np.float32)
+    centroids = data[rng.choice(len(data), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Re-seed empty clusters with random points rather than letting them die
+        sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+        norms[empty] = np.linalg.norm(sums[empty], axis=1)
+        centroids = sums / norms[:, None]
+    return centroids.astype(np.float32)
+
+class IVFIndex:
+    """IVF + int8 index over the rows of a unit-normalized float32 matrix.
+
+    search() returns row numbers into that matrix, so callers keep their own
+    id table (as VectorSnapshot does).
+    """
+
+    def __init__(self, matrix: np.ndarray, centroids: np.ndarray, nprobe: int = IVF_NPROBE,
+                 rerank: int = IVF_RERANK):
+        self.matrix = matrix
+        self.centroids = centroids
+        self.nprobe = nprobe
+        self.rerank = rerank
+        labels = _assign(matrix, centroids)
+        # Rows grouped by list (CSR layout): list i is rows[offsets[i]:offsets[i + 1]]
+        self.rows = np.argsort(labels, kind="stable").astype(np.int64)
+        self.offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=len(centroids)), out=self.offsets[1:])
+        self.codes = np.empty((len(matrix), matrix.shape[1]), dtype=np.int8)
+        self.scales = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(self.rows), _CHUNK):
+            chunk = self.rows[start:start + _CHUNK]
+            self.codes[start:start + len(chunk)], self.scales[start:start + len(chunk)] = quantize(matrix[chunk])
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, nlist: Optional[int] = None, nprobe: Optional[int] = None,
+              rerank: int = IVF_RERANK, iterations: int = 10) -> "IVFIndex":
+        nlist = nlist or default_nlist(len(matrix))
+        return cls(matrix, train_centroids(matrix, nlist, iterations), nprobe or IVF_NPROBE, rerank)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident size of the index (the re-rank matrix is not counted)."""
+        return self.codes.nbytes + self.scales.nbytes + self.rows.nbytes + self.offsets.nbytes + self.centroids.nbytes
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, exact scores) of the approximate top-k for a unit query, best first."""
+        if not len(self.rows) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = np.asarray(query, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        centroid_scores = self.centroids @ q
+        lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe] if nprobe < len(self.centroids) else np.arange(len(self.centroids))
+        # Lists are contiguous in codes/scales, so each scan is a plain slice
+        spans = [(self.offsets[i], self.offsets[i + 1]) for i in lists if self.offsets[i + 1] > self.offsets[i]]
+        if not spans:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        positions = np.concatenate([np.arange(start, stop) for start, stop in spans])
+        approx = np.concatenate([(self.codes[start:stop] @ q) * self.scales[start:stop] for start, stop in spans])
+        shortlist = min(len(positions), max(k, k * self.rerank))
+        if shortlist < len(positions):
+            positions = positions[np.argpartition(-approx, shortlist - 1)[:shortlist]]
+        rows = np.sort(self.rows[positions])  # sorted for sequential page-ins of the memmap
+        exact = np.asarray(self.matrix[rows], dtype=np.float32) @ q
+        order = np.argsort(-exact)[:k]
+        return rows[order], exact[order]
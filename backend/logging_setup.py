@@ -0,0 +1,127 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from typing import Any, Optional
+
+# Structured, sampled, queue-backed logging for the API.
+#
+# Request handlers only pay for a level check, an optional sampling decision and
+# a non-blocking put onto a bounded queue. JSON encoding, payload truncation and
+# the actual stdout write happen on the listener thread. If the queue is full
+# the record is dropped rather than blocking the handler.
+#
+# Usage:
+#   logger.info("Inserted candidate", extra={"fields": {"candidate_id": cid}})
+#   logger.debug("Data to insert", extra={"fields": {"row": row}, "sample_rate": 0.01})
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "500"))
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+def truncate(value: Any, max_chars: int = LOG_MAX_FIELD_CHARS) -> Any:
+    """Recursively shorten long strings and collections in a log payload."""
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+        return value
+    if isinstance(value, dict):
+        return {k: truncate(v, max_chars) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        shortened = [truncate(v, max_chars) for v in items[:50]]
+        if len(items) > 50:
+            shortened.append(f"...(+{len(items) - 50} items)")
+        return shortened
+    return value
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg plus structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(truncate(fields))
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key not in ("fields", "sample_rate"):
+                entry[key] = truncate(value)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+class SamplingFilter(logging.Filter):
+    """Keep records carrying a sample_rate attribute with that probability."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        return rate is None or random.random() < rate
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and defers formatting to the listener."""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens in the listener thread; only make sure args are not
+        # mutated by the caller after the record is queued.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+def _start_listener() -> None:
+    global _listener
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+
+def setup_logging(level: str = LOG_LEVEL) -> None:
+    """Route the root logger through the queue. Safe to call more than once."""
+    global _queue_handler
+    if _queue_handler is not None:
+        return
+    _queue_handler = DroppingQueueHandler(queue.Queue())
+    _queue_handler.addFilter(SamplingFilter())
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(level)
+    _start_listener()
+    atexit.register(shutdown_logging)
+    # The listener thread does not survive fork(); give each child its own
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_start_listener)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except Exception:
+            pass
+        _listener = None
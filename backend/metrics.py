@@ -0,0 +1,199 @@
+import bisect
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, List, Sequence, Tuple
+
+# Minimal in-process metrics with Prometheus text exposition.
+# Recording is a bisect plus a couple of additions under a lock, so it is
+# cheap enough to wrap every stage of every request.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _label_str(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_label_str(self.labelnames, key)} {_format(value)}")
+        return lines
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_label_str(self.labelnames, key)} {_format(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, **labels)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {_format(total)}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "hireai_stage_duration_seconds",
+    "Time spent in each resume processing stage.",
+    ("stage",),
+))
+STAGE_TOTAL = REGISTRY.register(Counter(
+    "hireai_stage_total",
+    "Number of times each stage ran, by outcome.",
+    ("stage", "outcome"),
+))
+SEARCH_CACHE_TOTAL = REGISTRY.register(Counter(
+    "hireai_search_cache_total",
+    "Search result cache lookups, by result (hit or miss).",
+    ("result",),
+))
+CATALOG_CACHE_TOTAL = REGISTRY.register(Counter(
+    "hireai_catalog_cache_total",
+    "Local candidate catalog lookups, by result (hit or miss).",
+    ("result",),
+))
+PARSER_CASCADE_TOTAL = REGISTRY.register(Counter(
+    "hireai_parser_cascade_total",
+    "Bucket parser cascade outcomes: fast (extract_fields) and nlp (pyresparser) stages.",
+    ("stage", "result"),
+))
+PDF_ENGINE_TOTAL = REGISTRY.register(Counter(
+    "hireai_pdf_engine_total",
+    "PDF extraction engine runs, by outcome (ok, empty, timeout, error).",
+    ("engine", "outcome"),
+))
+PDF_ENGINE_LATENCY = REGISTRY.register(Histogram(
+    "hireai_pdf_engine_duration_seconds",
+    "Wall-clock time spent in each PDF extraction engine.",
+    ("engine",),
+))
+ADMISSION_QUEUE_WAIT = REGISTRY.register(Histogram(
+    "hireai_admission_queue_wait_seconds",
+    "Time admitted requests spent queued for a slot, by endpoint class.",
+    ("endpoint_class",),
+))
+ADMISSION_TOTAL = REGISTRY.register(Counter(
+    "hireai_admission_total",
+    "Admission decisions, by endpoint class and result (admitted or rejected).",
+    ("endpoint_class", "result"),
+))
+ADMISSION_IN_FLIGHT = REGISTRY.register(Gauge(
+    "hireai_admission_requests",
+    "Requests currently running (active) or waiting (queued), by endpoint class.",
+    ("endpoint_class", "state"),
+))
+
+@contextmanager
+def track_stage(stage: str):
+    """Record latency and outcome of a processing stage.
+
+    Stages used by the API: download, extract, parse, dedup, storage_upload,
+    db_read, db_write, llm_call, embedding, vector_search and
+    prompt_compression.
+    """
+    start = perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        STAGE_LATENCY.observe(perf_counter() - start, stage=stage)
+        STAGE_TOTAL.inc(stage=stage, outcome=outcome)
+
+def render_metrics() -> str:
+    return REGISTRY.render()
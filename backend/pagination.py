@@ -0,0 +1,47 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+# Candidate columns the API may return. raw_text and embedding are left out on
+# purpose: they are large and only ever needed server-side.
+CANDIDATE_COLUMNS = (
+    "id", "name", "email", "current_title", "location", "work_auth", "years_exp",
+    "skills", "resume_url", "ai_summary", "created_at", "updated_at",
+)
+# Columns returned by match_candidates, and the default projection for search
+SEARCH_DEFAULT_FIELDS = ("id", "name", "current_title", "location", "work_auth", "years_exp", "resume_url")
+LIST_DEFAULT_FIELDS = ("id", "name", "current_title", "location", "years_exp", "created_at")
+
+def parse_fields(fields: Optional[str], default: Sequence[str]) -> List[str]:
+    """Turn a comma-separated ?fields= value into a validated column list.
+
+    `id` is always included so results can be addressed and paginated.
+    Raises ValueError for columns outside CANDIDATE_COLUMNS.
+    """
+    if not fields:
+        return list(default)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in CANDIDATE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    columns = ["id"] + [f for f in requested if f != "id"]
+    return list(dict.fromkeys(columns))
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor")
+    return state
+
+def in_filter(ids: Sequence[str]) -> str:
+    """PostgREST `in.(...)` filter value for a list of ids."""
+    return "in.(" + ",".join(f'"{i}"' for i in ids) + ")"
@@ -0,0 +1,206 @@
+import contextlib
+import io
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+# Killable PDF extraction workers.
+#
+# Each worker is a long-lived process that receives (engine, bytes, start, stop)
+# tasks over a pipe and streams back one message per extracted page. A task
+# with stop=None opens the document, reports its page count first (opening an
+# untrusted PDF can hang just like extracting it, so this happens in the
+# worker too) and extracts the first shard itself; the caller only hands the
+# remaining shards of a large document to more workers. Idle
+# workers are reused, so the common case pays only for one pipe round trip.
+# When a task runs past its wall-clock budget the worker is killed and
+# replaced, and the pages it already streamed are kept as partial text.
+
+PDF_ENGINES = ("fitz", "pdfplumber")
+
+# Page-sharded extraction for large PDFs (portfolios, bulk imports).
+# Below the threshold the extra workers cost more than they save.
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "30"))
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Idle workers kept for reuse; defaults to the API's parse admission limit so
+# a steady stream of concurrent uploads never forks a worker per request
+PDF_IDLE_WORKERS = int(os.getenv("PDF_IDLE_WORKERS", os.getenv("ADMISSION_PARSE_CONCURRENCY", str(os.cpu_count() or 1))))
+
+_ctx = None
+_idle_workers: List["ExtractionWorker"] = []
+_workers_lock = threading.Lock()
+
+def use_parallel_extraction(page_count: int) -> bool:
+    return PDF_PARALLEL_WORKERS > 1 and page_count >= PDF_PARALLEL_PAGE_THRESHOLD
+
+def page_ranges(page_count: int, shards: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into at most `shards` contiguous ranges."""
+    shards = max(1, min(shards, page_count))
+    size, extra = divmod(page_count, shards)
+    ranges, start = [], 0
+    for i in range(shards):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+@contextlib.contextmanager
+def open_document(engine: str, file_bytes: bytes) -> Iterator[Tuple[int, Callable[[int], str]]]:
+    """Open a PDF with one engine; yields (page_count, page_text(index))."""
+    if engine == "fitz":
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            yield doc.page_count, lambda i: doc[i].get_text()
+    elif engine == "pdfplumber":
+        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+            yield len(pdf.pages), lambda i: pdf.pages[i].extract_text() or ""
+    else:
+        raise ValueError(f"Unknown PDF engine {engine}")
+
+def shard_ranges(page_count: int) -> List[Tuple[int, int]]:
+    if use_parallel_extraction(page_count):
+        return page_ranges(page_count, PDF_PARALLEL_WORKERS)
+    return [(0, page_count)]
+
+def _extract(conn, engine: str, file_bytes: bytes, start: int, stop: Optional[int]) -> None:
+    with open_document(engine, file_bytes) as (page_count, page_text):
+        if stop is None:
+            conn.send(("count", page_count))
+            start, stop = shard_ranges(page_count)[0]
+        for i in range(start, min(stop, page_count)):
+            conn.send(("page", i, page_text(i)))
+    conn.send(("done",))
+
+def _worker_main(conn) -> None:
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        try:
+            _extract(conn, *task)
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+def _get_context():
+    global _ctx
+    if _ctx is None:
+        # forkserver: workers start from a clean process with only this module
+        # preloaded, not a fork of the (threaded) API process
+        _ctx = multiprocessing.get_context("forkserver")
+        _ctx.set_forkserver_preload([__name__])
+    return _ctx
+
+class ExtractionWorker:
+    def __init__(self):
+        ctx = _get_context()
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        try:
+            self.process.kill()
+            self.process.join(timeout=1)
+        finally:
+            self.conn.close()
+
+def _acquire_worker() -> ExtractionWorker:
+    with _workers_lock:
+        while _idle_workers:
+            worker = _idle_workers.pop()
+            if worker.process.is_alive():
+                return worker
+            worker.kill()
+    return ExtractionWorker()
+
+def _dispatch(task: Tuple) -> ExtractionWorker:
+    """Send a task to an idle worker, replacing it if its pipe turns out to be broken."""
+    worker = _acquire_worker()
+    try:
+        worker.conn.send(task)
+    except OSError:
+        worker.kill()
+        worker = ExtractionWorker()
+        worker.conn.send(task)
+    return worker
+
+def _release_worker(worker: ExtractionWorker) -> None:
+    with _workers_lock:
+        if worker.process.is_alive() and len(_idle_workers) < max(1, PDF_IDLE_WORKERS, PDF_PARALLEL_WORKERS):
+            _idle_workers.append(worker)
+            return
+    worker.kill()
+
+@dataclass
+class EngineResult:
+    engine: str
+    page_count: Optional[int] = None
+    pages: Dict[int, str] = field(default_factory=dict)
+    complete: bool = False
+    timed_out: bool = False
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.pages[i] for i in sorted(self.pages))
+
+def run_engine(engine: str, file_bytes: bytes, budget: float) -> EngineResult:
+    """Run one engine in worker processes, cancelling it after `budget` seconds.
+
+    Large documents (see use_parallel_extraction) are split into page ranges:
+    the first worker reports the page count and extracts the first range,
+    the others go to more workers. Pages received before the deadline are kept.
+    """
+    started = time.monotonic()
+    deadline = started + budget
+    result = EngineResult(engine=engine)
+
+    first = _dispatch((engine, file_bytes, 0, None))
+    active: Dict[object, ExtractionWorker] = {first.conn: first}
+
+    while active:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        for conn in multiprocessing.connection.wait(list(active), timeout=remaining):
+            worker = active[conn]
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                # The worker died mid-task; it must not go back to the pool
+                del active[conn]
+                result.error = "worker exited"
+                worker.kill()
+                continue
+            if message[0] == "page":
+                result.pages[message[1]] = message[2]
+                continue
+            if message[0] == "count":
+                result.page_count = message[1]
+                for start, stop in shard_ranges(message[1])[1:]:
+                    shard = _dispatch((engine, file_bytes, start, stop))
+                    active[shard.conn] = shard
+                continue
+            del active[conn]
+            if message[0] == "error":
+                result.error = message[1]
+            _release_worker(worker)
+
+    # Anything still running is over budget: kill it, keep what it streamed
+    result.timed_out = bool(active)
+    for worker in active.values():
+        worker.kill()
+    result.complete = not result.timed_out and result.error is None
+    result.seconds = time.monotonic() - started
+    return result
@@ -0,0 +1,161 @@
+import os
+import re
+from typing import List, Set
+
+from backend.routers.resume_parser import DATE_RANGE_RE, EMAIL_RE, PHONE_RE, SKILL_PATTERNS, scan_lines
+
+# Extractive pre-compression of resume text for LLM prompts.
+#
+# The resume is split into sections (scan_lines, the same split extract_fields
+# uses) and each section into units: lines, or sentences for long wrapped
+# paragraphs, cut into word windows when a sentence is still too long (text
+# extracted without line breaks). Units are scored on section, skill
+# mentions, dates and numbers, and position within their section, then packed
+# greedily into a token budget. The kept units are emitted in their original
+# order under their section headers, so the prompt still reads like a resume.
+# If nothing can be selected, a prefix of the text that fits is used instead.
+
+SUMMARY_INPUT_TOKEN_BUDGET = int(os.getenv("SUMMARY_INPUT_TOKEN_BUDGET", "700"))
+CHARS_PER_TOKEN = 4  # rough average for English prose
+
+SECTION_WEIGHTS = {
+    "EXPERIENCE": 3.0, "WORK EXPERIENCE": 3.0, "PROFESSIONAL EXPERIENCE": 3.0, "EMPLOYMENT": 3.0,
+    "SUMMARY": 2.5, "PROFILE": 2.5, "PROFESSIONAL SUMMARY": 2.5, "OBJECTIVE": 1.5,
+    "SKILLS": 2.0, "TECHNICAL SKILLS": 2.0,
+    "PROJECTS": 1.5, "EDUCATION": 1.5, "CERTIFICATIONS": 1.0,
+    "HEADER": 1.0,
+}
+DEFAULT_SECTION_WEIGHT = 0.75  # hobbies, references, languages...
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?;])\s+(?=[A-Z])')
+LONG_LINE_CHARS = 240
+METRIC_RE = re.compile(r'\d+(?:\.\d+)?\s*(?:%|\+|x\b|k\b|m\b)|[$€£]\s*\d', re.I)
+URL_RE = re.compile(r'https?://|www\.|linkedin\.com|github\.com', re.I)
+BULLET_PREFIXES = ("-", "•", "*", "·")
+EXPERIENCE_SECTIONS = {"EXPERIENCE", "WORK EXPERIENCE", "PROFESSIONAL EXPERIENCE", "EMPLOYMENT"}
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def _windows(text: str, max_chars: int = LONG_LINE_CHARS) -> List[str]:
+    """Split text on word boundaries into pieces of at most about max_chars."""
+    pieces, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+        while len(current) > max_chars:  # a single very long token
+            pieces.append(current[:max_chars])
+            current = current[max_chars:]
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _units(lines: List[str]) -> List[str]:
+    units = []
+    for line in lines:
+        date_match = DATE_RANGE_RE.search(line)
+        if units and date_match and date_match.group(0) == line:
+            # A bare date line belongs to the role or degree line above it
+            units[-1] = f"{units[-1]} ({line})"
+        elif len(line) > LONG_LINE_CHARS:
+            for sentence in SENTENCE_SPLIT_RE.split(line):
+                if sentence.strip():
+                    units.extend(_windows(sentence))
+        else:
+            units.append(line)
+    return units
+
+def _prefix(text: str, token_budget: int) -> str:
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit + 1)
+    return text[:cut if cut > 0 else limit]
+
+class _Unit:
+    __slots__ = ("order", "section", "text", "tokens", "base", "skills", "decay")
+
+    def __init__(self, order: int, section: str, text: str, position: int):
+        self.order = order
+        self.section = section
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.skills = {m.group(1).lower() for pattern in SKILL_PATTERNS.values() for m in pattern.finditer(text)}
+        if section == "HEADER" and (EMAIL_RE.search(text) or PHONE_RE.search(text) or URL_RE.search(text)):
+            self.base = 0.0  # contact details add nothing to a summary
+        else:
+            self.base = SECTION_WEIGHTS.get(section, DEFAULT_SECTION_WEIGHT)
+            if DATE_RANGE_RE.search(text):
+                self.base += 1.5
+            if METRIC_RE.search(text):
+                self.base += 0.75
+            if section in EXPERIENCE_SECTIONS and not text.startswith(BULLET_PREFIXES):
+                self.base += 2.0  # role / company lines anchor the bullets under them
+            if section == "HEADER" and position < 3:
+                self.base += 1.5  # name, location, headline
+        # Earlier lines in a section are the recent roles and the headline facts
+        self.decay = 1 / (1 + 0.05 * position)
+
+    def gain(self, covered: Set[str]) -> float:
+        if self.base <= 0:
+            return 0.0
+        # Skills already in the extract count for less each time they recur
+        novel = len(self.skills - covered)
+        score = (self.base + 0.6 * min(novel, 5) + 0.1 * (len(self.skills) - novel)) * self.decay
+        # Prefer dense units; long paragraphs must earn their tokens
+        return score / max(1.0, self.tokens / 20) ** 0.5
+
+def compress_resume(text: str, token_budget: int = SUMMARY_INPUT_TOKEN_BUDGET) -> str:
+    """The most informative parts of a resume, within about token_budget tokens."""
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    if estimate_tokens("\n".join(lines)) <= token_budget:
+        return "\n".join(lines)
+
+    units: List[_Unit] = []
+    seen = set()
+    for section, section_lines in scan_lines(lines)["sections"].items():
+        for position, unit in enumerate(_units(section_lines)):
+            key = re.sub(r'\W+', ' ', unit.lower()).strip()
+            if key and key not in seen:
+                seen.add(key)
+                units.append(_Unit(len(units), section, unit, position))
+
+    # Greedy selection by marginal gain; gains change as skills get covered
+    chosen: List[_Unit] = []
+    covered: Set[str] = set()
+    used_headers: Set[str] = set()
+    spent = 0
+    remaining = units
+    while remaining:
+        fitting = []
+        for unit in remaining:
+            cost = unit.tokens + 1
+            if unit.section != "HEADER" and unit.section not in used_headers:
+                cost += estimate_tokens(unit.section) + 1
+            if spent + cost <= token_budget:
+                fitting.append((unit.gain(covered), -unit.order, cost, unit))
+        if not fitting:
+            break
+        gain, _, cost, best = max(fitting, key=lambda f: f[:2])
+        if gain <= 0:
+            break
+        chosen.append(best)
+        covered |= best.skills
+        used_headers.add(best.section)
+        spent += cost
+        remaining = [u for u in remaining if u is not best]
+
+    if not chosen:
+        # Nothing scored or fitted; a plain prefix still beats an empty prompt
+        return _prefix("\n".join(lines), token_budget)
+
+    output = []
+    current = None
+    for unit in sorted(chosen, key=lambda u: u.order):
+        if unit.section != current and unit.section != "HEADER":
+            output.append(unit.section)
+        current = unit.section
+        output.append(unit.text)
+    return "\n".join(output)
@@ -1,34 +1,139 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import io
+import os
 import re
+import threading
 
 # PDF and DOCX libraries
-import fitz  # PyMuPDF
-import pdfplumber
 import docx
 
+from backend.docx_stream import extract_docx_text
+from backend.metrics import PDF_ENGINE_LATENCY, PDF_ENGINE_TOTAL
+from backend.pdf_workers import PDF_ENGINES, EngineResult, run_engine
+
 router = APIRouter()
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    # Try PyMuPDF first
-    try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        text = "\n".join(page.get_text() for page in doc)
-        if text.strip():
+# Wall-clock budgets for PDF extraction. Each engine runs in a killable worker
+# process and is cancelled once its own budget or the overall budget runs out.
+PDF_EXTRACT_BUDGET_S = float(os.getenv("PDF_EXTRACT_BUDGET_S", "15"))
+PDF_ENGINE_BUDGETS_S = {
+    "fitz": float(os.getenv("PDF_FITZ_BUDGET_S", "5")),
+    "pdfplumber": float(os.getenv("PDF_PDFPLUMBER_BUDGET_S", "10")),
+}
+# Runs per engine before its stats are trusted to reorder or skip it
+PDF_ENGINE_MIN_SAMPLES = int(os.getenv("PDF_ENGINE_MIN_SAMPLES", "20"))
+# A fallback engine that succeeds less often than this is only tried when
+# nothing at all has been extracted yet
+PDF_ENGINE_MIN_SUCCESS_RATE = float(os.getenv("PDF_ENGINE_MIN_SUCCESS_RATE", "0.2"))
+
+class EngineStats:
+    """Running outcome counts and mean latency for one extraction engine."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.attempts if self.attempts else 1.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.attempts if self.attempts else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "success_rate": round(self.success_rate, 3),
+            "mean_seconds": round(self.mean_seconds, 4),
+        }
+
+_engine_stats: Dict[str, EngineStats] = {engine: EngineStats() for engine in PDF_ENGINES}
+_engine_stats_lock = threading.Lock()
+
+def _record_engine(result: EngineResult) -> str:
+    if result.timed_out:
+        outcome = "timeout"
+    elif result.error:
+        outcome = "error"
+    elif result.text.strip():
+        outcome = "ok"
+    else:
+        outcome = "empty"
+    with _engine_stats_lock:
+        stats = _engine_stats[result.engine]
+        stats.attempts += 1
+        stats.total_seconds += result.seconds
+        stats.successes += outcome == "ok"
+        stats.timeouts += outcome == "timeout"
+        stats.errors += outcome == "error"
+    PDF_ENGINE_TOTAL.inc(engine=result.engine, outcome=outcome)
+    PDF_ENGINE_LATENCY.observe(result.seconds, engine=result.engine)
+    return outcome
+
+def engine_order() -> List[str]:
+    """Engines in the order to try them.
+
+    Defaults to fitz then pdfplumber. Once every engine has enough samples,
+    the one with the best successes-per-second goes first.
+    """
+    with _engine_stats_lock:
+        if any(_engine_stats[e].attempts < PDF_ENGINE_MIN_SAMPLES for e in PDF_ENGINES):
+            return list(PDF_ENGINES)
+        def score(engine: str) -> float:
+            stats = _engine_stats[engine]
+            return stats.success_rate / max(stats.mean_seconds, 1e-3)
+        return sorted(PDF_ENGINES, key=score, reverse=True)
+
+def engine_stats() -> Dict[str, Dict[str, float]]:
+    with _engine_stats_lock:
+        return {engine: stats.as_dict() for engine, stats in _engine_stats.items()}
+
+def _worth_trying(engine: str, have_partial: bool) -> bool:
+    with _engine_stats_lock:
+        stats = _engine_stats[engine]
+        unreliable = stats.attempts >= PDF_ENGINE_MIN_SAMPLES and stats.success_rate < PDF_ENGINE_MIN_SUCCESS_RATE
+    return not (unreliable and have_partial)
+
+def extract_text_from_pdf(file_bytes: bytes, budget: Optional[float] = None) -> str:
+    """Run the extraction cascade and return the best text found.
+
+    The first engine that finishes with non-empty text wins. When every engine
+    times out or fails, the longest partial text extracted before cancellation
+    is returned instead.
+    """
+    deadline_budget = PDF_EXTRACT_BUDGET_S if budget is None else budget
+    best = ""
+    spent = 0.0
+    for engine in engine_order():
+        remaining = deadline_budget - spent
+        if remaining <= 0:
+            break
+        if not _worth_trying(engine, bool(best.strip())):
+            continue
+        result = run_engine(engine, file_bytes, min(PDF_ENGINE_BUDGETS_S[engine], remaining))
+        spent += result.seconds
+        outcome = _record_engine(result)
+        text = result.text
+        if outcome == "ok" and result.complete:
             return text
-    except Exception:
-        pass
-    # Fallback to pdfplumber
+        if len(text.strip()) > len(best.strip()):
+            best = text
+    return best
+
+def extract_text_from_docx(file_bytes: bytes) -> str:
+    # Stream word/document.xml; fall back to python-docx for anything it can't read
     try:
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-            return text
+        return extract_docx_text(file_bytes)
     except Exception:
         pass
-    return ""
-
-def extract_text_from_docx(file_bytes: bytes) -> str:
     try:
         doc = docx.Document(io.BytesIO(file_bytes))
         text = []
@@ -44,59 +149,185 @@ def extract_text_from_docx(file_bytes: bytes) -> str:
     except Exception:
         return ""
 
-def extract_fields(text: str) -> Dict[str, Any]:
-    fields = {}
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    text_block = " ".join(lines)
-    
-    # Split into sections for better parsing
+# Header scanner patterns, compiled once at import
+SECTION_HEADER_RE = re.compile(r'^[A-Z\s]{2,}$')  # Section headers are typically all caps
+NAME_RE = re.compile(r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+$')
+NAME_EXCLUDE_RE = re.compile(r'@|\d')
+EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+PHONE_RE = re.compile(r'(\+?\d[\d\s\-]{7,}\d)')
+LOCATION_SKIP_RE = re.compile(r'@|\d|resume|cv|name|phone')  # Skip lines with contact info
+LOCATION_PATTERNS = (
+    re.compile(r'([A-Z][a-z]+(?:\s*,\s*(?:India|USA|UK|Canada)))\s*(?=\n|$)'),  # City, Country
+    re.compile(r'([A-Z][a-z]+\s*,\s*[A-Z][a-z]+(?:\s*,\s*(?:India|USA|UK|Canada))?)'),  # City, State, Country
+    re.compile(r'([A-Z][a-z]+\s*,\s*[A-Z]{2})'),  # City, State code
+)
+NAME_SCAN_LINES = 5
+LOCATION_SCAN_LINES = 10
+
+# Title and experience-date patterns
+TITLE_KEYWORD_RE = re.compile(r'engineer|developer|architect')
+SUMMARY_TITLE_RE = re.compile(r'(?:As\s+(?:an?|the)\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:Engineer|Developer|Architect))')
+DATE_RANGE_RE = re.compile(r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4})\s*(?:-|to)\s*((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}|Present)', re.IGNORECASE)
+
+# Hard skills with expanded categories and normalization mapping
+SKILL_PATTERNS = {
+    "languages": re.compile(r'\b(Python|Go|C\+\+|Java|JavaScript|TypeScript|Ruby|Scala|Kotlin|Swift|Rust)\b', re.I),
+    "ai_ml_libraries": re.compile(r'\b(TensorFlow|PyTorch|Pandas|NumPy|Keras|Scikit-learn|SciPy)\b', re.I),
+    "ai_ml_concepts": re.compile(r'\b(Natural Language Processing|NLP|Computer Vision|Data Analysis|Machine Learning|Deep Learning|GenAI|Generative AI)\b', re.I),
+    "web_frameworks": re.compile(r'\b(Flask|Streamlit|FastAPI|Django|Spring Boot|Ruby on Rails|Node\.js|Express\.js)\b', re.I),
+    "data_visualization": re.compile(r'\b(Matplotlib|Seaborn|Plotly|Tableau|Power BI|Looker|D3\.js)\b', re.I),
+    "cloud": re.compile(r'\b(AWS|Amazon Web Services|GCP|Google Cloud Platform|Azure|Microsoft Azure|Lambda|EC2|S3|Cloud Functions|CloudFormation|ARM Templates|Azure DevOps)\b', re.I),
+    "devops": re.compile(r'\b(Docker|Kubernetes|Terraform|Jenkins|Git|CI/CD|GitLab|GitHub Actions|Ansible|Puppet|Chef)\b', re.I),
+    "databases": re.compile(r'\b(SQL|PostgreSQL|Postgres|MySQL|MongoDB|Redis|DynamoDB|Cassandra|SQLite|Oracle DB|Microsoft SQL Server)\b', re.I),
+    "tools": re.compile(r'\b(Linux|Nginx|Apache|Maven|Gradle|npm|yarn|Jupyter|ComfyUI|Airflow|Spark|Hadoop|Kafka)\b', re.I),
+    "security": re.compile(r'\b(OWASP|Burp Suite|ZAP|JMeter|IAM|Security|OAuth|Encryption|Firewalls|SIEM|SOAR)\b', re.I),
+    "other_tech": re.compile(r'\b(GraphQL|REST API|Microservices|Big Data|Data Engineering|ETL|Data Warehousing|Blockchain)\b', re.I) # Catch-all for other important tech
+}
+
+# Normalize skill names - ensure lowercase keys for matching
+SKILL_NORMALIZATION = {
+    'python': 'Python',
+    'go': 'Go',
+    'c++': 'C++',
+    'java': 'Java',
+    'javascript': 'JavaScript',
+    'typescript': 'TypeScript',
+    'tensorflow': 'TensorFlow',
+    'pytorch': 'PyTorch',
+    'pandas': 'Pandas',
+    'numpy': 'NumPy',
+    'keras': 'Keras',
+    'scikit-learn': 'Scikit-learn',
+    'scipy': 'SciPy',
+    'natural language processing': 'NLP',
+    'nlp': 'NLP',
+    'computer vision': 'Computer Vision',
+    'data analysis': 'Data Analysis',
+    'machine learning': 'Machine Learning',
+    'deep learning': 'Deep Learning',
+    'genai': 'GenAI',
+    'generative ai': 'GenAI',
+    'flask': 'Flask',
+    'streamlit': 'Streamlit',
+    'fastapi': 'FastAPI',
+    'django': 'Django',
+    'spring boot': 'Spring Boot',
+    'node.js': 'Node.js',
+    'express.js': 'Express.js',
+    'matplotlib': 'Matplotlib',
+    'seaborn': 'Seaborn',
+    'plotly': 'Plotly',
+    'tableau': 'Tableau',
+    'power bi': 'Power BI',
+    'aws': 'AWS',
+    'amazon web services': 'AWS',
+    'gcp': 'GCP',
+    'google cloud platform': 'GCP',
+    'azure': 'Azure',
+    'microsoft azure': 'Azure',
+    'lambda': 'AWS Lambda', # Be more specific if possible or keep generic
+    'ec2': 'EC2',
+    's3': 'S3',
+    'docker': 'Docker',
+    'kubernetes': 'Kubernetes',
+    'terraform': 'Terraform',
+    'jenkins': 'Jenkins',
+    'git': 'Git',
+    'ci/cd': 'CI/CD',
+    'gitlab': 'GitLab',
+    'github actions': 'GitHub Actions',
+    'sql': 'SQL',
+    'postgresql': 'PostgreSQL',
+    'postgres': 'PostgreSQL',
+    'mysql': 'MySQL',
+    'mongodb': 'MongoDB',
+    'redis': 'Redis',
+    'dynamodb': 'DynamoDB',
+    'jupyter': 'Jupyter',
+    'comfyui': 'ComfyUI',
+    'owasp': 'OWASP',
+    'security': 'Security Engineering', # Keep existing or make more specific
+    'iam': 'IAM',
+    'graphql': 'GraphQL',
+    'rest api': 'REST API',
+    'microservices': 'Microservices',
+    # Add more normalizations as needed
+}
+
+def scan_lines(lines: List[str]) -> Dict[str, Any]:
+    """Classify each line once and collect header candidates in a single pass.
+
+    Returns the section split, the name (first matching line in the first 5),
+    the email (first match; emails never span lines) and, per location
+    pattern, the matches found in the first 10 non-contact lines in order.
+    """
     sections = {}
     current_section = "HEADER"
     current_content = []
-    
-    for line in lines:
-        if re.match(r'^[A-Z\s]{2,}$', line):  # Section headers are typically all caps
+    name = None
+    email = None
+    location_candidates = [[] for _ in LOCATION_PATTERNS]
+
+    for index, line in enumerate(lines):
+        if SECTION_HEADER_RE.match(line):
             if current_content:
                 sections[current_section] = current_content
             current_section = line
             current_content = []
         else:
             current_content.append(line)
+
+        if name is None and index < NAME_SCAN_LINES and NAME_RE.match(line) and not NAME_EXCLUDE_RE.search(line):
+            name = line
+
+        if email is None:
+            email_match = EMAIL_RE.search(line)
+            if email_match:
+                email = email_match.group(0)
+
+        if index < LOCATION_SCAN_LINES and not LOCATION_SKIP_RE.search(line.lower()):
+            for candidates, pattern in zip(location_candidates, LOCATION_PATTERNS):
+                loc_match = pattern.search(line)
+                if loc_match:
+                    candidates.append(loc_match.group(1).strip())
+
     if current_content:
         sections[current_section] = current_content
 
+    return {
+        "sections": sections,
+        "name": name,
+        "email": email,
+        "location_candidates": location_candidates,
+    }
+
+def extract_fields(text: str) -> Dict[str, Any]:
+    fields = {}
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    text_block = " ".join(lines)
+    
+    # Split into sections and collect name/contact/location candidates in one pass
+    scan = scan_lines(lines)
+    sections = scan["sections"]
+
     # Name (look in first few non-empty lines, before email/phone)
-    for line in lines[:5]:
-        if re.match(r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+$', line) and not re.search(r'@|\d', line):
-            fields["name"] = line
-            break
+    if scan["name"]:
+        fields["name"] = scan["name"]
     
     # Email
-    email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', text)
-    fields["email"] = email_match.group(0) if email_match else ""
+    fields["email"] = scan["email"] or ""
     
-    # Phone
-    phone_match = re.search(r'(\+?\d[\d\s\-]{7,}\d)', text)
+    # Phone (searched on the raw text: numbers may be wrapped across lines)
+    phone_match = PHONE_RE.search(text)
     fields["phone"] = phone_match.group(0) if phone_match else ""
     
-    # Location (typically found near the name at the top)
-    location_patterns = [
-        r'([A-Z][a-z]+(?:\s*,\s*(?:India|USA|UK|Canada)))\s*(?=\n|$)',  # City, Country
-        r'([A-Z][a-z]+\s*,\s*[A-Z][a-z]+(?:\s*,\s*(?:India|USA|UK|Canada))?)',  # City, State, Country
-        r'([A-Z][a-z]+\s*,\s*[A-Z]{2})',  # City, State code
-    ]
-    
-    for pattern in location_patterns:
-        for line in lines[:10]:  # Look in first 10 lines
-            if re.search(r'@|\d|resume|cv|name|phone', line.lower()):  # Skip lines with contact info
-                continue
-            loc_match = re.search(pattern, line)
-            if loc_match:
-                potential_location = loc_match.group(1).strip()
-                # Don't use the line if it contains the candidate's name
-                if fields.get("name", "").split()[0] not in potential_location:
-                    fields["location"] = potential_location
-                    break
+    # Location (typically found near the name at the top); patterns in priority order
+    for candidates in scan["location_candidates"]:
+        for potential_location in candidates:
+            # Don't use the line if it contains the candidate's name
+            if fields.get("name", "").split()[0] not in potential_location:
+                fields["location"] = potential_location
+                break
         if fields.get("location"):
             break
     
@@ -104,12 +335,12 @@ def extract_fields(text: str) -> Dict[str, Any]:
     if "EXPERIENCE" in sections:
         exp_lines = sections["EXPERIENCE"]
         for line in exp_lines[:3]:  # Look at first few lines of experience
-            if re.search(r'engineer|developer|architect', line.lower()):
+            if TITLE_KEYWORD_RE.search(line.lower()):
                 fields["current_title"] = line.split('-')[0].strip() if '-' in line else line.strip()
                 break
     elif "SUMMARY" in sections:
         summary = " ".join(sections["SUMMARY"])
-        title_match = re.search(r'(?:As\s+(?:an?|the)\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:Engineer|Developer|Architect))', summary)
+        title_match = SUMMARY_TITLE_RE.search(summary)
         if title_match:
             fields["current_title"] = title_match.group(1)
 
@@ -117,8 +348,6 @@ def extract_fields(text: str) -> Dict[str, Any]:
     total_months = 0
     if "EXPERIENCE" in sections:
         experience_lines = sections["EXPERIENCE"]
-        date_pattern = re.compile(r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4})\s*(?:-|to)\s*((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}|Present)', re.IGNORECASE)
-        
         date_sections = []
         current_company = None
         
@@ -127,7 +356,7 @@ def extract_fields(text: str) -> Dict[str, Any]:
             if line.strip().startswith('•') or line.strip().startswith('-'):
                 continue
                 
-            date_match = date_pattern.search(line)
+            date_match = DATE_RANGE_RE.search(line)
             if date_match:
                 start_date = date_match.group(1).title()  # Normalize case
                 end_date = date_match.group(2).title() if date_match.group(2).lower() != 'present' else 'May 2025'
@@ -164,99 +393,14 @@ def extract_fields(text: str) -> Dict[str, Any]:
     
     fields["years_exp"] = str(total_months // 12) if total_months > 0 else ""
     
-    # Hard skills with expanded categories and normalization mapping
-    skill_patterns = {
-        "languages": r'\b(Python|Go|C\+\+|Java|JavaScript|TypeScript|Ruby|Scala|Kotlin|Swift|Rust)\b',
-        "ai_ml_libraries": r'\b(TensorFlow|PyTorch|Pandas|NumPy|Keras|Scikit-learn|SciPy)\b',
-        "ai_ml_concepts": r'\b(Natural Language Processing|NLP|Computer Vision|Data Analysis|Machine Learning|Deep Learning|GenAI|Generative AI)\b',
-        "web_frameworks": r'\b(Flask|Streamlit|FastAPI|Django|Spring Boot|Ruby on Rails|Node\.js|Express\.js)\b',
-        "data_visualization": r'\b(Matplotlib|Seaborn|Plotly|Tableau|Power BI|Looker|D3\.js)\b',
-        "cloud": r'\b(AWS|Amazon Web Services|GCP|Google Cloud Platform|Azure|Microsoft Azure|Lambda|EC2|S3|Cloud Functions|CloudFormation|ARM Templates|Azure DevOps)\b',
-        "devops": r'\b(Docker|Kubernetes|Terraform|Jenkins|Git|CI/CD|GitLab|GitHub Actions|Ansible|Puppet|Chef)\b',
-        "databases": r'\b(SQL|PostgreSQL|Postgres|MySQL|MongoDB|Redis|DynamoDB|Cassandra|SQLite|Oracle DB|Microsoft SQL Server)\b',
-        "tools": r'\b(Linux|Nginx|Apache|Maven|Gradle|npm|yarn|Jupyter|ComfyUI|Airflow|Spark|Hadoop|Kafka)\b',
-        "security": r'\b(OWASP|Burp Suite|ZAP|JMeter|IAM|Security|OAuth|Encryption|Firewalls|SIEM|SOAR)\b',
-        "other_tech": r'\b(GraphQL|REST API|Microservices|Big Data|Data Engineering|ETL|Data Warehousing|Blockchain)\b' # Catch-all for other important tech
-    }
-    
-    # Normalize skill names - ensure lowercase keys for matching
-    skill_normalization = {
-        'python': 'Python',
-        'go': 'Go',
-        'c++': 'C++',
-        'java': 'Java',
-        'javascript': 'JavaScript',
-        'typescript': 'TypeScript',
-        'tensorflow': 'TensorFlow',
-        'pytorch': 'PyTorch',
-        'pandas': 'Pandas',
-        'numpy': 'NumPy',
-        'keras': 'Keras',
-        'scikit-learn': 'Scikit-learn',
-        'scipy': 'SciPy',
-        'natural language processing': 'NLP',
-        'nlp': 'NLP',
-        'computer vision': 'Computer Vision',
-        'data analysis': 'Data Analysis',
-        'machine learning': 'Machine Learning',
-        'deep learning': 'Deep Learning',
-        'genai': 'GenAI',
-        'generative ai': 'GenAI',
-        'flask': 'Flask',
-        'streamlit': 'Streamlit',
-        'fastapi': 'FastAPI',
-        'django': 'Django',
-        'spring boot': 'Spring Boot',
-        'node.js': 'Node.js',
-        'express.js': 'Express.js',
-        'matplotlib': 'Matplotlib',
-        'seaborn': 'Seaborn',
-        'plotly': 'Plotly',
-        'tableau': 'Tableau',
-        'power bi': 'Power BI',
-        'aws': 'AWS',
-        'amazon web services': 'AWS',
-        'gcp': 'GCP',
-        'google cloud platform': 'GCP',
-        'azure': 'Azure',
-        'microsoft azure': 'Azure',
-        'lambda': 'AWS Lambda', # Be more specific if possible or keep generic
-        'ec2': 'EC2',
-        's3': 'S3',
-        'docker': 'Docker',
-        'kubernetes': 'Kubernetes',
-        'terraform': 'Terraform',
-        'jenkins': 'Jenkins',
-        'git': 'Git',
-        'ci/cd': 'CI/CD',
-        'gitlab': 'GitLab',
-        'github actions': 'GitHub Actions',
-        'sql': 'SQL',
-        'postgresql': 'PostgreSQL',
-        'postgres': 'PostgreSQL',
-        'mysql': 'MySQL',
-        'mongodb': 'MongoDB',
-        'redis': 'Redis',
-        'dynamodb': 'DynamoDB',
-        'jupyter': 'Jupyter',
-        'comfyui': 'ComfyUI',
-        'owasp': 'OWASP',
-        'security': 'Security Engineering', # Keep existing or make more specific
-        'iam': 'IAM',
-        'graphql': 'GraphQL',
-        'rest api': 'REST API',
-        'microservices': 'Microservices',
-        # Add more normalizations as needed
-    }
-    
     all_skills = []
     seen_skills = set()  # Track normalized skills to avoid duplicates
     
-    for category, pattern in skill_patterns.items():
-        matches = re.finditer(pattern, text, re.I)
+    for category, pattern in SKILL_PATTERNS.items():
+        matches = pattern.finditer(text)
         for match in matches:
             skill = match.group(1)
-            normalized_skill = skill_normalization.get(skill.lower(), skill.title())
+            normalized_skill = SKILL_NORMALIZATION.get(skill.lower(), skill.title())
             
             if normalized_skill.lower() not in seen_skills:
                 all_skills.append(normalized_skill)
@@ -266,6 +410,28 @@ def extract_fields(text: str) -> Dict[str, Any]:
     fields["hard_skills"] = sorted(all_skills)
     return fields
 
+# Completeness weights for score_fields; they sum to 1.0
+FIELD_WEIGHTS = {
+    "name": 0.25,
+    "email": 0.2,
+    "current_title": 0.15,
+    "phone": 0.1,
+    "location": 0.1,
+    "years_exp": 0.1,
+    "hard_skills": 0.1,
+}
+
+def score_fields(fields: Optional[Dict[str, Any]]) -> float:
+    """Confidence in an extract_fields result, from 0.0 to 1.0, by field completeness."""
+    if not fields:
+        return 0.0
+    score = 0.0
+    for field, weight in FIELD_WEIGHTS.items():
+        value = fields.get(field)
+        if value and (not isinstance(value, str) or value.strip()):
+            score += weight
+    return round(score, 4)
+
 def convert_date_to_months(date_str: str) -> int:
     """Convert a date string like 'Jan 2020' to total months since year 0"""
     month_map = {
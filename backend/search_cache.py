@@ -0,0 +1,180 @@
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+class CatalogGeneration:
+    """Counter that goes up whenever candidate rows or embeddings change.
+
+    Backed by shared memory so that worker processes forked from the same
+    parent all see one counter: a bump in any worker invalidates every
+    worker's cache.
+    """
+
+    def __init__(self):
+        self._value = multiprocessing.Value("q", 0)
+
+    @property
+    def value(self) -> int:
+        return self._value.value
+
+    def bump(self) -> int:
+        with self._value.get_lock():
+            self._value.value += 1
+            return self._value.value
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+class SearchCache:
+    """LRU + TTL cache for search results, tagged with the catalog generation.
+
+    An entry stored under an older generation than the current one is a
+    miss, so results never outlive the data they were computed from. Callers
+    should read the generation *before* computing a result and store it with
+    that value, so a write that lands mid-query also invalidates it.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry_generation, expires_at, value = entry
+            if entry_generation != generation or expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, generation: int, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+SNAPSHOT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+class SharedSnapshotStore:
+    """Search snapshots shared by every worker process through a directory.
+
+    Each snapshot is one small JSON file, written to a temp file and renamed
+    into place, so a cursor issued by one worker resolves in any other worker
+    on the same host. Files older than ttl_seconds are expired; every
+    prune_every puts, expired files and anything beyond max_entries (oldest
+    first) are removed. A per-process LRU in front saves re-reading the file
+    while one worker pages through its own snapshot.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 4096, ttl_seconds: float = 1800.0,
+                 local_entries: int = 256, prune_every: int = 64):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.prune_every = max(1, prune_every)
+        self._local = SearchCache(max_entries=local_entries, ttl_seconds=ttl_seconds)
+        self._puts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, snapshot_id: str) -> Optional[str]:
+        # Snapshot ids come back from client-supplied cursors
+        if not SNAPSHOT_ID_RE.match(snapshot_id):
+            return None
+        return os.path.join(self.directory, f"{snapshot_id}.json")
+
+    def get(self, snapshot_id: str) -> Optional[Any]:
+        value = self._local.get(snapshot_id, 0)
+        if value is not None:
+            return value
+        path = self._path(snapshot_id)
+        if path is None:
+            return None
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                return None
+            with open(path) as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._local.put(snapshot_id, 0, value)
+        return value
+
+    def touch(self, snapshot_id: str) -> bool:
+        """Mark a snapshot as used now; False if it has expired or been pruned.
+
+        Callers that hand out cursors into a snapshot from a cache touch it
+        first, so the snapshot lives at least as long as the cached page.
+        """
+        path = self._path(snapshot_id)
+        if path is None:
+            return False
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                return False
+            os.utime(path)
+        except OSError:
+            return False
+        return True
+
+    def put(self, snapshot_id: str, value: Any) -> None:
+        path = self._path(snapshot_id)
+        if path is None or self.max_entries <= 0:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._local.put(snapshot_id, 0, value)
+        self._puts += 1
+        if self._puts % self.prune_every == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        live = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    mtime = entry.stat().st_mtime
+                    if mtime < cutoff:
+                        os.unlink(entry.path)
+                    elif entry.name.endswith(".json"):
+                        live.append((mtime, entry.path))
+                except OSError:
+                    pass  # removed by another worker
+        live.sort()
+        for _, path in live[:max(0, len(live) - self.max_entries)]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,314 @@
+import json
+import os
+import struct
+import threading
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+import numpy as np
+
+from backend.ivf_index import IVFIndex
+
+# On-disk vector snapshot for in-process search.
+#
+# A directory holds one committed generation plus its delta log:
+#   meta.json              {"generation": g, "dim": d, "count": n}; the commit point
+#   snapshot-<g>.f32       n x d float32 matrix of unit-normalized vectors
+#   snapshot-<g>.ids       n x 36 bytes, candidate uuids as ASCII
+#   delta-<g>.log          append-only upserts/deletes made after snapshot g
+# Opening memory-maps the matrix and id table (no parsing, no copies) and
+# replays the delta log into a small in-memory overlay. compact() folds the
+# overlay into generation g+1 and switches meta.json over atomically; other
+# processes sharing the directory notice on their next refresh().
+
+VECTOR_SNAPSHOT_DIR = os.getenv("VECTOR_SNAPSHOT_DIR", ".vector_snapshot")
+# Extra snapshot rows fetched per query to make up for ones the delta log
+# shadows; fetched again (doubling) only when filtering leaves fewer than k
+SEARCH_OVERFETCH = int(os.getenv("VECTOR_SEARCH_OVERFETCH", "32"))
+ID_BYTES = 36
+_DELTA_HEADER = struct.Struct(f"<c{ID_BYTES}s")  # op (b"U" upsert / b"D" delete), id
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+def _paths(directory: str, generation: int) -> Tuple[str, str, str]:
+    return (
+        os.path.join(directory, f"snapshot-{generation}.f32"),
+        os.path.join(directory, f"snapshot-{generation}.ids"),
+        os.path.join(directory, f"delta-{generation}.log"),
+    )
+
+def _write_meta(directory: str, meta: dict) -> None:
+    tmp_path = os.path.join(directory, "meta.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(directory, "meta.json"))
+
+def acquire_build_lock(directory: str):
+    """Block until this process holds the directory's build lock; close the returned file to release it.
+
+    Serialises the initial snapshot build between worker processes: the first
+    to get the lock builds, the others find the committed snapshot and open it.
+    """
+    os.makedirs(directory, exist_ok=True)
+    lock_file = open(os.path.join(directory, "build.lock"), "a")
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+    return lock_file
+
+def write_snapshot(directory: str, rows: Iterable[Tuple[str, Sequence[float]]], dim: int, generation: int = 1) -> int:
+    """Write (id, vector) rows as generation `generation` and commit it. Returns the row count."""
+    os.makedirs(directory, exist_ok=True)
+    matrix_path, ids_path, delta_path = _paths(directory, generation)
+    count = 0
+    with open(matrix_path, "wb") as matrix_file, open(ids_path, "wb") as ids_file:
+        batch_ids: List[bytes] = []
+        batch_vectors: List[Sequence[float]] = []
+
+        def flush():
+            if batch_vectors:
+                matrix_file.write(_normalize(np.asarray(batch_vectors, dtype=np.float32)).tobytes())
+                ids_file.write(b"".join(batch_ids))
+                batch_ids.clear()
+                batch_vectors.clear()
+
+        for candidate_id, vector in rows:
+            if len(vector) != dim:
+                continue
+            batch_ids.append(str(candidate_id).encode("ascii").ljust(ID_BYTES)[:ID_BYTES])
+            batch_vectors.append(vector)
+            count += 1
+            if len(batch_vectors) >= 4096:
+                flush()
+        flush()
+    open(delta_path, "ab").close()
+    _write_meta(directory, {"generation": generation, "dim": dim, "count": count})
+    return count
+
+class VectorSnapshot:
+    def __init__(self, directory: str = VECTOR_SNAPSHOT_DIR):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._open()
+
+    @staticmethod
+    def exists(directory: str = VECTOR_SNAPSHOT_DIR) -> bool:
+        return os.path.exists(os.path.join(directory, "meta.json"))
+
+    def _open(self) -> None:
+        meta_path = os.path.join(self.directory, "meta.json")
+        with open(meta_path) as f:
+            meta = json.load(f)
+        self._meta_mtime = os.stat(meta_path).st_mtime_ns
+        self.generation = meta["generation"]
+        self.dim = meta["dim"]
+        matrix_path, ids_path, self._delta_path = _paths(self.directory, self.generation)
+        count = meta["count"]
+        if count:
+            self._matrix = np.memmap(matrix_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+            self._ids = np.memmap(ids_path, dtype=f"S{ID_BYTES}", mode="r", shape=(count,))
+        else:
+            self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+            self._ids = np.zeros((0,), dtype=f"S{ID_BYTES}")
+        self.index: Optional[IVFIndex] = None  # approximate index over this generation's matrix
+        # Overlay built from the delta log
+        self._overlay_ids: List[str] = []
+        self._overlay_vectors: List[np.ndarray] = []
+        self._overlay_index = {}
+        self._shadowed: Set[str] = set()  # snapshot ids replaced or deleted by the delta log
+        self._overlay_matrix: Optional[np.ndarray] = None
+        self._delta_read = 0
+        self._replay_delta()
+
+    def _apply(self, op: bytes, candidate_id: str, vector: Optional[np.ndarray]) -> None:
+        self._shadowed.add(candidate_id)
+        position = self._overlay_index.get(candidate_id)
+        if op == b"U":
+            if position is None:
+                self._overlay_index[candidate_id] = len(self._overlay_ids)
+                self._overlay_ids.append(candidate_id)
+                self._overlay_vectors.append(vector)
+            else:
+                self._overlay_vectors[position] = vector
+        elif position is not None:
+            self._overlay_vectors[position] = None
+        self._overlay_matrix = None
+
+    def _replay_delta(self) -> None:
+        if not os.path.exists(self._delta_path):
+            return
+        record_vector = self.dim * 4
+        with open(self._delta_path, "rb") as f:
+            f.seek(self._delta_read)
+            data = f.read()
+        pos = 0
+        while pos + _DELTA_HEADER.size <= len(data):
+            op, raw_id = _DELTA_HEADER.unpack_from(data, pos)
+            end = pos + _DELTA_HEADER.size + (record_vector if op == b"U" else 0)
+            if end > len(data):
+                break  # torn record from a writer that is still appending (or crashed)
+            vector = None
+            if op == b"U":
+                vector = np.frombuffer(data, dtype=np.float32, count=self.dim, offset=pos + _DELTA_HEADER.size)
+            self._apply(op, raw_id.decode("ascii").strip(), vector)
+            pos = end
+        self._delta_read += pos
+
+    def refresh(self) -> None:
+        """Pick up compactions and delta records written by other processes."""
+        with self._lock:
+            meta_path = os.path.join(self.directory, "meta.json")
+            if os.stat(meta_path).st_mtime_ns != self._meta_mtime:
+                self._open()
+            elif os.path.getsize(self._delta_path) > self._delta_read:
+                self._replay_delta()
+
+    def _append(self, records: List[Tuple[bytes, str, Optional[np.ndarray]]]) -> None:
+        payload = b"".join(
+            _DELTA_HEADER.pack(op, candidate_id.encode("ascii").ljust(ID_BYTES)[:ID_BYTES])
+            + (vector.tobytes() if vector is not None else b"")
+            for op, candidate_id, vector in records
+        )
+        meta_path = os.path.join(self.directory, "meta.json")
+        while True:
+            try:
+                fd = os.open(self._delta_path, os.O_WRONLY | os.O_APPEND)
+            except FileNotFoundError:
+                self._open()  # compacted away under us
+                continue
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                # A compaction that finished while we waited for the lock has
+                # already folded this log; write to the new generation instead
+                if os.stat(meta_path).st_mtime_ns != self._meta_mtime:
+                    self._open()
+                    continue
+                os.write(fd, payload)
+                return
+            finally:
+                os.close(fd)
+
+    def upsert(self, candidate_id: str, vector: Sequence[float]) -> None:
+        if len(vector) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dim vector, got {len(vector)}")
+        normalized = _normalize(np.asarray([vector], dtype=np.float32))[0]
+        with self._lock:
+            self.refresh()
+            self._append([(b"U", str(candidate_id), normalized)])
+            self._replay_delta()
+
+    def delete(self, candidate_id: str) -> None:
+        with self._lock:
+            self.refresh()
+            self._append([(b"D", str(candidate_id), None)])
+            self._replay_delta()
+
+    @property
+    def delta_count(self) -> int:
+        return len(self._overlay_ids)
+
+    @property
+    def snapshot_count(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: Sequence[float], k: int, threshold: float = -1.0) -> List[List]:
+        """Top-k [id, cosine similarity] pairs above threshold, best first."""
+        q = _normalize(np.asarray([query], dtype=np.float32))[0]
+        with self._lock:
+            self.refresh()
+            results = self._search_snapshot(q, k) if len(self._ids) else []
+            if self._overlay_ids:
+                if self._overlay_matrix is None:
+                    self._overlay_matrix = np.stack([
+                        v if v is not None else np.full(self.dim, np.nan, dtype=np.float32)
+                        for v in self._overlay_vectors
+                    ])
+                overlay_scores = self._overlay_matrix @ q
+                for candidate_id, score in zip(self._overlay_ids, overlay_scores):
+                    if not np.isnan(score):
+                        results.append((float(score), candidate_id))
+        results = [r for r in results if r[0] > threshold]
+        results.sort(reverse=True)
+        return [[candidate_id, score] for score, candidate_id in results[:k]]
+
+    def _search_snapshot(self, q: np.ndarray, k: int) -> List[Tuple[float, str]]:
+        """Top-k (score, id) from the snapshot matrix, skipping ids the delta log shadows."""
+        all_scores = None
+        take = min(len(self._ids), k + SEARCH_OVERFETCH)
+        while True:
+            if self.index is not None:
+                rows, scores = self.index.search(q, take)
+            else:
+                if all_scores is None:
+                    all_scores = self._matrix @ q
+                rows = np.argpartition(-all_scores, take - 1)[:take] if take < len(all_scores) else np.arange(len(all_scores))
+                scores = all_scores[rows]
+            results = []
+            for row, score in zip(rows, scores):
+                candidate_id = self._ids[row].decode("ascii").strip()
+                if candidate_id not in self._shadowed:
+                    results.append((float(score), candidate_id))
+            # Short only if many of the best rows were shadowed; fewer rows than
+            # asked for means the index has nothing more to give
+            if len(results) >= k or take >= len(self._ids) or len(rows) < take:
+                return results
+            take = min(len(self._ids), take * 2)
+
+    def build_index(self, nlist: Optional[int] = None, nprobe: Optional[int] = None) -> Optional[IVFIndex]:
+        """Train an IVF index over the current generation and use it for search.
+
+        Runs without the lock (training takes a while); the index is dropped
+        if a compaction switched generations in the meantime.
+        """
+        generation, matrix = self.generation, self._matrix
+        if not len(matrix):
+            return None
+        index = IVFIndex.build(matrix, nlist=nlist, nprobe=nprobe)
+        with self._lock:
+            if self.generation == generation:
+                self.index = index
+        return index
+
+    def compact(self) -> int:
+        """Fold the delta log into a new generation. Returns the new row count."""
+        with self._lock:
+            lock_file = open(os.path.join(self.directory, "compact.lock"), "a")
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                self.refresh()
+                old_paths = _paths(self.directory, self.generation)
+                # Block appends to the current delta log while it is folded in
+                with open(self._delta_path, "ab") as delta_file:
+                    if fcntl is not None:
+                        fcntl.flock(delta_file.fileno(), fcntl.LOCK_EX)
+                    self._replay_delta()
+
+                    def rows():
+                        for row in range(len(self._ids)):
+                            candidate_id = self._ids[row].decode("ascii").strip()
+                            if candidate_id not in self._shadowed:
+                                yield candidate_id, self._matrix[row]
+                        for candidate_id, vector in zip(self._overlay_ids, self._overlay_vectors):
+                            if vector is not None:
+                                yield candidate_id, vector
+
+                    count = write_snapshot(self.directory, rows(), self.dim, self.generation + 1)
+                self._open()
+                for path in old_paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                return count
+            finally:
+                lock_file.close()
@@ -0,0 +1,91 @@
+import asyncio
+import io
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("hireai.warmup")
+
+# Representative resume used to exercise every parsing path once at startup
+SAMPLE_RESUME = """John Smith
+San Francisco, CA
+john@example.com
+(555) 123-4567
+
+SUMMARY
+As a Senior Software Engineer with a track record of shipping production systems.
+
+EXPERIENCE
+Senior Software Engineer - Tech Corp
+Jan 2020 - Present
+- Led development of microservices architecture using Python, AWS and Kubernetes
+- Implemented CI/CD pipelines
+
+EDUCATION
+BS Computer Science - University of California
+2014 - 2018
+
+SKILLS
+JavaScript, TypeScript, Python, React, Node.js, AWS, Docker, PostgreSQL"""
+
+def sample_pdf() -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 560, 800), SAMPLE_RESUME, fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def sample_docx() -> bytes:
+    import docx
+
+    document = docx.Document()
+    for line in SAMPLE_RESUME.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+class Warmup:
+    """Runs blocking warmup steps in order on worker threads and tracks readiness.
+
+    A failing step is recorded and skipped; readiness means every step has
+    been attempted, so a missing optional model can't keep an instance out of
+    rotation forever.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], Any]]]):
+        self.steps = steps
+        self.results: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name, _ in steps}
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def run(self) -> None:
+        self.started_at = time.monotonic()
+        for name, step in self.steps:
+            self.results[name] = {"status": "running"}
+            t0 = time.perf_counter()
+            try:
+                await asyncio.to_thread(step)
+                self.results[name] = {"status": "ok", "seconds": round(time.perf_counter() - t0, 3)}
+            except Exception as e:
+                # Some errors (NLTK LookupError) span many lines; the first non-empty one says what failed
+                message = next((line.strip() for line in str(e).splitlines() if line.strip(" *")), "")
+                error = f"{type(e).__name__}: {message}"
+                self.results[name] = {"status": "failed", "seconds": round(time.perf_counter() - t0, 3), "error": error}
+                logger.warning("Warmup step failed", extra={"fields": {"step": name, "error": error}})
+        self.finished_at = time.monotonic()
+        self.ready = True
+        logger.info("Warmup complete", extra={"fields": {"seconds": round(self.finished_at - self.started_at, 3), "steps": self.results}})
+
+    def mark_ready(self) -> None:
+        """Skip warmup entirely (e.g. disabled by configuration)."""
+        for name in self.results:
+            self.results[name] = {"status": "skipped"}
+        self.ready = True
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "steps": self.results}
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger("hireai.write_behind")
+
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "50"))
+WRITE_BATCH_WAIT_MS = float(os.getenv("WRITE_BATCH_WAIT_MS", "5"))
+# Columns bulk_update_candidates knows how to write (see bulk_update_candidates_function.sql)
+PATCHABLE_COLUMNS = ("current_title", "years_exp", "skills", "ai_summary")
+
+def _resolve(future: asyncio.Future, result: Any) -> None:
+    if not future.done():  # the caller may have gone away
+        future.set_result(result)
+
+def _fail(future: asyncio.Future, error: BaseException) -> None:
+    if not future.done():
+        future.set_exception(error)
+
+class WriteBehindBuffer:
+    """Merges concurrent candidate inserts and patches into multi-row requests.
+
+    Callers await insert() / patch() as if they were single requests. A
+    background task collects whatever is queued for up to max_wait_ms (or
+    until max_batch operations are waiting) and sends:
+      - all inserts as one array POST with return=representation; rows come
+        back in input order, so each caller's future gets its own row (and
+        generated id). If PostgREST refuses the batch with a 4xx (nothing is
+        written, it is a single statement), rows are retried one by one so a
+        single bad row only fails its own caller. Any other failure (5xx,
+        timeout, dropped connection) fails the whole batch: it may already
+        be committed, and retrying would duplicate the rows.
+      - all patches, merged per id, as one bulk_update_candidates call.
+    stop() flushes anything still queued before shutting down.
+    """
+
+    def __init__(self, base_url: str, headers: Dict[str, str], max_batch: int = WRITE_BATCH_SIZE,
+                 max_wait_ms: float = WRITE_BATCH_WAIT_MS):
+        self.base_url = base_url
+        self.headers = headers
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._client = httpx.AsyncClient(timeout=30.0)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            await self._client.aclose()
+
+    async def insert(self, row: Dict[str, Any], select: str = "id") -> Dict[str, Any]:
+        """Insert one candidate row; returns the inserted row projected to `select`."""
+        return await self._submit(("insert", select, row))
+
+    async def patch(self, candidate_id: str, columns: Dict[str, Any]) -> None:
+        unknown = [c for c in columns if c not in PATCHABLE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Columns not supported by bulk updates: {', '.join(unknown)}")
+        try:
+            candidate_id = str(uuid.UUID(str(candidate_id)))
+        except ValueError:
+            # bulk_update_candidates casts ids to uuid; one bad id would fail the whole batch
+            raise ValueError(f"Invalid candidate id: {candidate_id}")
+        await self._submit(("patch", candidate_id, columns))
+
+    async def _submit(self, op: Tuple[str, str, Dict[str, Any]]) -> Any:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Tuple[str, str, Dict[str, Any]], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                inserts: Dict[str, list] = {}
+                for (kind, key, payload), future in batch:
+                    if kind == "insert":
+                        inserts.setdefault(key, []).append((payload, future))
+                for select, items in inserts.items():
+                    await self._flush_inserts(select, items)
+                await self._flush_patches([(key, payload, future) for (kind, key, payload), future in batch if kind == "patch"])
+            except Exception as e:  # never let the worker die with callers waiting
+                for _, future in batch:
+                    _fail(future, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _post_rows(self, rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        # PostgREST needs one column list for a multi-row insert; absent keys take the column default
+        columns = sorted({column for row in rows for column in row})
+        response = await self._client.post(
+            f"{self.base_url}/rest/v1/candidates",
+            params={"columns": ",".join(columns), "select": select},
+            json=rows,
+            headers={**self.headers, "Content-Type": "application/json",
+                     "Prefer": "return=representation,missing=default"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _flush_inserts(self, select: str, items: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            inserted = await self._post_rows([row for row, _ in items], select)
+        except Exception as e:
+            refused = isinstance(e, httpx.HTTPStatusError) and 400 <= e.response.status_code < 500
+            if len(items) == 1 or not refused:
+                for _, future in items:
+                    _fail(future, e)
+                return
+            logger.warning("Batch insert failed, retrying rows individually", extra={"fields": {"rows": len(items), "error": str(e)}})
+            for row, future in items:
+                try:
+                    _resolve(future, (await self._post_rows([row], select))[0])
+                except Exception as row_error:
+                    _fail(future, row_error)
+            return
+        if len(inserted) != len(items):
+            # The rows were written, so retrying would duplicate them
+            error = RuntimeError(f"Inserted {len(inserted)} rows for a batch of {len(items)}")
+            for _, future in items:
+                _fail(future, error)
+            return
+        for (_, future), row in zip(items, inserted):
+            _resolve(future, row)
+        logger.debug("Flushed candidate inserts", extra={"fields": {"rows": len(items)}})
+
+    async def _flush_patches(self, items: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        if not items:
+            return
+        merged: Dict[str, Dict[str, Any]] = {}
+        for candidate_id, columns, _ in items:
+            merged.setdefault(candidate_id, {}).update(columns)  # later patches win
+        try:
+            response = await self._client.post(
+                f"{self.base_url}/rest/v1/rpc/bulk_update_candidates",
+                json={"updates": [{"id": candidate_id, **columns} for candidate_id, columns in merged.items()]},
+                headers={**self.headers, "Content-Type": "application/json"},
+            )
+            response.raise_for_status()
+        except Exception as e:
+            for _, _, future in items:
+                _fail(future, e)
+            return
+        for _, _, future in items:
+            _resolve(future, None)
+        logger.debug("Flushed candidate patches", extra={"fields": {"rows": len(merged)}})
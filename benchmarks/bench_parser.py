@@ -0,0 +1,212 @@
+"""Parser micro-benchmarks over the synthetic resume corpus.
+
+Measures the text extractors and field parsers on the parsing hot path and
+compares each run with a stored baseline:
+
+    python -m benchmarks.bench_parser                   # run and compare
+    python -m benchmarks.bench_parser --save-baseline   # record a new baseline
+    python -m benchmarks.bench_parser --only extract_fields --repeat 20
+
+Baselines are machine specific: record them on the machine (or CI runner)
+that later runs the comparison. The process exits with status 1 when any
+target's p50 or p95 regresses by more than --tolerance. The committed
+benchmarks/baseline.json is a reference recorded on the machine described in
+its "machine" entry; on any other machine regressions are reported but do not
+fail the run unless --strict is given. `make bench` runs the comparison.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import generate_corpus, to_docx, to_pdf
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def _load_router():
+    from backend.routers import resume_parser as router
+    return router
+
+def _load_app():
+    import app
+    return app
+
+def _load_standalone_parser():
+    import resume_parser
+    return resume_parser
+
+def _parse_upload(kind: str) -> Callable[[bytes], Dict]:
+    # The /parse-resume-file/ path: upload bytes straight into a ResumeDocument
+    parser = _load_standalone_parser()
+    return lambda data: parser.parse_resume_content(parser.ResumeDocument.from_bytes(data, f"resume.{kind}"))
+
+# name -> (loader returning the callable, input kind)
+TARGETS: Dict[str, Tuple[Callable[[], Callable], str]] = {
+    "router.extract_text_from_pdf": (lambda: _load_router().extract_text_from_pdf, "pdf"),
+    "app.extract_text_from_pdf": (lambda: _load_app().extract_text_from_pdf, "pdf"),
+    "router.extract_text_from_docx": (lambda: _load_router().extract_text_from_docx, "docx"),
+    "app.extract_text_from_docx": (lambda: _load_app().extract_text_from_docx, "docx"),
+    "extract_fields": (lambda: _load_router().extract_fields, "text"),
+    "parse_resume_content.pdf": (lambda: _load_standalone_parser().parse_resume_content, "pdf_path"),
+    "parse_resume_content.docx": (lambda: _load_standalone_parser().parse_resume_content, "docx_path"),
+    "parse_resume_content.pdf_bytes": (lambda: _parse_upload("pdf"), "pdf"),
+    "parse_resume_content.docx_bytes": (lambda: _parse_upload("docx"), "docx"),
+}
+
+def machine_info() -> Dict[str, str]:
+    """What a baseline was recorded on; timings only compare on the same machine."""
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": str(os.cpu_count()),
+        "python": platform.python_version(),
+    }
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def build_inputs(count_per_class: int, sizes) -> Dict[str, List]:
+    resumes = list(generate_corpus(count_per_class, sizes))
+    inputs = {
+        "text": [r.text for r in resumes],
+        "pdf": [to_pdf(r) for r in resumes],
+        "docx": [to_docx(r) for r in resumes],
+    }
+    tmp_dir = tempfile.mkdtemp(prefix="hireai-bench-")
+    atexit.register(shutil.rmtree, tmp_dir, True)
+    for kind in ("pdf", "docx"):
+        paths = []
+        for resume, data in zip(resumes, inputs[kind]):
+            path = os.path.join(tmp_dir, f"{resume.name}.{kind}")
+            with open(path, "wb") as f:
+                f.write(data)
+            paths.append(path)
+        inputs[f"{kind}_path"] = paths
+    return inputs
+
+def run_target(func: Callable, items: List, repeat: int, count_bytes: bool = True) -> Dict[str, float]:
+    func(items[0])  # warm up imports and lazy initialisation
+    timings: List[float] = []
+    errors = 0
+    total_bytes = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            t0 = time.perf_counter()
+            try:
+                func(item)
+            except Exception:
+                errors += 1
+            timings.append(time.perf_counter() - t0)
+            if count_bytes:
+                total_bytes += len(item)
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "errors": errors,
+        "docs_per_sec": len(timings) / elapsed if elapsed else 0.0,
+        "mb_per_sec": (total_bytes / 1e6) / elapsed if elapsed and total_bytes else 0.0,
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+    }
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if previous.get(key) and current[key] > previous[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {current[key]:.3f}ms vs baseline {previous[key]:.3f}ms "
+                    f"(+{(current[key] / previous[key] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+def print_table(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    header = f"{'target':32} {'calls':>6} {'err':>4} {'docs/s':>9} {'MB/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'vs base p50':>12}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        base = baseline.get(name, {}).get("p50_ms")
+        delta = f"{(r['p50_ms'] / base - 1) * 100:+.1f}%" if base else "n/a"
+        print(f"{name:32} {r['calls']:>6} {r['errors']:>4} {r['docs_per_sec']:>9.1f} {r['mb_per_sec']:>7.2f} "
+              f"{r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {delta:>12}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the resume parsing hot path")
+    parser.add_argument("--count", type=int, default=5, help="resumes per layout/size class")
+    parser.add_argument("--sizes", default="small,medium,large", help="comma-separated size classes")
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the corpus per target")
+    parser.add_argument("--only", action="append", help="run only these targets (repeatable)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed slowdown before failing")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--strict", action="store_true",
+                        help="fail on regressions even when the baseline was recorded on another machine")
+    args = parser.parse_args(argv)
+
+    inputs = build_inputs(args.count, tuple(args.sizes.split(",")))
+    results: Dict[str, Dict] = {}
+    for name, (loader, kind) in TARGETS.items():
+        if args.only and name not in args.only:
+            continue
+        try:
+            func = loader()
+        except Exception as e:
+            print(f"skipping {name}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+        results[name] = run_target(func, inputs[kind], args.repeat, count_bytes=not kind.endswith("_path"))
+
+    baseline, baseline_machine = {}, {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        baseline, baseline_machine = stored.get("results", {}), stored.get("machine", {})
+
+    print_table(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+
+    if args.save_baseline:
+        merged = dict(baseline)
+        merged.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": machine_info(), "results": merged}, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    same_machine = baseline_machine == machine_info()
+    if not same_machine:
+        print(f"\nBaseline was recorded on another machine ({baseline_machine or 'unknown'}); "
+              "timings are indicative only.")
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if same_machine or args.strict else 0
+    print("\nNo regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Recall/latency benchmark for IVF + int8 vector search against exact search.
+
+Builds an IVFIndex over synthetic clustered embeddings (384 dims, unit norm,
+like all-MiniLM-L6-v2 output) and, for each nprobe, reports recall@k against
+brute-force cosine search and per-query latency:
+
+    python -m benchmarks.bench_vector_search                       # 200k vectors
+    python -m benchmarks.bench_vector_search --count 1000000 --nprobe 4 8 16 32
+    python -m benchmarks.bench_vector_search --snapshot .vector_snapshot
+
+--snapshot benchmarks the real catalog in a vector snapshot directory
+instead; queries are then perturbed copies of catalog vectors.
+"""
+import argparse
+import statistics
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from backend.ivf_index import IVFIndex, default_nlist
+
+def synthetic_vectors(count: int, dim: int, clusters: int, spread: float, seed: int) -> np.ndarray:
+    """Gaussian mixture on the unit sphere; real resume embeddings cluster by role and stack."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    matrix = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 65536):
+        stop = min(count, start + 65536)
+        labels = rng.integers(clusters, size=stop - start)
+        block = centers[labels] + rng.normal(scale=spread, size=(stop - start, dim)).astype(np.float32)
+        matrix[start:stop] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return matrix
+
+def make_queries(matrix: np.ndarray, count: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed + 1)
+    base = matrix[rng.choice(len(matrix), size=count, replace=False)]
+    queries = base + rng.normal(scale=0.05, size=base.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+def exact_search(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = matrix @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+def timed(fn, queries: np.ndarray) -> Tuple[List[np.ndarray], List[float]]:
+    results, latencies = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return results, latencies
+
+def percentile(values: List[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1] if len(values) > 1 else values[0]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="IVF + int8 vector search vs exact search")
+    parser.add_argument("--count", type=int, default=200000, help="synthetic vectors")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=500, help="synthetic mixture components")
+    parser.add_argument("--spread", type=float, default=1.5, help="per-dimension noise around each component (higher is harder)")
+    parser.add_argument("--snapshot", help="vector snapshot directory to benchmark instead of synthetic data")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default ~sqrt(count))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--rerank", type=int, default=4, help="exact re-rank shortlist as a multiple of k")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.snapshot:
+        from backend.vector_snapshot import VectorSnapshot
+        matrix = VectorSnapshot(args.snapshot)._matrix
+        source = f"snapshot {args.snapshot}"
+    else:
+        t0 = time.perf_counter()
+        matrix = synthetic_vectors(args.count, args.dim, args.clusters, args.spread, args.seed)
+        source = f"synthetic ({time.perf_counter() - t0:.1f}s to generate)"
+    queries = make_queries(matrix, min(args.queries, len(matrix)), args.seed)
+    nlist = args.nlist or default_nlist(len(matrix))
+    print(f"{len(matrix)} vectors x {matrix.shape[1]} dims, {source}; {len(queries)} queries, k={args.k}, nlist={nlist}")
+
+    t0 = time.perf_counter()
+    index = IVFIndex.build(matrix, nlist=nlist, rerank=args.rerank)
+    print(f"Index built in {time.perf_counter() - t0:.1f}s: {index.nbytes / 2**20:.1f} MiB "
+          f"vs {matrix.nbytes / 2**20:.1f} MiB float32 ({matrix.nbytes / index.nbytes:.1f}x smaller)")
+
+    truth, exact_ms = timed(lambda q: exact_search(matrix, q, args.k), queries)
+    print(f"\n{'mode':<14}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}{'speedup':>10}")
+    print(f"{'exact':<14}{1.0:>10.3f}{statistics.median(exact_ms):>10.2f}{percentile(exact_ms, 95):>10.2f}{1.0:>9.1f}x")
+    for nprobe in args.nprobe:
+        found, ivf_ms = timed(lambda q: index.search(q, args.k, nprobe=nprobe)[0], queries)
+        recall = statistics.mean(len(np.intersect1d(f, t)) / len(t) for f, t in zip(found, truth))
+        speedup = statistics.median(exact_ms) / statistics.median(ivf_ms)
+        print(f"{'nprobe=' + str(nprobe):<14}{recall:>10.3f}{statistics.median(ivf_ms):>10.2f}"
+              f"{percentile(ivf_ms, 95):>10.2f}{speedup:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Synthetic resume corpus for parser benchmarks.
+
+Resumes are generated deterministically from a seed, so every run (and every
+machine) benchmarks the same documents. Each resume can be rendered as plain
+text, PDF (PyMuPDF) or DOCX (python-docx).
+"""
+import io
+import random
+from dataclasses import dataclass
+from typing import Iterator, List
+
+FIRST_NAMES = ["John", "Priya", "Maria", "Wei", "Ahmed", "Sofia", "Liam", "Aisha", "Carlos", "Emma"]
+LAST_NAMES = ["Smith", "Sharma", "Garcia", "Chen", "Khan", "Rossi", "Murphy", "Okafor", "Silva", "Novak"]
+LOCATIONS = ["Bangalore, India", "Austin, TX", "Toronto, Canada", "London, UK", "Seattle, WA", "Pune, India"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Data Engineer", "Backend Developer",
+          "Frontend Developer", "Solutions Architect", "Machine Learning Engineer", "DevOps Engineer"]
+COMPANIES = ["Tech Corp", "Start Up Inc", "Globex", "Initech", "Umbrella Labs", "Acme Cloud", "Hooli"]
+SKILLS = ["Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "AWS", "GCP", "Azure", "Docker",
+          "Kubernetes", "Terraform", "PostgreSQL", "MongoDB", "Redis", "Kafka", "Spark", "FastAPI",
+          "Django", "Flask", "Node.js", "GraphQL", "REST API", "Microservices", "TensorFlow", "PyTorch",
+          "Pandas", "NumPy", "Machine Learning", "NLP", "CI/CD", "Git", "Linux", "Tableau"]
+VERBS = ["Led", "Built", "Designed", "Implemented", "Migrated", "Optimized", "Automated", "Owned"]
+OBJECTS = ["a microservices platform", "CI/CD pipelines", "the data warehouse", "RESTful APIs",
+           "a real-time analytics stack", "the search service", "ML training pipelines", "the billing system"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Layouts: "classic" (all-caps section headers, several dated roles),
+# "single_role" (one dated role plus SUMMARY) and "freeform" (no section headers)
+LAYOUTS = ("classic", "single_role", "freeform")
+# Size classes: number of roles and bullets per role
+SIZES = {"small": (1, 2), "medium": (3, 4), "large": (8, 8), "portfolio": (30, 10)}
+
+@dataclass
+class SyntheticResume:
+    seed: int
+    layout: str
+    size: str
+    text: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.layout}-{self.size}-{self.seed}"
+
+def _bullets(rng: random.Random, count: int) -> List[str]:
+    return [
+        f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {', '.join(rng.sample(SKILLS, 3))}"
+        for _ in range(count)
+    ]
+
+def generate_resume(seed: int, layout: str = "classic", size: str = "medium") -> SyntheticResume:
+    rng = random.Random(seed)
+    roles, bullets = SIZES[size]
+    if layout == "single_role":
+        roles = 1
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"{name.lower().replace(' ', '.')}@example.com"
+    phone = f"+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+    lines = [name, rng.choice(LOCATIONS), email, phone, ""]
+
+    title = rng.choice(TITLES)
+    if layout != "freeform":
+        lines += ["SUMMARY", f"As a {title} with a track record of shipping production systems.", ""]
+        lines.append("EXPERIENCE")
+    year = 2024
+    for i in range(roles):
+        start_year = year - rng.randint(1, 3)
+        end = "Present" if i == 0 else f"{rng.choice(MONTHS)} {year}"
+        lines.append(f"{title if i == 0 else rng.choice(TITLES)} - {rng.choice(COMPANIES)}")
+        lines.append(f"{rng.choice(MONTHS)} {start_year} - {end}")
+        lines += _bullets(rng, bullets)
+        year = start_year
+    lines.append("")
+    if layout != "freeform":
+        lines.append("EDUCATION")
+    lines += ["BS Computer Science - University of California", f"{year - 4} - {year}", ""]
+    if layout != "freeform":
+        lines.append("SKILLS")
+    lines.append(", ".join(rng.sample(SKILLS, 12)))
+    return SyntheticResume(seed=seed, layout=layout, size=size, text="\n".join(lines))
+
+def generate_corpus(count_per_class: int = 5, sizes=("small", "medium", "large")) -> Iterator[SyntheticResume]:
+    seed = 0
+    for layout in LAYOUTS:
+        for size in sizes:
+            for _ in range(count_per_class):
+                yield generate_resume(seed, layout, size)
+                seed += 1
+
+def to_pdf(resume: SyntheticResume, lines_per_page: int = 55) -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    lines = resume.text.splitlines()
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 560, 800), "\n".join(lines[start:start + lines_per_page]), fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def to_docx(resume: SyntheticResume) -> bytes:
+    import docx
+
+    document = docx.Document()
+    lines = resume.text.splitlines()
+    skills_line = lines[-1]
+    for line in lines[:-1]:
+        document.add_paragraph(line)
+    # Put skills in a table so the table-cell code paths are exercised too
+    skills = skills_line.split(", ")
+    table = document.add_table(rows=(len(skills) + 3) // 4, cols=4)
+    for i, skill in enumerate(skills):
+        table.cell(i // 4, i % 4).text = skill
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
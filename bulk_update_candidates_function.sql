@@ -0,0 +1,35 @@
+-- Drop the existing function if it exists
+DROP FUNCTION IF EXISTS bulk_update_candidates;
+
+-- Apply many partial row updates in one call (used by reparse_script.py and
+-- the API's write-behind buffer). `updates` is a JSON array of objects, each
+-- with an "id" and any of "current_title", "years_exp", "skills" and
+-- "ai_summary"; keys that are absent leave the column unchanged. Returns the
+-- number of rows updated.
+CREATE OR REPLACE FUNCTION bulk_update_candidates(updates jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  updated_count integer;
+BEGIN
+  UPDATE candidates c
+  SET
+    current_title = CASE WHEN u.patch ? 'current_title' THEN u.patch->>'current_title' ELSE c.current_title END,
+    years_exp = CASE WHEN u.patch ? 'years_exp' THEN (u.patch->>'years_exp')::float ELSE c.years_exp END,
+    skills = CASE
+      WHEN u.patch ? 'skills' THEN ARRAY(SELECT jsonb_array_elements_text(u.patch->'skills'))
+      ELSE c.skills
+    END,
+    ai_summary = CASE WHEN u.patch ? 'ai_summary' THEN u.patch->>'ai_summary' ELSE c.ai_summary END,
+    updated_at = now()
+  FROM (
+    SELECT (elem->>'id')::uuid AS id, elem - 'id' AS patch
+    FROM jsonb_array_elements(updates) AS elem
+  ) u
+  WHERE c.id = u.id;
+
+  GET DIAGNOSTICS updated_count = ROW_COUNT;
+  RETURN updated_count;
+END;
+$$;
@@ -4,18 +4,31 @@ import httpx
 from sentence_transformers import SentenceTransformer
 import json
 
+from backend.embedding_cache import EmbeddingCache
+from backend.embeddings import EMBEDDING_MODEL
+from backend.vector_snapshot import VECTOR_SNAPSHOT_DIR, VectorSnapshot
+
 # Load environment variables
 load_dotenv()
 
 # Environment variables
 SUPABASE_URL = os.getenv("VITE_SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("VITE_SUPABASE_ANON_KEY")
+HIREAI_API_URL = os.getenv("HIREAI_API_URL")  # e.g. http://localhost:3001, to invalidate cached search results
+SEARCH_INVALIDATE_TOKEN = os.getenv("SEARCH_INVALIDATE_TOKEN")
 
 # Initialize the embedding model
 print("Loading SentenceTransformer model...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
+model = SentenceTransformer(EMBEDDING_MODEL)
 print("Model loaded")
 
+# Vectors for text that was embedded before (by this script or the API) are reused
+embedding_cache = EmbeddingCache(EMBEDDING_MODEL)
+
+# The API's local vector snapshot (LOCAL_VECTOR_SEARCH), if there is one on
+# this host; new vectors go to its delta log so local search sees them
+vector_store = VectorSnapshot(VECTOR_SNAPSHOT_DIR) if VectorSnapshot.exists(VECTOR_SNAPSHOT_DIR) else None
+
 async def fetch_candidates():
     """Fetch all candidates from Supabase"""
     print("Fetching candidates...")
@@ -58,6 +71,36 @@ async def update_candidate_embedding(candidate_id, embedding):
         
         return True
 
+async def invalidate_search_cache():
+    """Tell the API that embeddings changed so cached search results are dropped"""
+    if not HIREAI_API_URL:
+        return
+    headers = {"X-Invalidate-Token": SEARCH_INVALIDATE_TOKEN} if SEARCH_INVALIDATE_TOKEN else {}
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{HIREAI_API_URL}/api/search/invalidate", headers=headers)
+        response.raise_for_status()
+        print("Search cache invalidated")
+    except Exception as e:
+        print(f"Could not invalidate search cache: {e}")
+
+def record_in_vector_snapshot(candidate_id, embedding):
+    """Append a written embedding to the local vector snapshot's delta log"""
+    global vector_store
+    if vector_store is None:
+        return
+    try:
+        vector_store.upsert(candidate_id, embedding)
+    except ValueError as e:
+        print(f"Not updating the local vector snapshot ({e}); delete {VECTOR_SNAPSHOT_DIR} so the API rebuilds it")
+        vector_store = None
+
+def compact_vector_snapshot():
+    """Fold this run's delta records into a new snapshot generation"""
+    if vector_store is not None and vector_store.delta_count:
+        count = vector_store.compact()
+        print(f"Local vector snapshot compacted ({count} vectors)")
+
 async def main():
     """Main function"""
     candidates = await fetch_candidates()
@@ -69,16 +112,22 @@ async def main():
         
         # Generate embedding
         print(f"Generating embedding for candidate {candidate['id']} ({i+1}/{len(candidates)})")
-        embedding = model.encode(candidate["raw_text"]).tolist()
+        embedding = embedding_cache.get(candidate["raw_text"])
+        if embedding is None:
+            embedding = model.encode(candidate["raw_text"]).tolist()
+            embedding_cache.put(candidate["raw_text"], embedding)
         
         # Update the candidate with the new embedding
         success = await update_candidate_embedding(candidate["id"], embedding)
         if success:
+            record_in_vector_snapshot(candidate["id"], embedding)
             print(f"Updated embedding for candidate {candidate['id']}")
         
         if (i + 1) % 10 == 0:
             print(f"Processed {i + 1}/{len(candidates)} candidates")
     
+    compact_vector_snapshot()
+    await invalidate_search_cache()
     print("Embedding process complete.")
     print("Your candidates now have 384-dimensional embeddings for search.")
 
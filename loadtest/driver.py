@@ -0,0 +1,132 @@
+"""Closed-loop load driver for the HireAI API.
+
+Runs a scenario at several concurrency levels and reports requests per
+second, error rate and latency percentiles for each level:
+
+    python -m loadtest.driver --api http://127.0.0.1:3001 --stubs http://127.0.0.1:54321 \\
+        --scenario upload --concurrency 1,4,16,64 --requests 200
+
+Scenarios:
+  upload     POST /api/resume/upload with distinct synthetic PDFs
+  bucket     POST /api/resume/parse_from_bucket on files pre-seeded in the Storage stub
+  summary    POST /api/candidate/{id}/generate_summary on candidates created via upload
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from benchmarks.bench_parser import percentile
+from benchmarks.corpus import LAYOUTS, generate_resume, to_pdf
+
+BUCKET = "candidate-resumes"
+
+def _synthetic_pdfs(count: int, seed_offset: int) -> List[bytes]:
+    return [
+        to_pdf(generate_resume(seed_offset + i, LAYOUTS[i % len(LAYOUTS)], "medium"))
+        for i in range(count)
+    ]
+
+async def _run_level(make_request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+                     concurrency: int, total: int, timeout: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while True:
+                i = next(counter)
+                if i >= total:
+                    return
+                t0 = time.perf_counter()
+                try:
+                    response = await make_request(client, i)
+                    if response.status_code >= 400:
+                        errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+async def _prepare(args, level: int) -> Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]:
+    # Fresh documents per level so the near-duplicate check does not short-circuit uploads
+    pdfs = _synthetic_pdfs(args.requests, seed_offset=level * 100000)
+
+    if args.scenario == "upload":
+        async def upload(client: httpx.AsyncClient, i: int):
+            files = {"file": (f"resume-{level}-{i}.pdf", pdfs[i % len(pdfs)], "application/pdf")}
+            return await client.post(f"{args.api}/api/resume/upload", files=files)
+        return upload
+
+    if args.scenario == "bucket":
+        names = [f"loadtest-{level}-{i}.pdf" for i in range(len(pdfs))]
+        async with httpx.AsyncClient() as client:
+            for name, data in zip(names, pdfs):
+                await client.post(f"{args.stubs}/storage/v1/object/{BUCKET}/resumes/{name}", content=data)
+
+        async def parse_bucket(client: httpx.AsyncClient, i: int):
+            batch = [names[(i * args.batch + j) % len(names)] for j in range(args.batch)]
+            return await client.post(f"{args.api}/api/resume/parse_from_bucket", json=batch)
+        return parse_bucket
+
+    if args.scenario == "summary":
+        ids: List[str] = []
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            for i, data in enumerate(pdfs):
+                files = {"file": (f"summary-{level}-{i}.pdf", data, "application/pdf")}
+                response = await client.post(f"{args.api}/api/resume/upload", files=files)
+                response.raise_for_status()
+                ids.append(response.json()["candidate_id"])
+
+        async def summarize(client: httpx.AsyncClient, i: int):
+            return await client.post(f"{args.api}/api/candidate/{ids[i % len(ids)]}/generate_summary")
+        return summarize
+
+    raise ValueError(f"Unknown scenario {args.scenario}")
+
+async def run(args) -> List[Dict[str, float]]:
+    results = []
+    for level, concurrency in enumerate(int(c) for c in args.concurrency.split(",")):
+        make_request = await _prepare(args, level)
+        results.append(await _run_level(make_request, concurrency, args.requests, args.timeout))
+        r = results[-1]
+        print(f"{args.scenario:8} c={r['concurrency']:<4} n={r['requests']:<6} err={r['errors']:<4} "
+              f"rps={r['rps']:8.1f}  p50={r['p50_ms']:8.1f}ms  p95={r['p95_ms']:8.1f}ms  "
+              f"p99={r['p99_ms']:8.1f}ms  max={r['max_ms']:8.1f}ms", flush=True)
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the HireAI API against local stand-ins")
+    parser.add_argument("--api", default="http://127.0.0.1:3001")
+    parser.add_argument("--stubs", default="http://127.0.0.1:54321")
+    parser.add_argument("--scenario", choices=("upload", "bucket", "summary"), default="upload")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--batch", type=int, default=5, help="filenames per parse_from_bucket call")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
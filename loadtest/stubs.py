@@ -0,0 +1,190 @@
+"""Local stand-ins for Supabase Storage, PostgREST and Gemini.
+
+Emulates just enough of each API for app.py to run end to end on one box:
+
+- Storage:   POST/GET /storage/v1/object/{bucket}/{path}
+- PostgREST: GET/POST/PATCH /rest/v1/candidates (eq./gt./in./is.null filters,
+             select, order, limit) and POST /rest/v1/rpc/{match_candidates,
+             bulk_update_candidates}
+- Gemini:    POST /v1beta/models/{model}:generateContent
+
+Every endpoint sleeps for a configurable latency (plus uniform jitter) so
+capacity numbers include realistic network waits. Run it, then point the API
+at it:
+
+    python -m loadtest.stubs --port 54321 --db-latency-ms 15 --llm-latency-ms 800
+    VITE_SUPABASE_URL=http://127.0.0.1:54321 GEMINI_API_BASE=http://127.0.0.1:54321 \\
+        GEMINI_API_KEY=stub uvicorn app:app --port 3001
+"""
+import argparse
+import asyncio
+import math
+import random
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+class Latency:
+    def __init__(self, storage_ms: float = 20, db_ms: float = 10, llm_ms: float = 500, jitter: float = 0.2):
+        self.storage_ms = storage_ms
+        self.db_ms = db_ms
+        self.llm_ms = llm_ms
+        self.jitter = jitter
+
+    async def wait(self, base_ms: float) -> None:
+        if base_ms <= 0:
+            return
+        spread = base_ms * self.jitter
+        await asyncio.sleep(max(0.0, base_ms + random.uniform(-spread, spread)) / 1000)
+
+def _apply_filter(rows: List[Dict[str, Any]], column: str, expr: str) -> List[Dict[str, Any]]:
+    op, _, value = expr.partition(".")
+    if op == "eq":
+        return [r for r in rows if str(r.get(column)) == value]
+    if op == "gt":
+        return [r for r in rows if str(r.get(column)) > value]
+    if expr == "is.null":
+        return [r for r in rows if r.get(column) is None]
+    if expr == "not.is.null":
+        return [r for r in rows if r.get(column) is not None]
+    if op == "in":
+        wanted = set(v.strip().strip('"') for v in value.strip("()").split(",") if v)
+        return [r for r in rows if str(r.get(column)) in wanted]
+    return rows
+
+def _project(row: Dict[str, Any], select: Optional[str]) -> Dict[str, Any]:
+    if not select or select == "*":
+        return dict(row)
+    return {c: row.get(c) for c in select.split(",")}
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+MATCH_COLUMNS = ("id", "name", "current_title", "location", "work_auth", "years_exp", "resume_url")
+
+def create_app(latency: Latency) -> FastAPI:
+    app = FastAPI(title="HireAI load-test stubs")
+    objects: Dict[str, bytes] = {}
+    candidates: Dict[str, Dict[str, Any]] = {}
+
+    @app.post("/storage/v1/object/{bucket}/{path:path}")
+    async def upload_object(bucket: str, path: str, request: Request):
+        await latency.wait(latency.storage_ms)
+        objects[f"{bucket}/{path}"] = await request.body()
+        return {"Key": f"{bucket}/{path}"}
+
+    @app.get("/storage/v1/object/{bucket}/{path:path}")
+    async def download_object(bucket: str, path: str):
+        await latency.wait(latency.storage_ms)
+        data = objects.get(f"{bucket}/{path}")
+        if data is None:
+            return JSONResponse({"error": "not_found"}, status_code=400)
+        return Response(content=data, media_type="application/octet-stream")
+
+    @app.get("/rest/v1/candidates")
+    async def select_candidates(request: Request):
+        await latency.wait(latency.db_ms)
+        params = request.query_params
+        rows = list(candidates.values())
+        for column, expr in params.multi_items():
+            if column not in ("select", "order", "limit", "offset"):
+                rows = _apply_filter(rows, column, expr)
+        if "order" in params:
+            column, _, direction = params["order"].partition(".")
+            rows.sort(key=lambda r: str(r.get(column)), reverse=direction == "desc")
+        offset = int(params.get("offset", 0))
+        if "limit" in params:
+            rows = rows[offset:offset + int(params["limit"])]
+        else:
+            rows = rows[offset:]
+        return [_project(r, params.get("select")) for r in rows]
+
+    @app.post("/rest/v1/candidates")
+    async def insert_candidates(request: Request):
+        await latency.wait(latency.db_ms)
+        payload = await request.json()
+        inserted = []
+        for row in payload if isinstance(payload, list) else [payload]:
+            now = datetime.now(timezone.utc).isoformat()
+            record = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **row}
+            candidates[record["id"]] = record
+            inserted.append(record)
+        if "return=representation" in request.headers.get("prefer", ""):
+            select = request.query_params.get("select")
+            return JSONResponse([_project(r, select) for r in inserted], status_code=201)
+        return Response(status_code=201)
+
+    @app.patch("/rest/v1/candidates")
+    async def update_candidates(request: Request):
+        await latency.wait(latency.db_ms)
+        patch = await request.json()
+        rows = list(candidates.values())
+        for column, expr in request.query_params.multi_items():
+            rows = _apply_filter(rows, column, expr)
+        for row in rows:
+            row.update(patch)
+            row["updated_at"] = datetime.now(timezone.utc).isoformat()
+        if "return=representation" in request.headers.get("prefer", ""):
+            return JSONResponse(rows, status_code=200)
+        return Response(status_code=204)
+
+    @app.post("/rest/v1/rpc/match_candidates")
+    async def match_candidates(request: Request):
+        await latency.wait(latency.db_ms)
+        args = await request.json()
+        scored = []
+        for row in candidates.values():
+            if row.get("embedding"):
+                similarity = _cosine(row["embedding"], args["query_embedding"])
+                if similarity > args["match_threshold"]:
+                    scored.append({**{c: row.get(c) for c in MATCH_COLUMNS}, "similarity": similarity})
+        scored.sort(key=lambda r: r["similarity"], reverse=True)
+        return [_project(r, request.query_params.get("select")) for r in scored[:args["match_count"]]]
+
+    @app.post("/rest/v1/rpc/bulk_update_candidates")
+    async def bulk_update_candidates(request: Request):
+        await latency.wait(latency.db_ms)
+        updated = 0
+        for patch in (await request.json())["updates"]:
+            row = candidates.get(patch["id"])
+            if row is not None:
+                row.update({k: v for k, v in patch.items() if k != "id"})
+                row["updated_at"] = datetime.now(timezone.utc).isoformat()
+                updated += 1
+        return updated
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate_content(model_action: str, request: Request):
+        await latency.wait(latency.llm_ms)
+        payload = await request.json()
+        prompt = payload["contents"][0]["parts"][0]["text"]
+        summary = f"Stub summary of a {len(prompt)}-character prompt."
+        return {"candidates": [{"content": {"parts": [{"text": summary}], "role": "model"}}]}
+
+    @app.get("/_stats")
+    async def stats():
+        return {"objects": len(objects), "candidates": len(candidates)}
+
+    return app
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run local Supabase/Gemini stand-ins")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--storage-latency-ms", type=float, default=20)
+    parser.add_argument("--db-latency-ms", type=float, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--jitter", type=float, default=0.2, help="uniform jitter as a fraction of latency")
+    args = parser.parse_args()
+    latency = Latency(args.storage_latency_ms, args.db_latency_ms, args.llm_latency_ms, args.jitter)
+    uvicorn.run(create_app(latency), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Re-run extract_fields over every candidate and write back what changed.
+
+Use after changing extract_fields or the skill patterns:
+
+    python reparse_script.py                   # resume from the last checkpoint
+    python reparse_script.py --reset           # start over from the first row
+    python reparse_script.py --dry-run         # report changes without writing
+
+Rows are streamed from the candidates table in id order and parsed across a
+process pool. Only changed columns (skills, current_title, years_exp) are
+written, in batches, through the bulk_update_candidates function (see
+bulk_update_candidates_function.sql). Progress is checkpointed, so an
+interrupted run picks up where it stopped.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+import httpx
+
+# Load environment variables
+load_dotenv()
+
+# Environment variables
+SUPABASE_URL = os.getenv("VITE_SUPABASE_URL")
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+HIREAI_API_URL = os.getenv("HIREAI_API_URL")  # e.g. http://localhost:3001, to invalidate cached search results
+
+DEFAULT_CHECKPOINT = ".reparse_checkpoint.json"
+REPARSE_COLUMNS = ("current_title", "years_exp", "skills")
+
+HEADERS = {
+    "apikey": SUPABASE_SERVICE_ROLE_KEY,
+    "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
+}
+
+def parsed_columns(raw_text: str) -> Dict[str, Any]:
+    """Column values for raw_text, normalized the same way upload_resume stores them."""
+    from backend.routers.resume_parser import extract_fields
+
+    fields = extract_fields(raw_text)
+    current_title = str(fields.get("current_title") or "").strip() or "Not specified"
+    years_exp = None
+    if str(fields.get("years_exp") or "").strip():
+        try:
+            years_exp = float(str(fields["years_exp"]).strip())
+        except ValueError:
+            years_exp = None
+    return {"current_title": current_title, "years_exp": years_exp, "skills": fields.get("hard_skills", [])}
+
+def diff_row(row: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """(id, changed columns or None, error or None); runs in a pool worker."""
+    if not row.get("raw_text"):
+        return row["id"], None, None
+    try:
+        fresh = parsed_columns(row["raw_text"])
+    except Exception as e:
+        return row["id"], None, f"{type(e).__name__}: {e}"
+    patch = {}
+    for column in REPARSE_COLUMNS:
+        old, new = row.get(column), fresh[column]
+        if column == "skills":
+            changed = sorted(old or []) != sorted(new)
+        elif column == "years_exp":
+            changed = (old is None) != (new is None) or (old is not None and float(old) != new)
+        else:
+            changed = old != new
+        if changed:
+            patch[column] = new
+    return row["id"], patch or None, None
+
+def stream_pages(client: httpx.Client, after: Optional[str], page_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Keyset-paginated pages of rows with only the columns the re-parse needs."""
+    select = ",".join(("id", "raw_text") + REPARSE_COLUMNS)
+    while True:
+        params = {"select": select, "order": "id", "limit": str(page_size)}
+        if after:
+            params["id"] = f"gt.{after}"
+        response = client.get(f"{SUPABASE_URL}/rest/v1/candidates", params=params, headers=HEADERS)
+        response.raise_for_status()
+        rows = response.json()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1]["id"]
+
+def write_updates(client: httpx.Client, updates: List[Dict[str, Any]]) -> int:
+    response = client.post(
+        f"{SUPABASE_URL}/rest/v1/rpc/bulk_update_candidates",
+        json={"updates": updates},
+        headers={**HEADERS, "Content-Type": "application/json"},
+    )
+    response.raise_for_status()
+    return int(response.json() or 0)
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"last_id": None, "processed": 0, "updated": 0, "errors": 0}
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def invalidate_search_cache(client: httpx.Client) -> None:
+    if not HIREAI_API_URL:
+        return
+    token = os.getenv("SEARCH_INVALIDATE_TOKEN")
+    try:
+        client.post(f"{HIREAI_API_URL}/api/search/invalidate",
+                    headers={"X-Invalidate-Token": token} if token else {}).raise_for_status()
+    except Exception as e:
+        print(f"Could not invalidate search cache: {e}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-parse raw_text for every candidate and update changed fields")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--page-size", type=int, default=1000, help="rows fetched per request")
+    parser.add_argument("--chunksize", type=int, default=32, help="rows handed to a worker at a time")
+    parser.add_argument("--batch-size", type=int, default=500, help="changed rows per bulk update")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--checkpoint-every", type=int, default=5000, help="rows between checkpoints")
+    parser.add_argument("--reset", action="store_true", help="ignore any existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="count changes without writing them")
+    args = parser.parse_args()
+
+    state = {"last_id": None, "processed": 0, "updated": 0, "errors": 0} if args.reset else load_checkpoint(args.checkpoint)
+    if state["last_id"]:
+        print(f"Resuming after candidate {state['last_id']} ({state['processed']} rows already processed)")
+
+    pending: List[Dict[str, Any]] = []
+    since_checkpoint = 0
+    started = time.perf_counter()
+    processed_this_run = 0
+
+    def flush(client: httpx.Client, last_id: Optional[str]) -> None:
+        nonlocal since_checkpoint
+        if pending and not args.dry_run:
+            write_updates(client, pending)
+        state["updated"] += len(pending)
+        pending.clear()
+        if last_id:
+            state["last_id"] = last_id
+            if not args.dry_run:
+                save_checkpoint(args.checkpoint, state)
+        since_checkpoint = 0
+
+    with httpx.Client(timeout=120.0) as client, multiprocessing.Pool(args.workers) as pool:
+        last_id = state["last_id"]
+        pages = stream_pages(client, state["last_id"], args.page_size)
+        page = next(pages, None)
+        # The pool gets one fetched page at a time, so at most two pages are
+        # in memory and the client is only used from this thread
+        while page:
+            results = pool.imap(diff_row, page, chunksize=args.chunksize)
+            next_page = next(pages, None)  # fetched while the pool parses this one
+            # imap keeps input order, so everything up to last_id is done when we checkpoint
+            for candidate_id, patch, error in results:
+                last_id = candidate_id
+                state["processed"] += 1
+                processed_this_run += 1
+                since_checkpoint += 1
+                if error:
+                    state["errors"] += 1
+                elif patch:
+                    pending.append({"id": candidate_id, **patch})
+                if len(pending) >= args.batch_size or since_checkpoint >= args.checkpoint_every:
+                    flush(client, last_id)
+                    elapsed = time.perf_counter() - started
+                    print(f"Processed {state['processed']} rows, updated {state['updated']}, errors {state['errors']} "
+                          f"({processed_this_run / elapsed:.0f} rows/sec)")
+            page = next_page
+        flush(client, last_id)
+        if state["updated"] and not args.dry_run:
+            invalidate_search_cache(client)
+
+    elapsed = time.perf_counter() - started
+    verb = "would update" if args.dry_run else "updated"
+    print(f"Re-parse complete: {processed_this_run} rows in {elapsed:.1f}s "
+          f"({processed_this_run / elapsed if elapsed else 0:.0f} rows/sec), {verb} {state['updated']}, "
+          f"errors {state['errors']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,21 @@
+import io
 import os
 import re
 import logging
 import requests
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 from pathlib import Path
-import tempfile
 
 import spacy
+from spacy.matcher import Matcher
 import phonenumbers
 from dateutil import parser as date_parser
 from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
 from pydantic import BaseModel, EmailStr
 from unstructured.partition.auto import partition
-from pyresparser import ResumeParser
+import pyresparser
+from pyresparser import utils as pyresparser_utils
 from supabase import create_client, Client
 
 # Configure logging
@@ -41,6 +43,18 @@ except OSError:
     spacy.cli.download("en_core_web_sm")
     nlp = spacy.load("en_core_web_sm")
 
+# pyresparser's entity model (names, degrees, designations, companies). Loaded
+# on first use and kept, rather than reloaded by every ResumeParser instance;
+# it is a spaCy 2 model, so on other spaCy versions loading fails and
+# parse_resume_content falls back to empty pyresparser data.
+_custom_nlp = None
+
+def get_custom_nlp():
+    global _custom_nlp
+    if _custom_nlp is None:
+        _custom_nlp = spacy.load(os.path.dirname(os.path.abspath(pyresparser.__file__)))
+    return _custom_nlp
+
 # Master skill list (you can expand this)
 MASTER_SKILLS = {
     "python", "java", "javascript", "typescript", "react", "node.js", "sql",
@@ -61,15 +75,86 @@ class ResumeData(BaseModel):
 class ProcessResumePayload(BaseModel):
     candidate_id: str
 
+class ResumeDocument:
+    """One decoded resume shared by every extractor.
+
+    The upload bytes are partitioned once; the layout elements, the raw text
+    (one line per element), the whitespace-collapsed text and the spaCy docs
+    over them are all derived from that single pass. The spaCy docs are built
+    on first use.
+    """
+
+    def __init__(self, filename: str, elements: List[Any]):
+        self.filename = filename
+        self.elements = elements
+        self.text = "\n".join(str(element) for element in elements)
+        self.flat_text = " ".join(self.text.split())
+        self._doc = None
+        self._custom_doc = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes, filename: str) -> "ResumeDocument":
+        try:
+            elements = partition(file=io.BytesIO(data), metadata_filename=filename)
+        except Exception as e:
+            logger.error(f"Error extracting text: {str(e)}")
+            # We'll handle this gracefully in the parsing function
+            elements = []
+        return cls(filename, elements)
+
+    @classmethod
+    def from_path(cls, file_path: str) -> "ResumeDocument":
+        with open(file_path, "rb") as f:
+            return cls.from_bytes(f.read(), os.path.basename(file_path))
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            self._doc = nlp(self.flat_text)
+        return self._doc
+
+    @property
+    def custom_doc(self):
+        if self._custom_doc is None:
+            self._custom_doc = get_custom_nlp()(self.text)
+        return self._custom_doc
+
+    @property
+    def page_count(self) -> Optional[int]:
+        pages = [element.metadata.page_number for element in self.elements
+                 if getattr(element.metadata, "page_number", None)]
+        return max(pages) if pages else None
+
 def extract_text_from_document(file_path: str) -> str:
     """Extract text from PDF or DOCX using unstructured."""
-    try:
-        elements = partition(filename=file_path)
-        return "\n".join([str(element) for element in elements])
-    except Exception as e:
-        logger.error(f"Error extracting text: {str(e)}")
-        # We'll handle this gracefully in the parsing function
-        return ""
+    return ResumeDocument.from_path(file_path).text
+
+def extract_pyresparser_details(document: ResumeDocument) -> Dict:
+    """pyresparser's basic details, computed from an already parsed document.
+
+    Same fields and fallbacks as ResumeParser.get_extracted_data(), without
+    ResumeParser re-reading the file and reloading both spaCy models.
+    pyresparser.utils is not a public API: the version is pinned in
+    requirements.txt and tests/test_pyresparser_compat.py compares the two.
+    """
+    cust_ent = pyresparser_utils.extract_entities_wih_custom_model(document.custom_doc)
+    entities = pyresparser_utils.extract_entity_sections_grad(document.text)
+    details = {
+        'name': (cust_ent.get('Name') or [None])[0] or pyresparser_utils.extract_name(document.doc, matcher=Matcher(nlp.vocab)),
+        'email': pyresparser_utils.extract_email(document.flat_text),
+        'mobile_number': pyresparser_utils.extract_mobile_number(document.flat_text),
+        'skills': pyresparser_utils.extract_skills(document.doc, list(document.doc.noun_chunks)),
+        'college_name': entities.get('College Name'),
+        'degree': cust_ent.get('Degree'),
+        'designation': cust_ent.get('Designation'),
+        'experience': entities.get('experience'),
+        'company_names': cust_ent.get('Companies worked at'),
+        'no_of_pages': document.page_count,
+        'total_experience': 0,
+    }
+    if details['experience']:
+        details['total_experience'] = round(pyresparser_utils.get_total_experience(details['experience']) / 12, 2)
+    return details
 
 def validate_phone(phone: str) -> str:
     """Validate and format phone number using phonenumbers library."""
@@ -104,15 +189,17 @@ def validate_skills(skills: List[str]) -> List[str]:
             validated_skills.append(skill)
     return validated_skills
 
-def parse_resume_content(file_path: str) -> Dict:
-    """Main resume parsing function, returns a dict of extracted data."""
-    # Extract raw text
-    raw_text = extract_text_from_document(file_path)
+def parse_resume_content(resume: Union[ResumeDocument, str]) -> Dict:
+    """Main resume parsing function, returns a dict of extracted data.
+
+    Takes a ResumeDocument, or a file path which is read and partitioned once.
+    """
+    document = resume if isinstance(resume, ResumeDocument) else ResumeDocument.from_path(resume)
+    raw_text = document.text
     
     # Parse with pyresparser
     try:
-        parser = ResumeParser(file_path)
-        parsed_data = parser.get_extracted_data()
+        parsed_data = extract_pyresparser_details(document)
     except Exception as e:
         logger.error(f"Pyresparser error: {str(e)}")
         parsed_data = {}
@@ -164,19 +251,13 @@ async def process_resume_task(candidate_id: str):
             logger.info(f"Found resume URL: {resume_url}")
             
             # Download the file
-            response = requests.get(resume_url, stream=True)
+            response = requests.get(resume_url)
             response.raise_for_status() # Raise an exception for bad status codes
-            
-            # Save to a temporary file
-            with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    tmp_file.write(chunk)
-                temp_path = tmp_file.name
-            
-            logger.info(f"Downloaded resume to temporary file: {temp_path}")
+            logger.info(f"Downloaded resume ({len(response.content)} bytes)")
 
-            # Parse the resume
-            parsed_data = parse_resume_content(temp_path)
+            # Parse the resume straight from memory
+            filename = os.path.basename(resume_url.split("?", 1)[0])
+            parsed_data = parse_resume_content(ResumeDocument.from_bytes(response.content, filename))
             logger.info(f"Parsed data for {candidate_id}: {parsed_data}")
 
             # Update candidate record in Supabase
@@ -197,10 +278,6 @@ async def process_resume_task(candidate_id: str):
             else:
                 logger.info(f"Successfully updated candidate {candidate_id}")
 
-            # Clean up temporary file
-            os.remove(temp_path)
-            logger.info(f"Removed temporary file: {temp_path}")
-
         else:
             logger.error(f"Candidate with ID {candidate_id} not found or no resume_url.")
 
@@ -210,15 +287,11 @@ async def process_resume_task(candidate_id: str):
 @app.post("/parse-resume-file/", response_model=ResumeData)
 async def parse_resume_file_endpoint(file: UploadFile = File(...)):
     """FastAPI endpoint for direct resume parsing (keeping for convenience)."""
-    # Save uploaded file temporarily
-    temp_path = f"temp_{file.filename}"
     try:
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        content = await file.read()
         
         # Parse resume
-        result_data = parse_resume_content(temp_path)
+        result_data = parse_resume_content(ResumeDocument.from_bytes(content, file.filename))
         
         # Return as ResumeData model
         return ResumeData(**result_data)
@@ -226,11 +299,6 @@ async def parse_resume_file_endpoint(file: UploadFile = File(...)):
     except Exception as e:
         logger.error(f"Error processing resume: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
-    
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
 
 @app.post("/process-uploaded-resume/")
 async def process_uploaded_resume_endpoint(payload: ProcessResumePayload, background_tasks: BackgroundTasks):
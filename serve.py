@@ -0,0 +1,181 @@
+"""Production entry point: pre-forked uvicorn workers on one shared socket.
+
+    python serve.py --host 0.0.0.0 --port 3001            # one worker per usable CPU
+    python serve.py --workers 4 --graceful-timeout 30
+
+The supervisor binds the listening socket, imports the app, loads the
+embedding model and runs the fork-safe warmup steps (NLTK corpora, spaCy and
+pyresparser models, parser regexes) *before* forking, so every worker shares
+those pages copy-on-write instead of loading its own copy. It then forks the
+workers, which all accept on the socket. Each worker seeds the near-duplicate
+index in the background once it is serving; DEDUP_PRELOAD_MAX_ROWS seeds up to
+that many rows in the supervisor first, and the workers continue from there.
+
+SIGTERM or SIGINT starts a graceful shutdown. Workers stop accepting, finish
+in-flight requests and run shutdown hooks. Any worker still running after
+--graceful-timeout is killed. A worker that dies on its own is replaced.
+For local development keep using `python app.py` or run_fastapi.sh (reload).
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+logger = logging.getLogger("hireai.serve")
+
+def default_workers() -> int:
+    """CPUs this process may run on (respects container CPU sets), or WEB_CONCURRENCY."""
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def preload(app_module) -> None:
+    """Load shared state in the supervisor so forked workers inherit it."""
+    if app_module.INLINE_EMBEDDING:
+        try:
+            # Weights only: running encode here would start torch's thread
+            # pool, which does not survive fork
+            app_module.embedding_batcher.load_model()
+        except Exception as e:
+            logger.error("Could not preload embedding model", extra={"fields": {"error": str(e)}})
+    for name, step in app_module.warmup.steps:
+        if name in app_module.PRELOAD_WARMUP_STEPS:
+            try:
+                step()
+            except Exception as e:
+                # The worker's own warmup retries the step and reports it in /readyz
+                logger.warning("Could not preload warmup step", extra={"fields": {"step": name, "error": str(e)}})
+    if app_module.DEDUP_SEED_ON_STARTUP and app_module.DEDUP_PRELOAD_MAX_ROWS > 0:
+        # Bounded, so a large table can't hold up forking; workers inherit
+        # what was seeded and continue after it in the background
+        resume_after = asyncio.run(app_module.seed_dedup_index(max_rows=app_module.DEDUP_PRELOAD_MAX_ROWS))
+        if resume_after is None:
+            app_module.DEDUP_SEED_ON_STARTUP = False
+        else:
+            app_module.dedup_seeded_through = resume_after
+    # Move everything loaded so far out of the GC's reach, so collections in
+    # the workers don't touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock: socket.socket, args) -> None:
+    import uvicorn
+
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        log_config=None,  # keep the app's structured logging
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=args.keep_alive,
+        backlog=args.backlog,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+class Supervisor:
+    def __init__(self, app, sock: socket.socket, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> start time
+        self.stopping = False
+        self.deadline = 0.0
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                run_worker(self.app, self.sock, self.args)
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info("Worker started", extra={"fields": {"pid": pid}})
+
+    def stop(self, signum, frame) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        self.deadline = time.monotonic() + self.args.graceful_timeout + 5
+        logger.info("Shutting down, draining workers", extra={"fields": {"signal": signum, "workers": len(self.workers)}})
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.args.workers):
+            self.spawn()
+
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if self.stopping and time.monotonic() > self.deadline:
+                    for pid in list(self.workers):
+                        logger.warning("Worker did not drain in time, killing", extra={"fields": {"pid": pid}})
+                        try:
+                            os.kill(pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                    self.deadline = float("inf")
+                time.sleep(0.2)
+                continue
+
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            logger.error("Worker exited, restarting", extra={"fields": {"pid": pid, "status": os.waitstatus_to_exitcode(status)}})
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)  # don't spin on a worker that dies at startup
+            self.spawn()
+        logger.info("All workers stopped")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the HireAI API with pre-forked workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "3001")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="seconds workers get to finish in-flight requests on shutdown")
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--backlog", type=int, default=2048)
+    args = parser.parse_args()
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    import app as app_module
+
+    preload(app_module)
+    logger.info("Serving", extra={"fields": {"host": args.host, "port": args.port, "workers": args.workers}})
+    Supervisor(app_module.app, sock, args).run()
+    sock.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.admission import AdmissionClass, AdmissionMiddleware, Rejected
+
+def test_waiters_are_admitted_in_order():
+    async def main():
+        admission = AdmissionClass("parse", concurrency=1, queue_size=2)
+        await admission.acquire()
+        order = []
+
+        async def request(name):
+            await admission.acquire()
+            order.append(name)
+            admission.release(held_for=0.01)
+
+        tasks = [asyncio.create_task(request(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        assert admission.active == 1 and len(admission._waiters) == 2
+        admission.release(held_for=0.01)
+        await asyncio.gather(*tasks)
+        return order, admission.active
+
+    order, active = asyncio.run(main())
+    assert order == ["first", "second"]
+    assert active == 0
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def main():
+        admission = AdmissionClass("llm", concurrency=1, queue_size=1)
+        await admission.acquire()
+        waiting = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as rejected:
+            await admission.acquire()
+        waiting.cancel()
+        return rejected.value.retry_after
+
+    assert 1 <= asyncio.run(main()) <= 60
+
+def test_waiting_too_long_is_rejected_and_leaves_the_queue():
+    async def main():
+        admission = AdmissionClass("read", concurrency=1, queue_size=4, max_wait_s=0.01)
+        await admission.acquire()
+        with pytest.raises(Rejected):
+            await admission.acquire()
+        return admission.active, len(admission._waiters)
+
+    assert asyncio.run(main()) == (1, 0)
+
+def test_cancelled_waiter_does_not_take_a_slot():
+    async def main():
+        admission = AdmissionClass("export", concurrency=1, queue_size=4)
+        await admission.acquire()
+        waiting = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        admission.release(held_for=None)
+        return admission.active, len(admission._waiters)
+
+    assert asyncio.run(main()) == (0, 0)
+
+def test_retry_after_grows_with_queue_depth():
+    admission = AdmissionClass("parse", concurrency=2, queue_size=10)
+    admission._service_time = 4.0
+    shallow = admission.retry_after()
+    admission._waiters.extend(object() for _ in range(5))
+    assert admission.retry_after() > shallow
+
+def test_middleware_returns_429_when_the_class_is_full():
+    app = FastAPI()
+    admission = AdmissionClass("parse", concurrency=1, queue_size=0)
+
+    @app.post("/upload")
+    async def upload():
+        return {"ok": True}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"ok": True}
+
+    app.add_middleware(AdmissionMiddleware, classes={"parse": admission},
+                       classify=lambda method, path: "parse" if path == "/upload" else None)
+    with TestClient(app) as client:
+        assert client.post("/upload").status_code == 200
+        admission.active = 1  # simulate a request holding the only slot
+        busy = client.post("/upload")
+        assert busy.status_code == 429
+        assert int(busy.headers["retry-after"]) >= 1
+        assert client.get("/healthz").status_code == 200
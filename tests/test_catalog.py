@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from backend.catalog import MISSING, CandidateCatalog, CandidateRecord, InvalidationLog
+
+@pytest.fixture
+def spill_path(tmp_path):
+    return str(tmp_path / "catalog.sqlite")
+
+def spilled_ids(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT id FROM candidate_records")}
+
+def test_record_tracks_missing_columns():
+    record = CandidateRecord({"id": "1", "name": "Ada", "skills": ["python"]})
+    assert record.email is MISSING
+    assert record.has(["name", "skills"]) and not record.has(["email"])
+    assert record.to_dict(["name", "skills"]) == {"name": "Ada", "skills": ["python"]}
+
+def test_get_needs_every_requested_column():
+    catalog = CandidateCatalog()
+    catalog.put("1", {"name": "Ada"})
+    assert catalog.get("1", ["name"]) == {"name": "Ada"}
+    assert catalog.get("1", ["name", "email"]) is None
+    catalog.put("1", {"email": "ada@example.com"})
+    assert catalog.get("1", ["name", "email"]) == {"name": "Ada", "email": "ada@example.com"}
+
+def test_expired_records_are_misses():
+    catalog = CandidateCatalog(ttl_seconds=0)
+    catalog.put("1", {"name": "Ada"})
+    assert catalog.get("1", ["name"]) is None
+
+def test_evicted_records_spill_and_come_back(spill_path):
+    catalog = CandidateCatalog(max_entries=1, spill_path=spill_path)
+    catalog.put("1", {"name": "Ada"})
+    catalog.put("2", {"name": "Grace"})
+    assert len(catalog) == 1 and spilled_ids(spill_path) == {"1"}
+    assert catalog.get("1", ["name"]) == {"name": "Ada"}
+    assert spilled_ids(spill_path) == {"2"}
+
+def test_invalidation_reaches_other_workers_and_the_spill(spill_path):
+    log = InvalidationLog(slots=8)
+    worker_a = CandidateCatalog(max_entries=1, spill_path=spill_path, invalidations=log)
+    worker_b = CandidateCatalog(spill_path=spill_path, invalidations=log)
+    worker_a.put("1", {"name": "Ada"})
+    worker_a.put("2", {"name": "Grace"})  # spills 1
+    worker_b.put("2", {"name": "Grace"})
+
+    worker_b.invalidate("2")
+    assert worker_a.get("2", ["name"]) is None
+    worker_b.invalidate("1")
+    assert spilled_ids(spill_path) == set()
+    assert worker_a.get("1", ["name"]) is None
+
+def test_syncing_removes_ids_another_worker_spilled(spill_path):
+    log = InvalidationLog(slots=8)
+    worker_a = CandidateCatalog(max_entries=1, spill_path=spill_path, invalidations=log)
+    log.publish("1")  # invalidated elsewhere after worker_a last synced...
+    worker_a._spill_record(CandidateRecord({"id": "1", "name": "stale"}))  # ...while a stale copy sat in the spill
+    assert worker_a.get("1", ["name"]) is None
+    assert spilled_ids(spill_path) == set()
+
+def test_falling_behind_the_ring_drops_everything(spill_path):
+    log = InvalidationLog(slots=2)
+    catalog = CandidateCatalog(max_entries=1, spill_path=spill_path, invalidations=log)
+    catalog.put("1", {"name": "Ada"})
+    catalog.put("2", {"name": "Grace"})
+    for candidate_id in ("x", "y", "z"):
+        log.publish(candidate_id)
+    assert catalog.get("2", ["name"]) is None
+    assert len(catalog) == 0 and spilled_ids(spill_path) == set()
+
+def test_clear_drops_records_in_every_worker(spill_path):
+    log = InvalidationLog(slots=8)
+    worker_a = CandidateCatalog(spill_path=spill_path, invalidations=log)
+    worker_b = CandidateCatalog(spill_path=spill_path, invalidations=log)
+    worker_a.put("1", {"name": "Ada"})
+    worker_b.clear()
+    assert worker_a.get("1", ["name"]) is None
+    worker_b.put("2", {"name": "Grace"})
+    assert worker_b.get("2", ["name"]) == {"name": "Grace"}
+
+def test_invalidation_log_reports_new_ids():
+    log = InvalidationLog(slots=4)
+    seen = log.count
+    log.publish("a")
+    log.publish("b")
+    assert log.since(seen) == (seen + 2, ["a", "b"])
+    assert log.since(log.count) == (log.count, [])
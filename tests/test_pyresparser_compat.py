@@ -0,0 +1,33 @@
+"""resume_parser.extract_pyresparser_details calls pyresparser.utils helpers
+directly, which are not a public API. This checks it still agrees with
+ResumeParser on a sample resume; run it after changing the pinned version.
+"""
+import os
+
+import pytest
+
+for module in ("pyresparser", "unstructured", "phonenumbers", "supabase", "en_core_web_sm"):
+    pytest.importorskip(module)
+
+# resume_parser.py creates its Supabase client at import time
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.c2lnbmF0dXJl")
+
+from pyresparser import ResumeParser  # noqa: E402
+
+from benchmarks.corpus import generate_resume, to_pdf  # noqa: E402
+from resume_parser import ResumeDocument, extract_pyresparser_details  # noqa: E402
+
+def test_details_match_resume_parser(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(to_pdf(generate_resume(7, size="small")))
+    try:
+        expected = ResumeParser(str(path)).get_extracted_data()
+    except OSError as e:
+        pytest.skip(f"pyresparser's spaCy model does not load here: {e}")
+
+    actual = extract_pyresparser_details(ResumeDocument.from_path(str(path)))
+
+    assert actual.keys() == expected.keys()
+    for field in ("name", "email", "mobile_number", "no_of_pages"):
+        assert actual[field] == expected[field], field
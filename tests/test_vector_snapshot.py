@@ -0,0 +1,77 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from backend.vector_snapshot import VectorSnapshot, acquire_build_lock, write_snapshot
+
+DIM = 16
+
+def ids(n, start=0):
+    return [str(uuid.UUID(int=i)) for i in range(start, start + n)]
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(300, DIM)).astype(np.float32)
+
+@pytest.fixture
+def snapshot(tmp_path, vectors):
+    write_snapshot(str(tmp_path), zip(ids(len(vectors)), vectors), DIM)
+    return VectorSnapshot(str(tmp_path))
+
+def brute_force(vectors, candidate_ids, query, k):
+    matrix = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = matrix @ (query / np.linalg.norm(query))
+    return [candidate_ids[i] for i in np.argsort(-scores)[:k]]
+
+def test_search_matches_brute_force(snapshot, vectors):
+    query = vectors[7] + 0.1
+    assert [row[0] for row in snapshot.search(query, 10)] == brute_force(vectors, ids(len(vectors)), query, 10)
+
+def test_threshold_filters_results(snapshot, vectors):
+    assert all(score > 0.5 for _, score in snapshot.search(vectors[0], 50, threshold=0.5))
+
+def test_upserts_and_deletes_overlay_the_snapshot(snapshot, vectors):
+    target, new_id = ids(1, 5)[0], ids(1, 1000)[0]
+    snapshot.upsert(target, -vectors[5])
+    snapshot.upsert(new_id, vectors[5])
+    top = snapshot.search(vectors[5], 2)
+    assert top[0][0] == new_id and top[0][1] == pytest.approx(1.0)
+    assert target not in [row[0] for row in top]
+    snapshot.delete(new_id)
+    assert new_id not in [row[0] for row in snapshot.search(vectors[5], 300)]
+
+def test_many_shadowed_rows_still_return_k(snapshot, vectors):
+    query = vectors[0]
+    ranked = [row[0] for row in snapshot.search(query, 200)]
+    for candidate_id in ranked[:100]:  # more than the fixed over-fetch margin
+        snapshot.delete(candidate_id)
+    assert [row[0] for row in snapshot.search(query, 10)] == ranked[100:110]
+
+def test_other_processes_see_appends_and_compaction(tmp_path, snapshot, vectors):
+    reader = VectorSnapshot(str(tmp_path))
+    new_id = ids(1, 1000)[0]
+    snapshot.upsert(new_id, vectors[3])
+    assert reader.search(vectors[3], 1)[0][0] == new_id
+
+    assert snapshot.compact() == len(vectors) + 1
+    assert snapshot.generation == 2 and snapshot.delta_count == 0
+    assert reader.search(vectors[3], 1)[0][0] == new_id
+    assert reader.generation == 2
+
+def test_wrong_dimension_is_rejected(snapshot):
+    with pytest.raises(ValueError):
+        snapshot.upsert(ids(1, 1000)[0], [1.0] * (DIM + 1))
+
+def test_ivf_index_finds_the_exact_top_hits(snapshot, vectors):
+    snapshot.build_index(nlist=4, nprobe=4)  # probing every cluster makes it exact
+    query = vectors[11]
+    assert [row[0] for row in snapshot.search(query, 5)] == brute_force(vectors, ids(len(vectors)), query, 5)
+
+def test_build_lock_creates_the_directory(tmp_path):
+    directory = tmp_path / "new"
+    lock_file = acquire_build_lock(str(directory))
+    try:
+        assert directory.is_dir() and not VectorSnapshot.exists(str(directory))
+    finally:
+        lock_file.close()
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import uuid
+
+import httpx
+import pytest
+
+from backend.write_behind import WriteBehindBuffer
+
+def run_with_buffer(handler, scenario, **kwargs):
+    """Run scenario(buffer) against a WriteBehindBuffer whose requests go to handler."""
+    async def main():
+        buffer = WriteBehindBuffer("http://db", {"apikey": "x"}, **kwargs)
+        buffer.start()
+        await buffer._client.aclose()
+        buffer._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await scenario(buffer)
+        finally:
+            await buffer.stop()
+    return asyncio.run(main())
+
+class FakeCandidates:
+    """PostgREST stand-in: inserts get generated ids; a row named 'bad' is refused with `refuse_status`."""
+
+    def __init__(self, refuse_status=400):
+        self.refuse_status = refuse_status
+        self.requests = []
+
+    def __call__(self, request):
+        body = json.loads(request.content)
+        self.requests.append((request.url.path, body))
+        if request.url.path.endswith("/rpc/bulk_update_candidates"):
+            return httpx.Response(200, json=len(body["updates"]))
+        if any(row.get("name") == "bad" for row in body):
+            return httpx.Response(self.refuse_status, json={"message": "refused"})
+        return httpx.Response(201, json=[{"id": str(uuid.uuid4()), "name": row["name"]} for row in body])
+
+def test_concurrent_inserts_share_one_request():
+    db = FakeCandidates()
+
+    async def scenario(buffer):
+        return await asyncio.gather(*(buffer.insert({"name": f"c{i}"}, select="id,name") for i in range(5)))
+
+    rows = run_with_buffer(db, scenario, max_wait_ms=50)
+    assert [row["name"] for row in rows] == [f"c{i}" for i in range(5)]
+    assert len({row["id"] for row in rows}) == 5
+    assert len(db.requests) == 1
+
+def test_refused_batch_is_retried_row_by_row():
+    db = FakeCandidates(refuse_status=400)
+
+    async def scenario(buffer):
+        return await asyncio.gather(*(buffer.insert({"name": name}, select="id,name") for name in ("a", "bad", "b")),
+                                    return_exceptions=True)
+
+    a, bad, b = run_with_buffer(db, scenario, max_wait_ms=50)
+    assert a["name"] == "a" and b["name"] == "b"
+    assert isinstance(bad, httpx.HTTPStatusError)
+    assert len(db.requests) == 4  # the batch, then one request per row
+
+def test_server_error_fails_the_batch_without_retrying():
+    db = FakeCandidates(refuse_status=503)
+
+    async def scenario(buffer):
+        return await asyncio.gather(*(buffer.insert({"name": name}) for name in ("a", "bad")), return_exceptions=True)
+
+    results = run_with_buffer(db, scenario, max_wait_ms=50)
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+    assert len(db.requests) == 1
+
+def test_patches_are_merged_per_candidate():
+    db = FakeCandidates()
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+
+    async def scenario(buffer):
+        await asyncio.gather(
+            buffer.patch(first, {"current_title": "Engineer"}),
+            buffer.patch(second, {"years_exp": 3}),
+            buffer.patch(first, {"current_title": "Staff Engineer", "ai_summary": "Summary"}),
+        )
+
+    run_with_buffer(db, scenario, max_wait_ms=50)
+    assert len(db.requests) == 1
+    path, body = db.requests[0]
+    assert path == "/rest/v1/rpc/bulk_update_candidates"
+    assert sorted(body["updates"], key=lambda u: u["id"] != first) == [
+        {"id": first, "current_title": "Staff Engineer", "ai_summary": "Summary"},
+        {"id": second, "years_exp": 3},
+    ]
+
+@pytest.mark.parametrize("candidate_id, columns", [
+    ("not-a-uuid", {"ai_summary": "x"}),
+    (str(uuid.uuid4()), {"name": "x"}),
+])
+def test_patch_rejects_bad_input_before_queueing(candidate_id, columns):
+    db = FakeCandidates()
+
+    async def scenario(buffer):
+        with pytest.raises(ValueError):
+            await buffer.patch(candidate_id, columns)
+
+    run_with_buffer(db, scenario)
+    assert db.requests == []
+
+def test_stop_flushes_queued_writes():
+    db = FakeCandidates()
+
+    async def scenario(buffer):
+        pending = asyncio.ensure_future(buffer.insert({"name": "late"}))
+        await asyncio.sleep(0)
+        await buffer.stop()
+        return await pending
+
+    row = run_with_buffer(db, scenario, max_wait_ms=1000)
+    assert "id" in row